@@ -17,13 +17,40 @@
 # under the License.
 
 import abc
+import hashlib
 import itertools
+import time
+
+from oslo.config import cfg
 
 from ceilometer.openstack.common import context
 from ceilometer.openstack.common import log
+from ceilometer.openstack.common import timeutils
 from ceilometer import pipeline
+from ceilometer import sample
 from ceilometer import transformer
 
+OPTS = [
+    cfg.IntOpt('polling_jitter',
+               default=0,
+               help='Maximum offset in seconds of the pollings of each '
+                    'interval within that interval. The offset is derived '
+                    'from the host name and the pollings are aligned on the '
+                    'wall clock, so that the agents of a cloud poll at '
+                    'different times, each one at the same time across '
+                    'restarts'),
+    cfg.BoolOpt('publish_polling_statistics',
+                default=False,
+                help='Publish after each polling cycle the '
+                     'ceilometer.polling.duration and '
+                     'ceilometer.polling.overruns samples, whose resource '
+                     'is the host and the polling interval, to the '
+                     'pipelines of the cycle accepting them'),
+]
+
+cfg.CONF.register_opts(OPTS)
+cfg.CONF.import_opt('host', 'ceilometer.service')
+
 LOG = log.getLogger(__name__)
 
 
@@ -38,11 +65,25 @@ class PollingTask(object):
         self.pollsters = set()
         self.publish_context = pipeline.PublishContext(
             agent_manager.context)
+        # Whether a polling cycle is in progress, the number of cycles
+        # skipped because the previous one was still running, and the
+        # time spent in each pollster during the last cycle
+        self.running = False
+        self.overruns = 0
+        self.durations = {}
 
     def add(self, pollster, pipelines):
         self.publish_context.add_pipelines(pipelines)
         self.pollsters.update([pollster])
 
+    def record_duration(self, pollster, start):
+        """Add the time elapsed since start to the time spent in pollster
+        during this cycle.
+        """
+        self.durations[pollster.name] = (
+            self.durations.get(pollster.name, 0) +
+            timeutils.delta_seconds(start, timeutils.utcnow()))
+
     @abc.abstractmethod
     def poll_and_publish(self):
         """Polling sample and publish into pipeline."""
@@ -84,8 +125,96 @@ class AgentManager(object):
         self.service = service
         for interval, task in self.setup_polling_tasks().iteritems():
             self.service.tg.add_timer(interval,
-                                      self.interval_task,
-                                      task=task)
+                                      self.schedule_task,
+                                      self._initial_delay(interval),
+                                      task, interval)
+
+    @staticmethod
+    def _initial_delay(interval):
+        """Return the delay until the next polling time of this host.
+
+        The pollings happen at the wall clock times whose remainder by the
+        interval is the offset of the host, whenever the agent started.
+        """
+        jitter = min(cfg.CONF.polling_jitter, interval)
+        if jitter > 0:
+            digest = hashlib.md5('%s-%s' % (cfg.CONF.host,
+                                            interval)).hexdigest()
+            offset = int(digest, 16) % (jitter * 1000) / 1000.0
+            return (offset - time.time() % interval) % interval
+
+    def schedule_task(self, task, interval):
+        """Start a polling cycle of the task in its own thread.
+
+        The cycle is skipped if the previous one is still running, so
+        that the timer keeps its pace and overruns do not pile up.
+        """
+        if task.running:
+            task.overruns += 1
+            LOG.warning('Skipping a polling cycle of the %ss interval, the '
+                        'previous one is still running (%d skipped so far)',
+                        interval, task.overruns)
+            return
+        task.running = True
+        self.service.tg.add_thread(self._run_task, task, interval)
+
+    def _run_task(self, task, interval):
+        task.durations = {}
+        start = timeutils.utcnow()
+        try:
+            self.interval_task(task)
+        except Exception as err:
+            LOG.exception(err)
+        finally:
+            task.running = False
+        duration = timeutils.delta_seconds(start, timeutils.utcnow())
+        durations = ', '.join('%s=%.3fs' % item
+                              for item in sorted(task.durations.items()))
+        if duration > interval:
+            LOG.warning('Polling cycle of the %ss interval overran, it took '
+                        '%.3fs: %s', interval, duration, durations)
+        else:
+            LOG.debug('Polling cycle of the %ss interval took %.3fs: %s',
+                      interval, duration, durations)
+        if cfg.CONF.publish_polling_statistics:
+            try:
+                self._publish_statistics(task, interval, duration)
+            except Exception as err:
+                LOG.exception(err)
+
+    @staticmethod
+    def _publish_statistics(task, interval, duration):
+        """Publish how long the polling cycle took and how many cycles
+        the task skipped so far, along with the time spent in each
+        pollster in the metadata.
+        """
+        resource_id = '%s-%s' % (cfg.CONF.host, interval)
+        timestamp = timeutils.isotime()
+        metadata = {'interval': interval,
+                    'pollsters': dict(task.durations)}
+        with task.publish_context as publisher:
+            publisher([
+                sample.Sample(
+                    name='ceilometer.polling.duration',
+                    type=sample.TYPE_GAUGE,
+                    unit='s',
+                    volume=duration,
+                    user_id=None,
+                    project_id=None,
+                    resource_id=resource_id,
+                    timestamp=timestamp,
+                    resource_metadata=metadata),
+                sample.Sample(
+                    name='ceilometer.polling.overruns',
+                    type=sample.TYPE_CUMULATIVE,
+                    unit='cycle',
+                    volume=task.overruns,
+                    user_id=None,
+                    project_id=None,
+                    resource_id=resource_id,
+                    timestamp=timestamp,
+                    resource_metadata=metadata),
+            ])
 
     @staticmethod
     def interval_task(task):
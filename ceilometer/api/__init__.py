@@ -30,6 +30,50 @@ API_SERVICE_OPTS = [
                default='0.0.0.0',
                help='The listen IP for the ceilometer API server',
                ),
+    cfg.IntOpt('workers',
+               default=1,
+               help='Number of processes serving the API, 0 meaning one '
+                    'per CPU',
+               ),
+    cfg.IntOpt('pool_size',
+               default=1000,
+               help='Maximum number of requests served concurrently by '
+                    'each API process',
+               ),
+    cfg.IntOpt('backlog',
+               default=4096,
+               help='Number of pending connections the API server socket '
+                    'queues',
+               ),
+    cfg.IntOpt('ingestion_lag',
+               default=300,
+               help='Number of seconds after which all the samples of a '
+                    'point in time are assumed to have been recorded, the '
+                    'results of the queries ending before being final',
+               ),
+    cfg.IntOpt('http_cache_max_age',
+               default=86400,
+               help='Number of seconds the clients may cache the final '
+                    'results of queries for, a negative value disabling '
+                    'the HTTP caching headers',
+               ),
+    cfg.IntOpt('sample_queue_size',
+               default=10000,
+               help='Number of samples posted to /v2/samples the API '
+                    'process queues for publication, further posts being '
+                    'rejected until they are published, 0 meaning no limit',
+               ),
+    cfg.IntOpt('policy_check_interval',
+               default=60,
+               help='Number of seconds between the checks of the policy '
+                    'file for modification, 0 checking it on every request',
+               ),
+    cfg.IntOpt('json_stream_threshold',
+               default=1000,
+               help='Number of items above which the v2 list endpoints '
+                    'stream a JSON response encoded straight from the '
+                    'storage models, a negative value disabling it',
+               ),
 ]
 
 CONF = cfg.CONF
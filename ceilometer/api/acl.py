@@ -18,12 +18,19 @@
 
 """Access Control Lists (ACL's) control access the API server."""
 
+import time
+
+from ceilometer.api import cache
 from ceilometer.openstack.common import policy
 from keystoneclient.middleware import auth_token
 from oslo.config import cfg
 
 
 _ENFORCER = None
+# Number of role sets whose admin check is remembered
+_ROLES_CACHE_SIZE = 256
+# WSGI environ key of the project a request is limited to
+_ENVIRON_KEY = 'ceilometer.limited_to_project'
 OPT_GROUP_NAME = 'keystone_authtoken'
 
 
@@ -44,12 +51,52 @@ def install(app, conf):
                                    conf=dict(conf.get(OPT_GROUP_NAME)))
 
 
+class Enforcer(policy.Enforcer):
+    """An enforcer checking the policy file for modification at most every
+    [api] policy_check_interval seconds, and remembering whether the most
+    recent role sets are admin until the rules are reloaded.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(Enforcer, self).__init__(*args, **kwargs)
+        self._checked_at = None
+        self.admin_roles = cache.MemoryBackend(_ROLES_CACHE_SIZE)
+
+    def set_rules(self, rules, overwrite=True):
+        super(Enforcer, self).set_rules(rules, overwrite)
+        self.admin_roles = cache.MemoryBackend(_ROLES_CACHE_SIZE)
+
+    def load_rules(self, force_reload=False):
+        now = time.time()
+        if self._checked_at is None:
+            # The file cache is shared with the other enforcers
+            force_reload = True
+        if (force_reload or
+                now - self._checked_at >= cfg.CONF.api.policy_check_interval):
+            self._checked_at = now
+            super(Enforcer, self).load_rules(force_reload)
+
+    def is_admin(self, roles):
+        roles = frozenset(roles.split(","))
+        self.load_rules()
+        admin = self.admin_roles.get(roles)
+        if admin is None:
+            admin = bool(self.enforce('context_is_admin', {},
+                                      {'roles': list(roles)}))
+            self.admin_roles.set(roles, admin)
+        return admin
+
+
 def get_limited_to_project(headers):
     """Return the tenant the request should be limited to."""
-    global _ENFORCER
-    if not _ENFORCER:
-        _ENFORCER = policy.Enforcer()
-    if not _ENFORCER.enforce('context_is_admin',
-                             {},
-                             {'roles': headers.get('X-Roles', "").split(",")}):
-        return headers.get('X-Project-Id')
+    # Remembered for the request when the headers come with its environ
+    environ = getattr(headers, 'environ', {})
+    if _ENVIRON_KEY not in environ:
+        global _ENFORCER
+        if not _ENFORCER:
+            _ENFORCER = Enforcer()
+        project = None
+        if not _ENFORCER.is_admin(headers.get('X-Roles', "")):
+            project = headers.get('X-Project-Id')
+        environ[_ENVIRON_KEY] = project
+    return environ[_ENVIRON_KEY]
@@ -17,7 +17,11 @@
 # under the License.
 
 import logging
+import multiprocessing
 import os
+
+import eventlet
+import eventlet.wsgi
 from oslo.config import cfg
 import pecan
 
@@ -28,7 +32,7 @@ from ceilometer.api import middleware
 from ceilometer import service
 from ceilometer import storage
 from ceilometer.openstack.common import log
-from wsgiref import simple_server
+from ceilometer.openstack.common import service as os_service
 
 LOG = log.getLogger(__name__)
 
@@ -52,13 +56,12 @@ def get_pecan_config():
 
 
 def setup_app(pecan_config=None, extra_hooks=None):
-    storage_engine = storage.get_engine(cfg.CONF)
     # FIXME: Replace DBHook with a hooks.TransactionHook
     app_hooks = [hooks.ConfigHook(),
-                 hooks.DBHook(
-                     storage_engine,
-                     storage_engine.get_connection(cfg.CONF),
-                 ),
+                 hooks.DBHook(storage.ConnectionPool(cfg.CONF)),
+                 hooks.StatisticsCacheHook(),
+                 hooks.JSONStreamHook(),
+                 hooks.NotModifiedHook(),
                  hooks.PipelineHook(),
                  hooks.TranslationHook()]
     if extra_hooks:
@@ -105,15 +108,43 @@ class VersionSelectorApplication(object):
         return self.v2(environ, start_response)
 
 
+class WSGIService(os_service.Service):
+    """Serve the API from a pool of green threads.
+
+    The application, and thus its storage connection, is only built when
+    the service starts, so that each worker process gets its own.
+    """
+
+    def __init__(self, sock):
+        super(WSGIService, self).__init__()
+        self.sock = sock
+
+    def start(self):
+        super(WSGIService, self).start()
+        self.tg.add_thread(eventlet.wsgi.server,
+                           self.sock,
+                           VersionSelectorApplication(),
+                           log=log.WritableLogger(LOG),
+                           custom_pool=eventlet.GreenPool(
+                               cfg.CONF.api.pool_size))
+
+
+def _get_workers():
+    if cfg.CONF.api.workers:
+        return cfg.CONF.api.workers
+    try:
+        return multiprocessing.cpu_count()
+    except NotImplementedError:
+        return 1
+
+
 def start():
     service.prepare_service()
 
-    # Build the WSGI app
-    root = VersionSelectorApplication()
-
-    # Create the WSGI server and start it
+    # Create the listening socket before forking the workers, so that they
+    # all accept connections on it
     host, port = cfg.CONF.api.host, cfg.CONF.api.port
-    srv = simple_server.make_server(host, port, root)
+    sock = eventlet.listen((host, port), backlog=cfg.CONF.api.backlog)
 
     LOG.info('Starting server in PID %s' % os.getpid())
     LOG.info("Configuration:")
@@ -125,4 +156,6 @@ def start():
     else:
         LOG.info("serving on http://%s:%s" % (host, port))
 
-    srv.serve_forever()
+    workers = _get_workers()
+    os_service.launch(WSGIService(sock),
+                      workers=workers if workers > 1 else None).wait()
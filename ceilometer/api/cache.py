@@ -0,0 +1,199 @@
+# -*- encoding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Cache the statistics computed by the API.
+
+The statistics of a period are assumed final once the period is older
+than the ingestion lag: they are cached as long as the backend keeps
+them and only the periods still open are computed again from storage.
+"""
+
+import copy
+import datetime
+import hashlib
+
+from oslo.config import cfg
+
+from ceilometer.openstack.common import importutils
+from ceilometer.openstack.common import log
+from ceilometer.openstack.common import timeutils
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    # Python 2.6
+    from ordereddict import OrderedDict
+
+memcache = importutils.try_import('memcache')
+
+LOG = log.getLogger(__name__)
+
+OPTS = [
+    cfg.StrOpt('statistics_cache_backend',
+               help='Backend caching the statistics computed by the API: '
+                    'memory or memcached, which requires python-memcached, '
+                    'the cache is disabled if unset'),
+    cfg.IntOpt('statistics_cache_size',
+               default=1000,
+               help='Number of statistics queries the memory backend '
+                    'keeps the result of'),
+    cfg.ListOpt('memcached_servers',
+                default=['127.0.0.1:11211'],
+                help='Memcached servers used by the memcached statistics '
+                     'cache backend'),
+]
+
+cfg.CONF.register_opts(OPTS, group='api')
+
+
+class MemoryBackend(object):
+    """Least recently used entries dropped once size entries are kept."""
+
+    def __init__(self, size):
+        self.size = size
+        self._data = OrderedDict()
+
+    def get(self, key):
+        try:
+            value = self._data.pop(key)
+        except KeyError:
+            return None
+        self._data[key] = value
+        return value
+
+    def set(self, key, value):
+        self._data.pop(key, None)
+        self._data[key] = value
+        while len(self._data) > self.size:
+            self._data.popitem(last=False)
+
+
+class MemcachedBackend(object):
+    """Entries shared by all the API processes through memcached.
+
+    :param client: a client with the get() and set() methods of
+                   memcache.Client, created from servers if not given
+    """
+
+    def __init__(self, servers, client=None):
+        if client is None:
+            if memcache is None:
+                raise RuntimeError('The memcached statistics cache backend '
+                                   'requires python-memcached')
+            client = memcache.Client(servers)
+        self.client = client
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def set(self, key, value):
+        self.client.set(key, value)
+
+
+class StatisticsCache(object):
+    """Compute the statistics of a meter through a cache.
+
+    An entry holds the statistics of the periods closed when it was
+    stored, along with the time up to which they are closed.
+    """
+
+    def __init__(self, backend, ingestion_lag):
+        self.backend = backend
+        self.ingestion_lag = datetime.timedelta(seconds=ingestion_lag)
+
+    @classmethod
+    def from_conf(cls, conf):
+        """Return the cache configured, None if it is disabled."""
+        name = conf.api.statistics_cache_backend
+        if not name:
+            return None
+        if name == 'memory':
+            backend = MemoryBackend(conf.api.statistics_cache_size)
+        elif name == 'memcached':
+            backend = MemcachedBackend(conf.api.memcached_servers)
+        else:
+            raise RuntimeError('Unknown statistics cache backend %s' % name)
+        return cls(backend, conf.api.ingestion_lag)
+
+    @staticmethod
+    def _key(sample_filter, period, groupby):
+        def _isotime(t):
+            return t and timeutils.isotime(t, subsecond=True)
+        key = (sample_filter.meter,
+               sample_filter.user,
+               sample_filter.project,
+               sample_filter.resource,
+               sample_filter.source,
+               _isotime(sample_filter.start),
+               sample_filter.start_timestamp_op,
+               _isotime(sample_filter.end),
+               sample_filter.end_timestamp_op,
+               sorted(sample_filter.metaquery.items()),
+               period,
+               groupby and list(groupby))
+        # memcached keys cannot hold spaces nor exceed 250 characters
+        return 'ceilometer-statistics-%s' % hashlib.md5(
+            repr(key)).hexdigest()
+
+    def _closed_until(self, sample_filter, period):
+        """Return the time up to which the statistics are final.
+
+        None is returned if nothing can be cached, datetime.max if the
+        whole query is closed.
+        """
+        cutoff = timeutils.utcnow() - self.ingestion_lag
+        if sample_filter.end and sample_filter.end <= cutoff:
+            return datetime.datetime.max
+        # Periods are aligned on the start of the query, or on the
+        # first sample found if it has none which may change over time.
+        if not period or not sample_filter.start:
+            return None
+        if cutoff <= sample_filter.start:
+            return sample_filter.start
+        closed = timeutils.delta_seconds(sample_filter.start, cutoff)
+        return sample_filter.start + datetime.timedelta(
+            seconds=int(closed // period) * period)
+
+    def get_meter_statistics(self, conn, sample_filter, period=None,
+                             groupby=None):
+        """Return the statistics as conn.get_meter_statistics() does."""
+        closed_until = self._closed_until(sample_filter, period)
+        if closed_until is None:
+            return list(conn.get_meter_statistics(sample_filter, period,
+                                                  groupby))
+
+        key = self._key(sample_filter, period, groupby)
+        cached = self.backend.get(key)
+        if cached is not None:
+            cached_until, stats = cached
+            if cached_until == datetime.datetime.max:
+                return stats
+            LOG.debug('statistics cached until %s', cached_until)
+            open_filter = copy.copy(sample_filter)
+            open_filter.start = cached_until
+            open_filter.start_timestamp_op = 'ge'
+            stats = stats + list(conn.get_meter_statistics(open_filter,
+                                                           period, groupby))
+        else:
+            cached_until = None
+            stats = list(conn.get_meter_statistics(sample_filter, period,
+                                                   groupby))
+
+        if closed_until != cached_until:
+            if closed_until == datetime.datetime.max:
+                closed = stats
+            else:
+                closed = [s for s in stats if s.period_end <= closed_until]
+            self.backend.set(key, (closed_until, closed))
+        return stats
@@ -28,13 +28,19 @@
 # [GET   ] /meters -- list the meters
 # [POST  ] /meters -- insert a new sample (and meter/resource if needed)
 # [GET   ] /meters/<meter> -- list the samples for this meter
+# [GET   ] /meters/<meter>/latest -- the latest sample of each resource
 # [PUT   ] /meters/<meter> -- update the meter (not the samples)
 # [DELETE] /meters/<meter> -- delete the meter and samples
+# [POST  ] /samples -- queue samples of any meter for publication
 #
 import ast
 import datetime
+import hashlib
 import inspect
+import json
 import uuid
+
+import msgpack
 import pecan
 from pecan import rest
 
@@ -51,6 +57,7 @@ from ceilometer import sample
 from ceilometer import storage
 from ceilometer import utils
 from ceilometer.api import acl
+from ceilometer.api import ingest
 
 
 LOG = log.getLogger(__name__)
@@ -58,6 +65,12 @@ LOG = log.getLogger(__name__)
 
 operation_kind = wtypes.Enum(str, 'lt', 'le', 'eq', 'ne', 'ge', 'gt')
 
+# The encoder WSME uses, with the C speedups of the json module
+_JSON_ENCODER = json.JSONEncoder()
+
+# Number of items encoded in each chunk of a JSON stream
+_JSON_STREAM_CHUNK = 100
+
 
 class _Base(wtypes.Base):
 
@@ -69,6 +82,22 @@ class _Base(wtypes.Base):
     def from_db_and_links(cls, m, links):
         return cls(links=links, **(m.as_dict()))
 
+    @classmethod
+    def json_from_db_model(cls, m):
+        """Return what WSME serialises from_db_model(m) to."""
+        return cls._to_json(m.as_dict())
+
+    @classmethod
+    def _to_json(cls, values):
+        d = {}
+        for attr in wtypes.list_attributes(cls):
+            if attr.key in values:
+                value = values[attr.key]
+                if isinstance(value, datetime.datetime):
+                    value = value.isoformat()
+                d[attr.name] = value
+        return d
+
     def as_dict(self, db_model):
         valid_keys = inspect.getargspec(db_model.__init__)[0]
         if 'self' in valid_keys:
@@ -346,6 +375,79 @@ def _flatten_metadata(metadata):
     return {}
 
 
+def _list_result(cls, db_models, to_json=None, to_api=None):
+    """Return the list of API objects built from storage models.
+
+    Above [api] json_stream_threshold models, a JSON response is encoded
+    straight from the storage models and streamed by the JSONStreamHook
+    rather than going through the WSME types, and an empty list is
+    returned.
+
+    :param to_json: converts a model to what WSME serialises its API
+                    object to, cls.json_from_db_model by default
+    :param to_api: converts a model to an API object,
+                   cls.from_db_model by default
+    """
+    db_models = list(db_models)
+    threshold = pecan.request.cfg.api.json_stream_threshold
+    if (0 <= threshold < len(db_models) and
+            pecan.request.pecan['content_type'] == 'application/json'):
+        # Convert everything now, the stream is consumed once the
+        # request and its storage connection are gone.
+        items = map(to_json or cls.json_from_db_model, db_models)
+        pecan.request.json_stream = _iter_json(items)
+        return []
+    return map(to_api or cls.from_db_model, db_models)
+
+
+def _iter_json(items):
+    """Yield the JSON encoding of the list of items as WSME does."""
+    encode = _JSON_ENCODER.encode
+    yield '['
+    for i in xrange(0, len(items), _JSON_STREAM_CHUNK):
+        chunk = ', '.join(encode(item)
+                          for item in items[i:i + _JSON_STREAM_CHUNK])
+        yield chunk if i == 0 else ', ' + chunk
+    yield ']'
+
+
+def _not_modified(sample_filter):
+    """Set the HTTP caching headers of a query over final samples.
+
+    The result of a query ending more than [api] ingestion_lag seconds
+    ago cannot change anymore, so its ETag is derived from the query
+    itself and a client already having it is answered with 304 Not
+    Modified by the NotModifiedHook, without querying the storage.
+
+    :return: True if the result the client has is still valid
+    """
+    conf = pecan.request.cfg.api
+    if not sample_filter.end or conf.http_cache_max_age < 0:
+        return False
+    final = sample_filter.end + datetime.timedelta(seconds=conf.ingestion_lag)
+    if final > timeutils.utcnow():
+        return False
+
+    request = pecan.request
+    response = pecan.response
+    response.etag = hashlib.md5('%s %s %s' % (
+        request.path_qs,
+        request.pecan['content_type'],
+        acl.get_limited_to_project(request.headers))).hexdigest()
+    response.last_modified = final
+    response.cache_control.max_age = conf.http_cache_max_age
+    # The result depends on the project the token is limited to
+    response.vary = ('Accept', 'X-Auth-Token')
+
+    if 'If-None-Match' in request.headers:
+        request.not_modified = response.etag in request.if_none_match
+    else:
+        request.not_modified = bool(
+            request.if_modified_since and
+            timeutils.normalize_time(request.if_modified_since) >= final)
+    return request.not_modified
+
+
 def _make_link(rel_name, url, type, type_arg, query=None):
     query_str = ''
     if query:
@@ -416,6 +518,15 @@ class Sample(_Base):
         if self.resource_metadata in (wtypes.Unset, None):
             self.resource_metadata = {}
 
+    @classmethod
+    def json_from_db_model(cls, m):
+        values = m.as_dict()
+        if values.get('counter_volume') is not None:
+            values['counter_volume'] = float(values['counter_volume'])
+        values['resource_metadata'] = _flatten_metadata(
+            values.get('resource_metadata'))
+        return cls._to_json(values)
+
     @classmethod
     def sample(cls):
         return cls(source='openstack',
@@ -433,6 +544,10 @@ class Sample(_Base):
                    )
 
 
+# The fields the samples can be grouped by when computing statistics
+STATISTICS_GROUPBY_FIELDS = ('user_id', 'project_id', 'resource_id', 'source')
+
+
 class Statistics(_Base):
     """Computed statistics for a query.
     """
@@ -473,6 +588,9 @@ class Statistics(_Base):
     period_end = datetime.datetime
     "UTC date and time of the period end"
 
+    groupby = {wtypes.text: wtypes.text}
+    "The values of the fields the samples are grouped by"
+
     def __init__(self, start_timestamp=None, end_timestamp=None, **kwds):
         super(Statistics, self).__init__(**kwds)
         self._update_duration(start_timestamp, end_timestamp)
@@ -525,11 +643,66 @@ class Statistics(_Base):
                    )
 
 
+class MeterStatistics(Statistics):
+    """Computed statistics of one of the meters of a query.
+    """
+
+    meter = wtypes.text
+    "The name of the meter"
+
+    @classmethod
+    def sample(cls):
+        sample = super(MeterStatistics, cls).sample()
+        sample.meter = 'volume.size'
+        return sample
+
+
+def _check_statistics_args(groupby, period):
+    if period and period < 0:
+        error = _("Period must be positive.")
+        pecan.response.translatable_error = error
+        raise wsme.exc.ClientSideError(error)
+    for field in groupby:
+        if field not in STATISTICS_GROUPBY_FIELDS:
+            error = _("Unable to group by %s") % field
+            pecan.response.translatable_error = error
+            raise wsme.exc.InvalidInput('groupby', field, error)
+
+
+def _compute_statistics(compute, *args):
+    """Return the list of the statistics computed by the storage driver.
+
+    The drivers do not support every grouping, which is a client error
+    rather than a server one.
+    """
+    try:
+        return list(compute(*args))
+    except NotImplementedError as err:
+        error = _("Unable to compute these statistics with this storage "
+                  "driver: %s") % err
+        pecan.response.translatable_error = error
+        raise wsme.exc.ClientSideError(unicode(error))
+
+
+def _get_query_timestamp_range(q):
+    """Return the original start and end timestamps of the query, used to
+    clamp the duration returned in the statistics.
+    """
+    start = end = None
+    for i in q:
+        if i.field == 'timestamp' and i.op in ('lt', 'le'):
+            end = timeutils.parse_isotime(i.value).replace(tzinfo=None)
+        elif i.field == 'timestamp' and i.op in ('gt', 'ge'):
+            start = timeutils.parse_isotime(i.value).replace(tzinfo=None)
+    return start, end
+
+
 class MeterController(rest.RestController):
     """Manages operations on a single meter.
     """
     _custom_actions = {
         'statistics': ['GET'],
+        'latest': ['GET'],
     }
 
     def __init__(self, meter_id):
@@ -548,9 +721,22 @@ class MeterController(rest.RestController):
         kwargs = _query_to_kwargs(q, storage.SampleFilter.__init__)
         kwargs['meter'] = self._id
         f = storage.SampleFilter(**kwargs)
-        return [Sample.from_db_model(e)
-                for e in pecan.request.storage_conn.get_samples(f, limit=limit)
-                ]
+        if _not_modified(f):
+            return []
+        return _list_result(
+            Sample, pecan.request.storage_conn.get_samples(f, limit=limit))
+
+    @wsme_pecan.wsexpose([Sample], [Query])
+    def latest(self, q=[]):
+        """Return the latest sample of the meter of each resource.
+
+        :param q: Filter rules for the resources and their samples.
+        """
+        kwargs = _query_to_kwargs(q, storage.SampleFilter.__init__)
+        kwargs['meter'] = self._id
+        f = storage.SampleFilter(**kwargs)
+        return _list_result(
+            Sample, pecan.request.storage_conn.get_latest_samples(f))
 
     @wsme.validate([Sample])
     @wsme_pecan.wsexpose([Sample], body=[Sample])
@@ -617,32 +803,33 @@ class MeterController(rest.RestController):
         # a list of message_ids).
         return samples
 
-    @wsme_pecan.wsexpose([Statistics], [Query], int)
-    def statistics(self, q=[], period=None):
+    @wsme_pecan.wsexpose([Statistics], [Query], [unicode], int)
+    def statistics(self, q=[], groupby=[], period=None):
         """Computes the statistics of the samples in the time range given.
 
         :param q: Filter rules for the data to be returned.
+        :param groupby: Fields for group by aggregation
         :param period: Returned result will be an array of statistics for a
                        period long of that number of seconds.
         """
-        if period and period < 0:
-            error = _("Period must be positive.")
-            pecan.response.translatable_error = error
-            raise wsme.exc.ClientSideError(error)
+        _check_statistics_args(groupby, period)
 
         kwargs = _query_to_kwargs(q, storage.SampleFilter.__init__)
         kwargs['meter'] = self._id
         f = storage.SampleFilter(**kwargs)
-        computed = pecan.request.storage_conn.get_meter_statistics(f, period)
+        if _not_modified(f):
+            return []
+        statistics_cache = pecan.request.statistics_cache
+        if statistics_cache:
+            computed = _compute_statistics(
+                statistics_cache.get_meter_statistics,
+                pecan.request.storage_conn, f, period, groupby)
+        else:
+            computed = _compute_statistics(
+                pecan.request.storage_conn.get_meter_statistics,
+                f, period, groupby)
         LOG.debug('computed value coming from %r', pecan.request.storage_conn)
-        # Find the original timestamp in the query to use for clamping
-        # the duration returned in the statistics.
-        start = end = None
-        for i in q:
-            if i.field == 'timestamp' and i.op in ('lt', 'le'):
-                end = timeutils.parse_isotime(i.value).replace(tzinfo=None)
-            elif i.field == 'timestamp' and i.op in ('gt', 'ge'):
-                start = timeutils.parse_isotime(i.value).replace(tzinfo=None)
+        start, end = _get_query_timestamp_range(q)
 
         return [Statistics(start_timestamp=start,
                            end_timestamp=end,
@@ -702,8 +889,8 @@ class MetersController(rest.RestController):
         :param q: Filter rules for the meters to be returned.
         """
         kwargs = _query_to_kwargs(q, pecan.request.storage_conn.get_meters)
-        return [Meter.from_db_model(m)
-                for m in pecan.request.storage_conn.get_meters(**kwargs)]
+        return _list_result(Meter,
+                            pecan.request.storage_conn.get_meters(**kwargs))
 
 
 class Resource(_Base):
@@ -732,6 +919,13 @@ class Resource(_Base):
         metadata = _flatten_metadata(metadata)
         super(Resource, self).__init__(metadata=metadata, **kwds)
 
+    @classmethod
+    def json_from_db_and_links(cls, m, links):
+        values = m.as_dict()
+        values['metadata'] = _flatten_metadata(values.get('metadata'))
+        values['links'] = [{'href': l.href, 'rel': l.rel} for l in links]
+        return cls._to_json(values)
+
     @classmethod
     def sample(cls):
         return cls(resource_id='bd9431c1-8d69-4ad3-803a-8d4a6b89fd36',
@@ -791,11 +985,13 @@ class ResourcesController(rest.RestController):
         :param q: Filter rules for the resources to be returned.
         """
         kwargs = _query_to_kwargs(q, pecan.request.storage_conn.get_resources)
-        resources = [
-            Resource.from_db_and_links(r,
-                                       self._resource_links(r.resource_id))
-            for r in pecan.request.storage_conn.get_resources(**kwargs)]
-        return resources
+        return _list_result(
+            Resource,
+            pecan.request.storage_conn.get_resources(**kwargs),
+            to_json=lambda r: Resource.json_from_db_and_links(
+                r, self._resource_links(r.resource_id)),
+            to_api=lambda r: Resource.from_db_and_links(
+                r, self._resource_links(r.resource_id)))
 
 
 class Alarm(_Base):
@@ -1055,9 +1251,174 @@ class AlarmsController(rest.RestController):
                 for m in pecan.request.storage_conn.get_alarms(**kwargs)]
 
 
+class StatisticsController(rest.RestController):
+    """Computes the statistics of several meters at once."""
+
+    @wsme_pecan.wsexpose([MeterStatistics], [unicode], [Query], [unicode],
+                         int)
+    def get_all(self, meter=[], q=[], groupby=[], period=None):
+        """Computes the statistics of the samples of several meters in a
+        single pass over the storage.
+
+        :param meter: Names of the meters.
+        :param q: Filter rules for the samples.
+        :param groupby: Fields for group by aggregation
+        :param period: Returned result will be an array of statistics for a
+                       period long of that number of seconds for each meter.
+        """
+        if not meter:
+            raise wsme.exc.MissingArgument('meter')
+        _check_statistics_args(groupby, period)
+
+        kwargs = _query_to_kwargs(q, storage.SampleFilter.__init__)
+        f = storage.SampleFilter(**kwargs)
+        if _not_modified(f):
+            return []
+        computed = _compute_statistics(
+            pecan.request.storage_conn.get_meters_statistics,
+            f, meter, period, groupby)
+        start, end = _get_query_timestamp_range(q)
+
+        return [MeterStatistics(meter=name,
+                                start_timestamp=start,
+                                end_timestamp=end,
+                                **c.as_dict())
+                for name, c in computed]
+
+
+class SamplesController(rest.RestController):
+    """Posts samples of any meter in bulk."""
+
+    # Attributes a posted sample must have
+    REQUIRED = ('counter_name', 'counter_type', 'counter_unit',
+                'counter_volume', 'resource_id')
+
+    # Attributes which must be strings when they are set
+    STRINGS = ('counter_name', 'counter_unit', 'resource_id', 'user_id',
+               'project_id', 'source')
+
+    TYPES = (sample.TYPE_GAUGE, sample.TYPE_DELTA, sample.TYPE_CUMULATIVE)
+
+    # Number of invalid samples reported in an error
+    MAX_ERRORS = 10
+
+    @staticmethod
+    def _fault(status, error):
+        pecan.response.status = status
+        pecan.response.translatable_error = error
+        return {'faultcode': 'Client' if status < 500 else 'Server',
+                'faultstring': unicode(error),
+                'debuginfo': None}
+
+    @staticmethod
+    def _load(request):
+        if request.content_type in ('application/x-msgpack',
+                                    'application/msgpack'):
+            return msgpack.loads(request.body, encoding='utf-8')
+        return json.loads(request.body)
+
+    def _convert(self, body):
+        """Validate the posted samples and return them as sample.Sample,
+        or the list of the errors found.
+        """
+        now = timeutils.utcnow().isoformat()
+        auth_project = acl.get_limited_to_project(pecan.request.headers)
+        def_source = pecan.request.cfg.sample_source
+        def_project_id = pecan.request.headers.get('X-Project-Id')
+        def_user_id = pecan.request.headers.get('X-User-Id')
+
+        samples = []
+        errors = []
+        for i, s in enumerate(body):
+            if not isinstance(s, dict):
+                errors.append('%d: not an object' % i)
+                continue
+            missing = [a for a in self.REQUIRED if s.get(a) is None]
+            if missing:
+                errors.append('%d: missing %s' % (i, ', '.join(missing)))
+                continue
+            invalid = [a for a in self.STRINGS
+                       if s.get(a) is not None and
+                       not isinstance(s[a], basestring)]
+            if not isinstance(s.get('resource_metadata') or {}, dict):
+                invalid.append('resource_metadata')
+            if invalid:
+                errors.append('%d: invalid %s' % (i, ', '.join(invalid)))
+                continue
+            if s.get('message_id'):
+                errors.append('%d: the message_id must not be set' % i)
+                continue
+            if s['counter_type'] not in self.TYPES:
+                errors.append('%d: invalid counter_type' % i)
+                continue
+            try:
+                volume = float(s['counter_volume'])
+                timestamp = s.get('timestamp')
+                if timestamp:
+                    timestamp = timeutils.normalize_time(
+                        timeutils.parse_isotime(timestamp)).isoformat()
+            except (ValueError, TypeError):
+                errors.append('%d: invalid counter_volume or timestamp' % i)
+                continue
+            project_id = s.get('project_id') or def_project_id
+            if auth_project and auth_project != project_id:
+                errors.append('%d: can not post samples to other projects'
+                              % i)
+                continue
+            samples.append(sample.Sample(
+                name=s['counter_name'],
+                type=s['counter_type'],
+                unit=s['counter_unit'],
+                volume=volume,
+                user_id=s.get('user_id') or def_user_id,
+                project_id=project_id,
+                resource_id=s['resource_id'],
+                timestamp=timestamp or now,
+                resource_metadata=s.get('resource_metadata') or {},
+                source='%s:%s' % (project_id,
+                                  s.get('source') or def_source)))
+        return samples, errors
+
+    @pecan.expose('json')
+    def post(self):
+        """Queue samples of any meter for publication.
+
+        The body is a JSON, or msgpack, list of samples with the
+        attributes of the Sample type. They are validated and queued all
+        together, then published in the background: the response is 202
+        Accepted with the list of the message ids of the samples.
+        """
+        try:
+            body = self._load(pecan.request)
+        except Exception:
+            return self._fault(400, _("Unable to decode the samples."))
+        if not isinstance(body, list):
+            return self._fault(400, _("A list of samples is expected."))
+
+        samples, errors = self._convert(body)
+        if errors:
+            return self._fault(
+                400, _("Invalid samples: %s") %
+                '; '.join(errors[:self.MAX_ERRORS]))
+
+        try:
+            pecan.request.sample_queue.put(samples)
+        except ingest.BatchTooLarge as err:
+            return self._fault(413, _("At most %d samples can be posted "
+                                      "at once.") % err.maxsize)
+        except ingest.QueueFull:
+            pecan.response.headers['Retry-After'] = '1'
+            return self._fault(503, _("Too many samples are waiting to be "
+                                      "published, retry later."))
+        pecan.response.status = 202
+        return [s.id for s in samples]
+
+
 class V2Controller(object):
     """Version 2 API controller root."""
 
     resources = ResourcesController()
     meters = MetersController()
+    statistics = StatisticsController()
+    samples = SamplesController()
     alarms = AlarmsController()
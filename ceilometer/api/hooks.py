@@ -19,9 +19,15 @@
 
 import threading
 from oslo.config import cfg
+import pecan
 from pecan import hooks
+from webob import exc
+import wsme
 
+from ceilometer.api import cache
+from ceilometer.api import ingest
 from ceilometer import pipeline
+from ceilometer import storage
 from ceilometer import transformer
 
 
@@ -35,22 +41,74 @@ class ConfigHook(hooks.PecanHook):
 
 
 class DBHook(hooks.PecanHook):
+    """Check out a storage connection from the pool for each request.
 
-    def __init__(self, storage_engine, storage_connection):
-        self.storage_engine = storage_engine
-        self.storage_connection = storage_connection
+    The connection is not reused if the request failed with an error
+    other than an HTTP or client one, which may come from the storage.
+    """
+
+    def __init__(self, storage_pool):
+        self.storage_pool = storage_pool
+        self.storage_engine = storage_pool.engine
 
     def before(self, state):
         state.request.storage_engine = self.storage_engine
-        state.request.storage_conn = self.storage_connection
+        try:
+            state.request.storage_conn = self.storage_pool.get()
+        except storage.ConnectionPoolTimeout as err:
+            pecan.abort(503, unicode(err))
+
+    def on_error(self, state, e):
+        if not isinstance(e, (exc.HTTPException, wsme.exc.ClientSideError)):
+            state.request.storage_failed = True
+
+    def after(self, state):
+        conn = getattr(state.request, 'storage_conn', None)
+        if conn is not None:
+            self.storage_pool.put(
+                conn,
+                healthy=not getattr(state.request, 'storage_failed', False))
+            state.request.storage_conn = None
+
+
+class StatisticsCacheHook(hooks.PecanHook):
+    """Attach the statistics cache, None if disabled, to the request."""
+
+    def __init__(self):
+        self.statistics_cache = cache.StatisticsCache.from_conf(cfg.CONF)
+
+    def before(self, state):
+        state.request.statistics_cache = self.statistics_cache
+
+
+class JSONStreamHook(hooks.PecanHook):
+    """Send the JSON stream a controller prepared as the response body."""
+
+    def after(self, state):
+        stream = getattr(state.request, 'json_stream', None)
+        if stream is not None:
+            state.response.app_iter = stream
+
+
+class NotModifiedHook(hooks.PecanHook):
+    """Answer 304 Not Modified when a controller found that the client
+    already has the result of the request.
+    """
+
+    def after(self, state):
+        if getattr(state.request, 'not_modified', False):
+            state.response.status = 304
+            state.response.body = ''
 
 
 class PipelineHook(hooks.PecanHook):
     '''Create and attach a pipeline to the request so that
-    new samples can be posted via the /v2/meters/ API.
+    new samples can be posted via the /v2/meters/ API, along with
+    the queue of the samples posted via the /v2/samples API.
     '''
 
     pipeline_manager = None
+    sample_queue = None
 
     def __init__(self):
         if self.__class__.pipeline_manager is None:
@@ -59,9 +117,12 @@ class PipelineHook(hooks.PecanHook):
             self.__class__.pipeline_manager = pipeline.setup_pipeline(
                 transformer.TransformerExtensionManager(
                     'ceilometer.transformer'))
+            self.__class__.sample_queue = ingest.SampleQueue(
+                self.pipeline_manager, cfg.CONF.api.sample_queue_size)
 
     def before(self, state):
         state.request.pipeline_manager = self.pipeline_manager
+        state.request.sample_queue = self.sample_queue
 
 
 class TranslationHook(hooks.PecanHook):
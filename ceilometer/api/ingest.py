@@ -0,0 +1,98 @@
+# -*- encoding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Publish the samples posted to the API in the background.
+"""
+
+import eventlet
+from eventlet import queue
+
+from ceilometer.openstack.common import context
+from ceilometer.openstack.common.gettextutils import _
+from ceilometer.openstack.common import log
+
+LOG = log.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    pass
+
+
+class BatchTooLarge(Exception):
+    """The samples can never fit in the queue, even once it is empty."""
+
+    def __init__(self, maxsize):
+        super(BatchTooLarge, self).__init__(maxsize)
+        self.maxsize = maxsize
+
+
+class SampleQueue(object):
+    """A bounded queue of samples published by a green thread.
+
+    The samples are published in batches of up to batch_size through
+    the pipelines, so that a post is acknowledged without waiting for
+    the transformers and the publishers.
+
+    :param pipeline_manager: the pipelines to publish the samples to
+    :param size: number of samples queued at most
+    :param batch_size: number of samples published at once at most
+    """
+
+    def __init__(self, pipeline_manager, size, batch_size=100):
+        self.pipeline_manager = pipeline_manager
+        self.batch_size = batch_size
+        self._queue = queue.Queue(size if size > 0 else None)
+        self._consumer = None
+
+    def put(self, samples):
+        """Queue all the samples or none of them.
+
+        :raises BatchTooLarge: if there are more samples than the queue
+                               can hold
+        :raises QueueFull: if there is no room left for all of them
+        """
+        maxsize = self._queue.maxsize
+        if maxsize is not None and len(samples) > maxsize:
+            raise BatchTooLarge(maxsize)
+        # Nothing yields between the check and the puts
+        if (maxsize is not None and
+                self._queue.qsize() + len(samples) > maxsize):
+            raise QueueFull()
+        for s in samples:
+            self._queue.put_nowait(s)
+        if self._consumer is None:
+            self._consumer = eventlet.spawn(self._run)
+
+    def join(self):
+        """Wait for all the queued samples to be published."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            samples = [self._queue.get()]
+            while len(samples) < self.batch_size:
+                try:
+                    samples.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self.pipeline_manager.publisher(
+                        context.get_admin_context()) as publisher:
+                    publisher(samples)
+            except Exception:
+                LOG.exception(_('Unable to publish %d posted samples'),
+                              len(samples))
+            finally:
+                for s in samples:
+                    self._queue.task_done()
@@ -51,12 +51,21 @@ def make_app(conf, enable_acl=True, attach_storage=True,
         flask.request.sources = sources
 
     if attach_storage:
+        storage_pool = storage.ConnectionPool(conf)
+
         @app.before_request
         def attach_storage():
-            storage_engine = storage.get_engine(conf)
-            flask.request.storage_engine = storage_engine
-            flask.request.storage_conn = \
-                storage_engine.get_connection(conf)
+            flask.request.storage_engine = storage_pool.engine
+            try:
+                flask.request.storage_conn = storage_pool.get()
+            except storage.ConnectionPoolTimeout as err:
+                flask.abort(503, unicode(err))
+
+        @app.teardown_request
+        def detach_storage(exc):
+            conn = getattr(flask.request, 'storage_conn', None)
+            if conn is not None:
+                storage_pool.put(conn, healthy=exc is None)
 
     # Install the middleware wrapper
     if enable_acl:
@@ -16,16 +16,27 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+from keystoneclient import exceptions as ks_exceptions
 from keystoneclient.v2_0 import client as ksclient
 from oslo.config import cfg
 from stevedore import extension
 
 from ceilometer import agent
+from ceilometer.central import plugin
 from ceilometer.openstack.common import log
 from ceilometer.openstack.common import service as os_service
 from ceilometer.openstack.common.rpc import service as rpc_service
+from ceilometer.openstack.common import timeutils
 from ceilometer import service
 
+OPTS = [
+    cfg.IntOpt('keystone_token_stale_time',
+               default=300,
+               help='Time in seconds before the expiry of its Keystone '
+                    'token at which the central agent requests a new one'),
+]
+
+cfg.CONF.register_opts(OPTS)
 cfg.CONF.import_group('service_credentials', 'ceilometer.service')
 
 LOG = log.getLogger(__name__)
@@ -38,7 +49,13 @@ class PollingTask(agent.PollingTask):
             # TODO(yjiang5) passing samples into get_samples to avoid
             # polling all counters one by one
             cache = {}
+            keystone = self.manager.keystone
             for pollster in self.pollsters:
+                if self.manager.keystone is not keystone:
+                    LOG.warning('Skipping the remaining pollsters until '
+                                'the agent authenticates again')
+                    break
+                start = timeutils.utcnow()
                 try:
                     LOG.info("Polling pollster %s", pollster.name)
                     samples = list(pollster.obj.get_samples(
@@ -50,6 +67,23 @@ class PollingTask(agent.PollingTask):
                     LOG.warning('Continue after error from %s: %s',
                                 pollster.name, err)
                     LOG.exception(err)
+                    if _is_unauthorized(err):
+                        self.manager.reset_keystone()
+                finally:
+                    self.record_duration(pollster, start)
+
+
+def _is_unauthorized(err):
+    """Tell whether an error of a pollster is a rejected token.
+
+    The clients of the services raise their own exceptions, which carry
+    the HTTP status in one attribute or another.
+    """
+    if isinstance(err, (ks_exceptions.Unauthorized,
+                        ks_exceptions.AuthorizationFailure)):
+        return True
+    return any(getattr(err, attr, None) == 401
+               for attr in ('http_status', 'code', 'status'))
 
 
 class AgentManager(agent.AgentManager):
@@ -61,18 +95,36 @@ class AgentManager(agent.AgentManager):
                 invoke_on_load=True,
             )
         )
+        self.keystone = None
 
     def create_polling_task(self):
         return PollingTask(self)
 
+    def reset_keystone(self):
+        """Drop the token and the clients built for it, so that the next
+        polling cycle authenticates again.
+        """
+        LOG.warning('The Keystone token was rejected, the agent will '
+                    'authenticate again')
+        self.keystone = None
+        plugin.clear_clients()
+
+    def _token_expires_soon(self):
+        auth_ref = getattr(self.keystone, 'auth_ref', None)
+        return (auth_ref is None or
+                auth_ref.will_expire_soon(cfg.CONF.keystone_token_stale_time))
+
     def interval_task(self, task):
-        self.keystone = ksclient.Client(
-            username=cfg.CONF.service_credentials.os_username,
-            password=cfg.CONF.service_credentials.os_password,
-            tenant_id=cfg.CONF.service_credentials.os_tenant_id,
-            tenant_name=cfg.CONF.service_credentials.os_tenant_name,
-            cacert=cfg.CONF.service_credentials.os_cacert,
-            auth_url=cfg.CONF.service_credentials.os_auth_url)
+        # The token is shared by the polling cycles until it is about to
+        # expire, rather than requested again for each of them.
+        if self._token_expires_soon():
+            self.keystone = ksclient.Client(
+                username=cfg.CONF.service_credentials.os_username,
+                password=cfg.CONF.service_credentials.os_password,
+                tenant_id=cfg.CONF.service_credentials.os_tenant_id,
+                tenant_name=cfg.CONF.service_credentials.os_tenant_name,
+                cacert=cfg.CONF.service_credentials.os_cacert,
+                auth_url=cfg.CONF.service_credentials.os_auth_url)
 
         super(AgentManager, self).interval_task(task)
 
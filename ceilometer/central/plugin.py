@@ -18,8 +18,43 @@
 """Base class for plugins used by the central agent.
 """
 
+from oslo.config import cfg
+
 from ceilometer import plugin
 
+cfg.CONF.import_group('service_credentials', 'ceilometer.service')
+
+# The (endpoint, token) and the client built for them, by service type
+_CLIENTS = {}
+
+
+def get_client(ksclient, service_type, factory):
+    """Return a client of a service for the current token of ksclient.
+
+    The client is shared by all the pollsters of the service, and kept
+    across polling cycles so that it can reuse its connections, until
+    the endpoint or the token change.
+
+    :param ksclient: the keystone client of the central agent
+    :param service_type: the type of the service in the catalog
+    :param factory: callable building the client from the endpoint and
+                    the token
+    """
+    endpoint = ksclient.service_catalog.url_for(
+        service_type=service_type,
+        endpoint_type=cfg.CONF.service_credentials.os_endpoint_type)
+    key = (endpoint, ksclient.auth_token)
+    cached = _CLIENTS.get(service_type)
+    if cached is None or cached[0] != key:
+        cached = (key, factory(endpoint, ksclient.auth_token))
+        _CLIENTS[service_type] = cached
+    return cached[1]
+
+
+def clear_clients():
+    """Forget the clients of the services, for a new token."""
+    _CLIENTS.clear()
+
 
 class CentralPollster(plugin.PollsterBase):
     """Base class for plugins that support the polling API."""
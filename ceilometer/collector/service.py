@@ -88,10 +88,12 @@ class UDPCollectorService(os_service.Service):
                 LOG.warn(_("UDP: Cannot decode data sent by %s"), str(source))
             else:
                 try:
-                    counter['counter_name'] = counter['name']
-                    counter['counter_volume'] = counter['volume']
-                    counter['counter_unit'] = counter['unit']
-                    counter['counter_type'] = counter['type']
+                    if 'counter_name' not in counter:
+                        # Sample.as_dict() format sent by older agents
+                        counter['counter_name'] = counter['name']
+                        counter['counter_volume'] = counter['volume']
+                        counter['counter_unit'] = counter['unit']
+                        counter['counter_type'] = counter['type']
                     LOG.debug("UDP: Storing %s", str(counter))
                     self.storage_conn.record_metering_data(counter)
                 except Exception as err:
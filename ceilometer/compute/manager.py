@@ -16,44 +16,122 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import functools
+
+import eventlet
 from oslo.config import cfg
 from stevedore import extension
 
 from ceilometer import agent
+from ceilometer.compute.pollsters import util
 from ceilometer.compute.virt import inspector as virt_inspector
 from ceilometer import nova_client
 from ceilometer.openstack.common import log
 from ceilometer.openstack.common import service as os_service
+from ceilometer.openstack.common import timeutils
 from ceilometer.openstack.common.rpc import service as rpc_service
 from ceilometer import service
 
+OPTS = [
+    cfg.IntOpt('polling_workers',
+               default=1,
+               help='Number of instances the compute agent polls '
+                    'concurrently'),
+    cfg.FloatOpt('instance_polling_timeout',
+                 default=0.0,
+                 help='Time in seconds allowed to poll all the pollsters '
+                      'of an instance, 0 means no limit'),
+    cfg.StrOpt('instance_discovery',
+               default='nova',
+               help="How the compute agent discovers the instances to "
+                    "poll: 'nova' asks the Nova API at every polling "
+                    "interval, 'local' lists the instances running on the "
+                    "hypervisor and only asks Nova for their metadata when "
+                    "they change"),
+    cfg.IntOpt('instance_metadata_refresh_interval',
+               default=600,
+               help='Maximum age in seconds of the instance metadata '
+                    'obtained from Nova when using the local instance '
+                    'discovery'),
+]
+
+cfg.CONF.register_opts(OPTS)
+
 LOG = log.getLogger(__name__)
 
 
 class PollingTask(agent.PollingTask):
-    def poll_and_publish_instances(self, instances):
+    def _poll_instance(self, instance, samples, domain_stats):
+        cache = {}
+        if domain_stats is not None:
+            cache['domain_stats'] = domain_stats
+        for pollster in self.pollsters:
+            start = timeutils.utcnow()
+            try:
+                LOG.info("Polling pollster %s", pollster.name)
+                samples.extend(list(pollster.obj.get_samples(
+                    self.manager,
+                    cache,
+                    instance,
+                )))
+            except Exception as err:
+                LOG.warning('Continue after error from %s: %s',
+                            pollster.name, err)
+                LOG.exception(err)
+            finally:
+                self.record_duration(pollster, start)
+
+    def poll_instance(self, instance, domain_stats=None):
+        """Return the samples of all the pollsters for an instance.
+
+        The samples already collected are returned if the polling of
+        the instance takes longer than instance_polling_timeout.
+
+        :param domain_stats: the DomainStats of the instances of the host
+                             keyed by instance name, if already inspected
+        """
+        samples = []
+        timeout = cfg.CONF.instance_polling_timeout or None
+        try:
+            with eventlet.Timeout(timeout):
+                self._poll_instance(instance, samples, domain_stats)
+        except eventlet.Timeout:
+            LOG.warning('Polling of instance %s timed out after %ss',
+                        getattr(instance, 'name', instance), timeout)
+        return samples
+
+    def poll_and_publish_instances(self, instances, domain_stats=None):
+        instances = [instance for instance in instances
+                     if getattr(instance, 'OS-EXT-STS:vm_state',
+                                None) != 'error']
+        pool = eventlet.GreenPool(max(cfg.CONF.polling_workers, 1))
+        samples = []
+        for instance_samples in pool.imap(
+                functools.partial(self.poll_instance,
+                                  domain_stats=domain_stats),
+                instances):
+            samples.extend(instance_samples)
         with self.publish_context as publisher:
-            for instance in instances:
-                if getattr(instance, 'OS-EXT-STS:vm_state', None) == 'error':
-                    continue
-                cache = {}
-                for pollster in self.pollsters:
-                    try:
-                        LOG.info("Polling pollster %s", pollster.name)
-                        samples = list(pollster.obj.get_samples(
-                            self.manager,
-                            cache,
-                            instance,
-                        ))
-                        publisher(samples)
-                    except Exception as err:
-                        LOG.warning('Continue after error from %s: %s',
-                                    pollster.name, err)
-                        LOG.exception(err)
+            publisher(samples)
+
+    def _inspect_all_domains(self):
+        """Return the DomainStats of all the instances of the host, or
+        None if no pollster needs them or they cannot be inspected at
+        once.
+        """
+        if not any(getattr(pollster.obj, 'inspects_domain', False)
+                   for pollster in self.pollsters):
+            return None
+        try:
+            return self.manager.inspector.inspect_all_domain_stats()
+        except Exception as err:
+            LOG.warning('Unable to inspect all the instances at once, '
+                        'inspecting them one by one: %s', err)
 
     def poll_and_publish(self):
-        self.poll_and_publish_instances(
-            self.manager.nv.instance_get_all_by_host(cfg.CONF.host))
+        instances = self.manager.discover_instances()
+        self.poll_and_publish_instances(instances,
+                                        self._inspect_all_domains())
 
 
 class AgentManager(agent.AgentManager):
@@ -67,10 +145,53 @@ class AgentManager(agent.AgentManager):
         )
         self._inspector = virt_inspector.get_hypervisor_inspector()
         self.nv = nova_client.Client()
+        # Instances of the host known by Nova, keyed by instance name,
+        # and the local instance names they were last refreshed for
+        self._instances = {}
+        self._local_names = None
+        self._instances_refreshed = None
 
     def create_polling_task(self):
         return PollingTask(self)
 
+    def _refresh_instances(self, local_names):
+        if (local_names == self._local_names and
+                not timeutils.is_older_than(
+                    self._instances_refreshed,
+                    cfg.CONF.instance_metadata_refresh_interval)):
+            return
+        try:
+            instances = self.nv.instance_get_all_by_host(cfg.CONF.host)
+        except Exception as err:
+            LOG.warning('Unable to refresh the instances from Nova, '
+                        'using the previous ones: %s', err)
+            return
+        self._instances = dict((util.instance_name(instance), instance)
+                               for instance in instances)
+        self._local_names = local_names
+        self._instances_refreshed = timeutils.utcnow()
+
+    def discover_instances(self):
+        """Return the instances of the host to poll.
+
+        With the local instance discovery the instances are listed by
+        the hypervisor inspector, and Nova is only asked for their
+        metadata when they changed or when it is older than
+        instance_metadata_refresh_interval.
+        """
+        if cfg.CONF.instance_discovery != 'local':
+            return self.nv.instance_get_all_by_host(cfg.CONF.host)
+        try:
+            names = [instance.name
+                     for instance in self.inspector.inspect_instances()]
+        except Exception as err:
+            LOG.warning('Unable to list the local instances, '
+                        'asking Nova: %s', err)
+            return self.nv.instance_get_all_by_host(cfg.CONF.host)
+        self._refresh_instances(frozenset(names))
+        return [self._instances[name] for name in names
+                if name in self._instances]
+
     def setup_notifier_task(self):
         """For nova notifier usage."""
         task = PollingTask(self)
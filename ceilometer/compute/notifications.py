@@ -73,71 +73,6 @@ class ComputeInstanceNotificationBase(ComputeNotificationBase):
     event_types = ['compute.instance.*']
 
 
-class Instance(ComputeInstanceNotificationBase):
-    def process_notification(self, message):
-        yield sample.Sample.from_notification(
-            name='instance',
-            type=sample.TYPE_GAUGE,
-            unit='instance',
-            volume=1,
-            user_id=message['payload']['user_id'],
-            project_id=message['payload']['tenant_id'],
-            resource_id=message['payload']['instance_id'],
-            message=message)
-
-
-class Memory(ComputeInstanceNotificationBase):
-    def process_notification(self, message):
-        yield sample.Sample.from_notification(
-            name='memory',
-            type=sample.TYPE_GAUGE,
-            unit='MB',
-            volume=message['payload']['memory_mb'],
-            user_id=message['payload']['user_id'],
-            project_id=message['payload']['tenant_id'],
-            resource_id=message['payload']['instance_id'],
-            message=message)
-
-
-class VCpus(ComputeInstanceNotificationBase):
-    def process_notification(self, message):
-        yield sample.Sample.from_notification(
-            name='vcpus',
-            type=sample.TYPE_GAUGE,
-            unit='vcpu',
-            volume=message['payload']['vcpus'],
-            user_id=message['payload']['user_id'],
-            project_id=message['payload']['tenant_id'],
-            resource_id=message['payload']['instance_id'],
-            message=message)
-
-
-class RootDiskSize(ComputeInstanceNotificationBase):
-    def process_notification(self, message):
-        yield sample.Sample.from_notification(
-            name='disk.root.size',
-            type=sample.TYPE_GAUGE,
-            unit='GB',
-            volume=message['payload']['root_gb'],
-            user_id=message['payload']['user_id'],
-            project_id=message['payload']['tenant_id'],
-            resource_id=message['payload']['instance_id'],
-            message=message)
-
-
-class EphemeralDiskSize(ComputeInstanceNotificationBase):
-    def process_notification(self, message):
-        yield sample.Sample.from_notification(
-            name='disk.ephemeral.size',
-            type=sample.TYPE_GAUGE,
-            unit='GB',
-            volume=message['payload']['ephemeral_gb'],
-            user_id=message['payload']['user_id'],
-            project_id=message['payload']['tenant_id'],
-            resource_id=message['payload']['instance_id'],
-            message=message)
-
-
 class InstanceFlavor(ComputeInstanceNotificationBase):
     def process_notification(self, message):
         instance_type = message.get('payload', {}).get('instance_type')
@@ -161,6 +96,7 @@ class InstanceDelete(ComputeInstanceNotificationBase):
     event_types = ['compute.instance.delete.samples']
 
     def process_notification(self, message):
+        metadata = sample.Sample.notification_metadata(message)
         for s in message['payload'].get('samples', []):
             yield sample.Sample.from_notification(
                 name=s['name'],
@@ -170,4 +106,5 @@ class InstanceDelete(ComputeInstanceNotificationBase):
                 user_id=message['payload']['user_id'],
                 project_id=message['payload']['tenant_id'],
                 resource_id=message['payload']['instance_id'],
-                message=message)
+                message=message,
+                resource_metadata=metadata)
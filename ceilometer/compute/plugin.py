@@ -29,6 +29,10 @@ class ComputePollster(plugin.PollsterBase):
 
     __metaclass__ = abc.ABCMeta
 
+    # Whether the pollster reads the DomainStats of the instances, which
+    # the compute agent then inspects for the whole host at once.
+    inspects_domain = False
+
     @abc.abstractmethod
     def get_samples(self, manager, cache, instance):
         """Return a sequence of Counter instances from polling the resources.
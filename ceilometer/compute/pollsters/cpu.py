@@ -28,11 +28,16 @@ LOG = log.getLogger(__name__)
 
 class CPUPollster(plugin.ComputePollster):
 
+    inspects_domain = True
+
     def get_samples(self, manager, cache, instance):
         LOG.info('checking instance %s', instance.id)
         instance_name = util.instance_name(instance)
         try:
-            cpu_info = manager.inspector.inspect_cpus(instance_name)
+            cpu_info = util.get_domain_stats(manager.inspector, cache,
+                                             instance_name).cpu
+            if cpu_info is None:
+                return
             LOG.info("CPUTIME USAGE: %s %d",
                      instance.__dict__, cpu_info.time)
             cpu_num = {'cpu_number': cpu_info.number}
@@ -43,6 +48,7 @@ class CPUPollster(plugin.ComputePollster):
                 unit='ns',
                 volume=cpu_info.time,
                 additional_metadata=cpu_num,
+                cache=cache,
             )
         except Exception as err:
             LOG.error('could not get CPU time for %s: %s',
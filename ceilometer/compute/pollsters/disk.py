@@ -37,6 +37,8 @@ DiskIOData = collections.namedtuple(
 
 class _Base(plugin.ComputePollster):
 
+    inspects_domain = True
+
     DISKIO_USAGE_MESSAGE = ' '.join(["DISKIO USAGE:",
                                      "%s %s:",
                                      "read-requests=%d",
@@ -55,7 +57,9 @@ class _Base(plugin.ComputePollster):
             r_requests = 0
             w_bytes = 0
             w_requests = 0
-            for disk, info in inspector.inspect_disks(instance_name):
+            disks = util.get_domain_stats(inspector, cache,
+                                          instance_name).disks
+            for disk, info in disks:
                 LOG.info(self.DISKIO_USAGE_MESSAGE,
                          instance, disk.device, info.read_requests,
                          info.read_bytes, info.write_requests,
@@ -73,7 +77,7 @@ class _Base(plugin.ComputePollster):
         return i_cache[instance_name]
 
     @abc.abstractmethod
-    def _get_sample(instance, c_data):
+    def _get_sample(instance, c_data, cache):
         """Return one Sample."""
 
     def get_samples(self, manager, cache, instance):
@@ -85,7 +89,7 @@ class _Base(plugin.ComputePollster):
                 instance,
                 instance_name,
             )
-            yield self._get_sample(instance, c_data)
+            yield self._get_sample(instance, c_data, cache)
         except Exception as err:
             LOG.warning('Ignoring instance %s: %s',
                         instance_name, err)
@@ -95,50 +99,54 @@ class _Base(plugin.ComputePollster):
 class ReadRequestsPollster(_Base):
 
     @staticmethod
-    def _get_sample(instance, c_data):
+    def _get_sample(instance, c_data, cache):
         return util.make_sample_from_instance(
             instance,
             name='disk.read.requests',
             type=sample.TYPE_CUMULATIVE,
             unit='request',
             volume=c_data.r_requests,
+            cache=cache,
         )
 
 
 class ReadBytesPollster(_Base):
 
     @staticmethod
-    def _get_sample(instance, c_data):
+    def _get_sample(instance, c_data, cache):
         return util.make_sample_from_instance(
             instance,
             name='disk.read.bytes',
             type=sample.TYPE_CUMULATIVE,
             unit='B',
             volume=c_data.r_bytes,
+            cache=cache,
         )
 
 
 class WriteRequestsPollster(_Base):
 
     @staticmethod
-    def _get_sample(instance, c_data):
+    def _get_sample(instance, c_data, cache):
         return util.make_sample_from_instance(
             instance,
             name='disk.write.requests',
             type=sample.TYPE_CUMULATIVE,
             unit='request',
             volume=c_data.w_requests,
+            cache=cache,
         )
 
 
 class WriteBytesPollster(_Base):
 
     @staticmethod
-    def _get_sample(instance, c_data):
+    def _get_sample(instance, c_data, cache):
         return util.make_sample_from_instance(
             instance,
             name='disk.write.bytes',
             type=sample.TYPE_CUMULATIVE,
             unit='B',
             volume=c_data.w_bytes,
+            cache=cache,
         )
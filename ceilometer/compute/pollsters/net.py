@@ -31,6 +31,8 @@ LOG = log.getLogger(__name__)
 
 class _Base(plugin.ComputePollster):
 
+    inspects_domain = True
+
     NET_USAGE_MESSAGE = ' '.join(["NETWORK USAGE:", "%s %s:", "read-bytes=%d",
                                   "write-bytes=%d"])
 
@@ -65,9 +67,8 @@ class _Base(plugin.ComputePollster):
     def _get_vnics_for_instance(self, cache, inspector, instance_name):
         i_cache = cache.setdefault(self.CACHE_KEY_VNIC, {})
         if instance_name not in i_cache:
-            i_cache[instance_name] = list(
-                inspector.inspect_vnics(instance_name)
-            )
+            i_cache[instance_name] = util.get_domain_stats(
+                inspector, cache, instance_name).vnics
         return i_cache[instance_name]
 
     def get_samples(self, manager, cache, instance):
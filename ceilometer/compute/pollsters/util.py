@@ -100,10 +100,25 @@ def _get_metadata_from_object(instance):
     return _add_reserved_user_metadata(instance, metadata)
 
 
+def _get_cached_metadata(instance, cache):
+    """Return the metadata of the instance for this polling cycle.
+
+    The metadata is built once per instance and shared by the samples of
+    all the pollsters through the cache, so it must not be modified.
+    """
+    if cache is None:
+        return _get_metadata_from_object(instance)
+    i_cache = cache.setdefault('resource_metadata', {})
+    if instance.id not in i_cache:
+        i_cache[instance.id] = _get_metadata_from_object(instance)
+    return i_cache[instance.id]
+
+
 def make_sample_from_instance(instance, name, type, unit, volume,
-                              additional_metadata={}):
-    resource_metadata = _get_metadata_from_object(instance)
-    resource_metadata.update(additional_metadata)
+                              additional_metadata={}, cache=None):
+    resource_metadata = _get_cached_metadata(instance, cache)
+    if additional_metadata:
+        resource_metadata = dict(resource_metadata, **additional_metadata)
     return sample.Sample(
         name=name,
         type=type,
@@ -120,3 +135,22 @@ def make_sample_from_instance(instance, name, type, unit, volume,
 def instance_name(instance):
     """Shortcut to get instance name."""
     return getattr(instance, 'OS-EXT-SRV-ATTR:instance_name', None)
+
+
+def get_domain_stats(inspector, cache, instance_name):
+    """Return the statistics of an instance for this polling cycle.
+
+    The statistics are inspected once per instance and shared by all the
+    pollsters through the cache, as is the failure to inspect them.
+    """
+    i_cache = cache.setdefault('domain_stats', {})
+    if instance_name not in i_cache:
+        try:
+            i_cache[instance_name] = inspector.inspect_domain_stats(
+                instance_name)
+        except Exception as err:
+            i_cache[instance_name] = err
+            raise
+    if isinstance(i_cache[instance_name], Exception):
+        raise i_cache[instance_name]
+    return i_cache[instance_name]
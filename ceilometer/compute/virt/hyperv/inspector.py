@@ -40,9 +40,8 @@ class HyperVInspector(virt_inspector.Inspector):
                 name=element_name,
                 UUID=name)
 
-    def inspect_cpus(self, instance_name):
-        (cpu_clock_used,
-         cpu_count, uptime) = self._utils.get_cpu_metrics(instance_name)
+    def _get_cpu_stats(self, cpu_metrics):
+        (cpu_clock_used, cpu_count, uptime) = cpu_metrics
         host_cpu_clock, host_cpu_count = self._utils.get_host_cpu_info()
 
         cpu_percent_used = (cpu_clock_used /
@@ -53,8 +52,9 @@ class HyperVInspector(virt_inspector.Inspector):
 
         return virt_inspector.CPUStats(number=cpu_count, time=cpu_time)
 
-    def inspect_vnics(self, instance_name):
-        for vnic_metrics in self._utils.get_vnic_metrics(instance_name):
+    @staticmethod
+    def _get_vnic_stats(vnics_metrics):
+        for vnic_metrics in vnics_metrics:
             interface = virt_inspector.Interface(
                 name=vnic_metrics["element_name"],
                 mac=vnic_metrics["address"],
@@ -69,8 +69,9 @@ class HyperVInspector(virt_inspector.Inspector):
 
             yield (interface, stats)
 
-    def inspect_disks(self, instance_name):
-        for disk_metrics in self._utils.get_disk_metrics(instance_name):
+    @staticmethod
+    def _get_disk_stats(disks_metrics):
+        for disk_metrics in disks_metrics:
             device = dict([(i, disk_metrics[i])
                           for i in ['instance_id', 'host_resource']
                           if i in disk_metrics])
@@ -85,3 +86,30 @@ class HyperVInspector(virt_inspector.Inspector):
                 errors=0)
 
             yield (disk, stats)
+
+    def inspect_cpus(self, instance_name):
+        return self._get_cpu_stats(
+            self._utils.get_cpu_metrics(instance_name))
+
+    def inspect_vnics(self, instance_name):
+        return self._get_vnic_stats(
+            self._utils.get_vnic_metrics(instance_name))
+
+    def inspect_disks(self, instance_name):
+        return self._get_disk_stats(
+            self._utils.get_disk_metrics(instance_name))
+
+    def inspect_all_cpus(self):
+        return dict((name, self._get_cpu_stats(cpu_metrics))
+                    for name, cpu_metrics
+                    in self._utils.get_all_cpu_metrics().iteritems())
+
+    def inspect_all_vnics(self):
+        return dict((name, list(self._get_vnic_stats(vnics_metrics)))
+                    for name, vnics_metrics
+                    in self._utils.get_all_vnic_metrics().iteritems())
+
+    def inspect_all_disks(self):
+        return dict((name, list(self._get_disk_stats(disks_metrics)))
+                    for name, disks_metrics
+                    in self._utils.get_all_disk_metrics().iteritems())
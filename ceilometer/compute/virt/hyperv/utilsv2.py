@@ -78,30 +78,39 @@ class UtilsV2(object):
             self._host_cpu_info = (host_cpus[0].MaxClockSpeed, len(host_cpus))
         return self._host_cpu_info
 
+    def _get_all_vm_objects(self):
+        return self._conn.Msvm_ComputerSystem(Caption="Virtual Machine")
+
     def get_all_vms(self):
         vms = [(v.ElementName, v.Name) for v in
                self._conn.Msvm_ComputerSystem(['ElementName', 'Name'],
                                               Caption="Virtual Machine")]
         return vms
 
-    def get_cpu_metrics(self, vm_name):
-        vm = self._lookup_vm(vm_name)
+    def _get_vm_cpu_metrics(self, vm, cpu_metrics_def):
         cpu_sd = self._get_vm_resources(vm, self._PROC_SETTING)[0]
-        cpu_metrics_def = self._get_metric_def(self._CPU_METRIC_NAME)
         cpu_metric_aggr = self._get_metrics(vm, cpu_metrics_def)[0]
 
         return (int(cpu_metric_aggr.MetricValue),
                 cpu_sd.VirtualQuantity,
                 long(vm.OnTimeInMilliseconds))
 
-    def get_vnic_metrics(self, vm_name):
+    def get_cpu_metrics(self, vm_name):
         vm = self._lookup_vm(vm_name)
+        cpu_metrics_def = self._get_metric_def(self._CPU_METRIC_NAME)
+        return self._get_vm_cpu_metrics(vm, cpu_metrics_def)
+
+    def get_all_cpu_metrics(self):
+        """Return the CPU metrics of all the VMs, keyed by VM name."""
+        cpu_metrics_def = self._get_metric_def(self._CPU_METRIC_NAME)
+        return dict((vm.ElementName,
+                     self._get_vm_cpu_metrics(vm, cpu_metrics_def))
+                    for vm in self._get_all_vm_objects())
+
+    def _get_vm_vnic_metrics(self, vm, metric_def_in, metric_def_out):
         ports = self._get_vm_resources(vm, self._ETH_PORT_ALLOC)
         vnics = self._get_vm_resources(vm, self._SYNTH_ETH_PORT)
 
-        metric_def_in = self._get_metric_def(self._NET_IN_METRIC_NAME)
-        metric_def_out = self._get_metric_def(self._NET_OUT_METRIC_NAME)
-
         for port in ports:
             vnic = [v for v in vnics if port.Parent == v.path_()][0]
             metric_values = self._get_metric_values(
@@ -114,11 +123,22 @@ class UtilsV2(object):
                 'address': vnic.Address
             }
 
-    def get_disk_metrics(self, vm_name):
+    def get_vnic_metrics(self, vm_name):
         vm = self._lookup_vm(vm_name)
-        metric_def_r = self._get_metric_def(self._DISK_RD_METRIC_NAME)
-        metric_def_w = self._get_metric_def(self._DISK_WR_METRIC_NAME)
+        metric_def_in = self._get_metric_def(self._NET_IN_METRIC_NAME)
+        metric_def_out = self._get_metric_def(self._NET_OUT_METRIC_NAME)
+        return self._get_vm_vnic_metrics(vm, metric_def_in, metric_def_out)
 
+    def get_all_vnic_metrics(self):
+        """Return the vNIC metrics of all the VMs, keyed by VM name."""
+        metric_def_in = self._get_metric_def(self._NET_IN_METRIC_NAME)
+        metric_def_out = self._get_metric_def(self._NET_OUT_METRIC_NAME)
+        return dict((vm.ElementName,
+                     list(self._get_vm_vnic_metrics(vm, metric_def_in,
+                                                    metric_def_out)))
+                    for vm in self._get_all_vm_objects())
+
+    def _get_vm_disk_metrics(self, vm, metric_def_r, metric_def_w):
         disks = self._get_vm_resources(vm, self._STORAGE_ALLOC)
         for disk in disks:
             metric_values = self._get_metric_values(
@@ -136,6 +156,21 @@ class UtilsV2(object):
                 'host_resource': host_resource
             }
 
+    def get_disk_metrics(self, vm_name):
+        vm = self._lookup_vm(vm_name)
+        metric_def_r = self._get_metric_def(self._DISK_RD_METRIC_NAME)
+        metric_def_w = self._get_metric_def(self._DISK_WR_METRIC_NAME)
+        return self._get_vm_disk_metrics(vm, metric_def_r, metric_def_w)
+
+    def get_all_disk_metrics(self):
+        """Return the disk metrics of all the VMs, keyed by VM name."""
+        metric_def_r = self._get_metric_def(self._DISK_RD_METRIC_NAME)
+        metric_def_w = self._get_metric_def(self._DISK_WR_METRIC_NAME)
+        return dict((vm.ElementName,
+                     list(self._get_vm_disk_metrics(vm, metric_def_r,
+                                                    metric_def_w)))
+                    for vm in self._get_all_vm_objects())
+
     def _sum_metric_values(self, metrics):
         tot_metric_val = 0
         for metric in metrics:
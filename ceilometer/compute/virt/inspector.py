@@ -23,6 +23,7 @@ import collections
 from oslo.config import cfg
 from stevedore import driver
 
+from ceilometer.openstack.common.gettextutils import _
 from ceilometer.openstack.common import log
 
 
@@ -97,6 +98,16 @@ DiskStats = collections.namedtuple('DiskStats',
                                     'errors'])
 
 
+# Named tuple representing all the statistics of an instance.
+#
+# cpu: the CPUStats of the instance
+# vnics: a list of (Interface, InterfaceStats) tuples
+# disks: a list of (Disk, DiskStats) tuples
+#
+DomainStats = collections.namedtuple('DomainStats',
+                                     ['cpu', 'vnics', 'disks'])
+
+
 # Exception types
 #
 class InspectorException(Exception):
@@ -142,6 +153,88 @@ class Inspector(object):
         """
         raise NotImplementedError()
 
+    def inspect_domain_stats(self, instance_name):
+        """Inspect all the statistics of an instance at once.
+
+        :param instance_name: the name of the target instance
+        :return: the CPU, vNIC and disk statistics of the instance
+        """
+        return DomainStats(
+            cpu=self._inspect_section(
+                'CPU', instance_name,
+                lambda: self.inspect_cpus(instance_name), None),
+            vnics=self._inspect_section(
+                'vNIC', instance_name,
+                lambda: list(self.inspect_vnics(instance_name)), []),
+            disks=self._inspect_section(
+                'disk', instance_name,
+                lambda: list(self.inspect_disks(instance_name)), []))
+
+    @staticmethod
+    def _inspect_section(section, instance_name, inspect, default):
+        """Return inspect(), or default if it fails, so that one failing
+        device does not lose the other statistics of the instance.
+        """
+        try:
+            return inspect()
+        except InstanceNotFoundException:
+            raise
+        except Exception as err:
+            LOG.warning(_('Unable to inspect the %(section)s statistics of '
+                          '%(instance)s: %(err)s'),
+                        {'section': section, 'instance': instance_name,
+                         'err': err})
+            return default
+
+    def _inspect_all(self, inspect):
+        stats = {}
+        for instance in self.inspect_instances():
+            try:
+                stats[instance.name] = inspect(instance.name)
+            except InstanceNotFoundException:
+                # Instance was deleted while inspecting... ignore it
+                pass
+        return stats
+
+    def inspect_all_cpus(self):
+        """Inspect the CPU statistics for all the instances of the host.
+
+        :return: the CPU statistics of each instance, keyed by instance
+                 name
+        """
+        return self._inspect_all(self.inspect_cpus)
+
+    def inspect_all_vnics(self):
+        """Inspect the vNIC statistics for all the instances of the host.
+
+        :return: the list of vNIC statistics of each instance, keyed by
+                 instance name
+        """
+        return self._inspect_all(
+            lambda name: list(self.inspect_vnics(name)))
+
+    def inspect_all_disks(self):
+        """Inspect the disk statistics for all the instances of the host.
+
+        :return: the list of disk statistics of each instance, keyed by
+                 instance name
+        """
+        return self._inspect_all(
+            lambda name: list(self.inspect_disks(name)))
+
+    def inspect_all_domain_stats(self):
+        """Inspect all the statistics of all the instances of the host.
+
+        :return: the DomainStats of each instance, keyed by instance name
+        """
+        cpus = self.inspect_all_cpus()
+        vnics = self.inspect_all_vnics()
+        disks = self.inspect_all_disks()
+        return dict((name, DomainStats(cpu=cpu,
+                                       vnics=vnics.get(name, []),
+                                       disks=disks.get(name, [])))
+                    for name, cpu in cpus.iteritems())
+
 
 def get_hypervisor_inspector():
     try:
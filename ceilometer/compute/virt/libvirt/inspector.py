@@ -17,6 +17,7 @@
 # under the License.
 """Implementation of Inspector abstraction for libvirt."""
 
+from eventlet import tpool
 from lxml import etree
 from oslo.config import cfg
 
@@ -36,6 +37,11 @@ libvirt_opts = [
                default='',
                help='Override the default libvirt URI '
                     '(which is dependent on libvirt_type)'),
+    cfg.BoolOpt('libvirt_nonblocking',
+                default=True,
+                help='Run libvirt calls in native threads, so that the '
+                     'compute agent can poll several instances '
+                     'concurrently'),
 ]
 
 CONF = cfg.CONF
@@ -49,6 +55,9 @@ class LibvirtInspector(virt_inspector.Inspector):
     def __init__(self):
         self.uri = self._get_uri()
         self.connection = None
+        # The interfaces and disk devices of each domain, with the XML
+        # description they were parsed from, see _get_devices().
+        self._devices = {}
 
     def _get_uri(self):
         return CONF.libvirt_uri or self.per_type_uris.get(CONF.libvirt_type,
@@ -62,6 +71,9 @@ class LibvirtInspector(virt_inspector.Inspector):
 
             LOG.debug('Connecting to libvirt: %s', self.uri)
             self.connection = libvirt.openReadOnly(self.uri)
+            if CONF.libvirt_nonblocking:
+                self.connection = tpool.Proxy(
+                    self.connection, autowrap=(libvirt.virDomain,))
 
         return self.connection
 
@@ -89,58 +101,147 @@ class LibvirtInspector(virt_inspector.Inspector):
                                'ex': ex})
             raise virt_inspector.InstanceNotFoundException(msg)
 
-    def inspect_instances(self):
-        if self._get_connection().numOfDomains() > 0:
-            for domain_id in self._get_connection().listDomainsID():
+    def _list_domains(self):
+        """Yield the name and the domain of each instance of the host."""
+        names = set()
+        conn = self._get_connection()
+        if conn.numOfDomains() > 0:
+            for domain_id in conn.listDomainsID():
                 try:
                     # We skip domains with ID 0 (hypervisors).
                     if domain_id != 0:
-                        domain = self._get_connection().lookupByID(domain_id)
-                        yield virt_inspector.Instance(name=domain.name(),
-                                                      uuid=domain.UUIDString())
+                        domain = conn.lookupByID(domain_id)
+                        name = domain.name()
+                        names.add(name)
+                        yield name, domain
                 except libvirt.libvirtError:
                     # Instance was deleted while listing... ignore it
                     pass
+        # Forget the devices of the domains which are gone
+        for name in set(self._devices) - names:
+            del self._devices[name]
 
-    def inspect_cpus(self, instance_name):
-        domain = self._lookup_by_name(instance_name)
+    def inspect_instances(self):
+        for name, domain in self._list_domains():
+            try:
+                yield virt_inspector.Instance(name=name,
+                                              UUID=domain.UUIDString())
+            except libvirt.libvirtError:
+                # Instance was deleted while listing... ignore it
+                pass
+
+    def _inspect_all_domains(self, inspect):
+        stats = {}
+        for name, domain in self._list_domains():
+            try:
+                stats[name] = inspect(name, domain)
+            except libvirt.libvirtError:
+                # Instance was deleted while inspecting... ignore it
+                pass
+        return stats
+
+    def _get_devices(self, instance_name, domain):
+        """Return the interfaces and the disk devices of a domain.
+
+        The XML description of the domain is only parsed again when it
+        changed since the last call.
+        """
+        xml = domain.XMLDesc(0)
+        cached = self._devices.get(instance_name)
+        if cached is None or cached[0] != xml:
+            tree = etree.fromstring(xml)
+            interfaces = []
+            for iface in tree.findall('devices/interface'):
+                fref = iface.find('filterref')
+                if fref is not None:
+                    fref = fref.get('filter')
+                params = dict((p.get('name').lower(), p.get('value'))
+                              for p in iface.findall('filterref/parameter'))
+                interfaces.append(virt_inspector.Interface(
+                    name=iface.find('target').get('dev'),
+                    mac=iface.find('mac').get('address'),
+                    fref=fref,
+                    parameters=params))
+            disks = [virt_inspector.Disk(device=device)
+                     for device in filter(
+                         bool,
+                         [target.get("dev")
+                          for target in tree.findall('devices/disk/target')])]
+            cached = self._devices[instance_name] = (xml, interfaces, disks)
+        return cached[1], cached[2]
+
+    @staticmethod
+    def _get_cpu_stats(domain):
         (_, _, _, num_cpu, cpu_time) = domain.info()
         return virt_inspector.CPUStats(number=num_cpu, time=cpu_time)
 
-    def inspect_vnics(self, instance_name):
-        domain = self._lookup_by_name(instance_name)
-        tree = etree.fromstring(domain.XMLDesc(0))
-        for iface in tree.findall('devices/interface'):
-            name = iface.find('target').get('dev')
-            mac = iface.find('mac').get('address')
-            fref = iface.find('filterref')
-            if fref is not None:
-                fref = fref.get('filter')
-
-            params = dict((p.get('name').lower(), p.get('value'))
-                          for p in iface.findall('filterref/parameter'))
-            interface = virt_inspector.Interface(name=name, mac=mac,
-                                                 fref=fref, parameters=params)
+    @staticmethod
+    def _get_vnic_stats(domain, interfaces):
+        for interface in interfaces:
             rx_bytes, rx_packets, _, _, \
-                tx_bytes, tx_packets, _, _ = domain.interfaceStats(name)
+                tx_bytes, tx_packets, _, _ = domain.interfaceStats(
+                    interface.name)
             stats = virt_inspector.InterfaceStats(rx_bytes=rx_bytes,
                                                   rx_packets=rx_packets,
                                                   tx_bytes=tx_bytes,
                                                   tx_packets=tx_packets)
             yield (interface, stats)
 
-    def inspect_disks(self, instance_name):
-        domain = self._lookup_by_name(instance_name)
-        tree = etree.fromstring(domain.XMLDesc(0))
-        for device in filter(
-                bool,
-                [target.get("dev")
-                 for target in tree.findall('devices/disk/target')]):
-            disk = virt_inspector.Disk(device=device)
-            block_stats = domain.blockStats(device)
+    @staticmethod
+    def _get_disk_stats(domain, disks):
+        for disk in disks:
+            block_stats = domain.blockStats(disk.device)
             stats = virt_inspector.DiskStats(read_requests=block_stats[0],
                                              read_bytes=block_stats[1],
                                              write_requests=block_stats[2],
                                              write_bytes=block_stats[3],
                                              errors=block_stats[4])
             yield (disk, stats)
+
+    def inspect_cpus(self, instance_name):
+        domain = self._lookup_by_name(instance_name)
+        return self._get_cpu_stats(domain)
+
+    def inspect_vnics(self, instance_name):
+        domain = self._lookup_by_name(instance_name)
+        interfaces, _ = self._get_devices(instance_name, domain)
+        return self._get_vnic_stats(domain, interfaces)
+
+    def inspect_disks(self, instance_name):
+        domain = self._lookup_by_name(instance_name)
+        _, disks = self._get_devices(instance_name, domain)
+        return self._get_disk_stats(domain, disks)
+
+    def _get_domain_stats(self, instance_name, domain):
+        interfaces, disks = self._get_devices(instance_name, domain)
+        return virt_inspector.DomainStats(
+            cpu=self._inspect_section(
+                'CPU', instance_name,
+                lambda: self._get_cpu_stats(domain), None),
+            vnics=self._inspect_section(
+                'vNIC', instance_name,
+                lambda: list(self._get_vnic_stats(domain, interfaces)), []),
+            disks=self._inspect_section(
+                'disk', instance_name,
+                lambda: list(self._get_disk_stats(domain, disks)), []))
+
+    def inspect_domain_stats(self, instance_name):
+        domain = self._lookup_by_name(instance_name)
+        return self._get_domain_stats(instance_name, domain)
+
+    def inspect_all_cpus(self):
+        return self._inspect_all_domains(
+            lambda name, domain: self._get_cpu_stats(domain))
+
+    def inspect_all_vnics(self):
+        return self._inspect_all_domains(
+            lambda name, domain: list(self._get_vnic_stats(
+                domain, self._get_devices(name, domain)[0])))
+
+    def inspect_all_disks(self):
+        return self._inspect_all_domains(
+            lambda name, domain: list(self._get_disk_stats(
+                domain, self._get_devices(name, domain)[1])))
+
+    def inspect_all_domain_stats(self):
+        return self._inspect_all_domains(self._get_domain_stats)
@@ -15,7 +15,6 @@
 # under the License.
 
 import datetime
-from oslo.config import cfg
 
 from keystoneclient import exceptions
 import requests
@@ -35,6 +34,8 @@ class KwapiClient(object):
         """Initializes client."""
         self.url = url
         self.token = token
+        # Keep the connections to kwapi alive between requests
+        self.session = requests.Session()
 
     def iter_probes(self):
         """Returns a list of dicts describing all probes."""
@@ -42,7 +43,7 @@ class KwapiClient(object):
         headers = {}
         if self.token is not None:
             headers = {'X-Auth-Token': self.token}
-        request = requests.get(probes_url, headers=headers)
+        request = self.session.get(probes_url, headers=headers)
         message = request.json
         probes = message['probes']
         for key, value in probes.iteritems():
@@ -57,10 +58,7 @@ class _Base(plugin.CentralPollster):
     @staticmethod
     def get_kwapi_client(ksclient):
         """Returns a KwapiClient configured with the proper url and token."""
-        endpoint = ksclient.service_catalog.url_for(
-            service_type='energy',
-            endpoint_type=cfg.CONF.service_credentials.os_endpoint_type)
-        return KwapiClient(endpoint, ksclient.auth_token)
+        return plugin.get_client(ksclient, 'energy', KwapiClient)
 
     CACHE_KEY_PROBE = 'kwapi.probes'
 
@@ -22,8 +22,8 @@ from __future__ import absolute_import
 
 import itertools
 import glanceclient
-from oslo.config import cfg
 
+from ceilometer.central import plugin as central_plugin
 from ceilometer import sample
 from ceilometer.openstack.common import timeutils
 from ceilometer import plugin
@@ -33,13 +33,11 @@ class _Base(plugin.PollsterBase):
 
     @staticmethod
     def get_glance_client(ksclient):
-        endpoint = ksclient.service_catalog.url_for(
-            service_type='image',
-            endpoint_type=cfg.CONF.service_credentials.os_endpoint_type)
-
         # hard-code v1 glance API version selection while v2 API matures
-        return glanceclient.Client('1', endpoint,
-                                   token=ksclient.auth_token)
+        return central_plugin.get_client(
+            ksclient, 'image',
+            lambda endpoint, token: glanceclient.Client('1', endpoint,
+                                                        token=token))
 
     def _get_images(self, ksclient):
         client = self.get_glance_client(ksclient)
@@ -69,61 +69,3 @@ class ImageCRUD(ImageCRUDBase):
             user_id=None,
             project_id=message['payload']['owner'],
             message=message)
-
-
-class Image(ImageCRUDBase):
-    def process_notification(self, message):
-        yield sample.Sample.from_notification(
-            name='image',
-            type=sample.TYPE_GAUGE,
-            unit='image',
-            volume=1,
-            resource_id=message['payload']['id'],
-            user_id=None,
-            project_id=message['payload']['owner'],
-            message=message)
-
-
-class ImageSize(ImageCRUDBase):
-    def process_notification(self, message):
-        yield sample.Sample.from_notification(
-            name='image.size',
-            type=sample.TYPE_GAUGE,
-            unit='B',
-            volume=message['payload']['size'],
-            resource_id=message['payload']['id'],
-            user_id=None,
-            project_id=message['payload']['owner'],
-            message=message)
-
-
-class ImageDownload(ImageBase):
-    """Emit image_download sample when an image is downloaded."""
-    event_types = ['image.send']
-
-    def process_notification(self, message):
-        yield sample.Sample.from_notification(
-            name='image.download',
-            type=sample.TYPE_DELTA,
-            unit='B',
-            volume=message['payload']['bytes_sent'],
-            resource_id=message['payload']['image_id'],
-            user_id=message['payload']['receiver_user_id'],
-            project_id=message['payload']['receiver_tenant_id'],
-            message=message)
-
-
-class ImageServe(ImageBase):
-    """Emit image_serve sample when an image is served out."""
-    event_types = ['image.send']
-
-    def process_notification(self, message):
-        yield sample.Sample.from_notification(
-            name='image.serve',
-            type=sample.TYPE_DELTA,
-            unit='B',
-            volume=message['payload']['bytes_sent'],
-            resource_id=message['payload']['image_id'],
-            user_id=None,
-            project_id=message['payload']['owner_id'],
-            message=message)
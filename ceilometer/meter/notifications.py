@@ -0,0 +1,214 @@
+# -*- encoding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""Handler producing samples from notifications according to declarative
+meter definitions.
+
+Each meter definition maps notification event types to a sample: its name,
+type and unit, and where to find its volume and ids in the notification::
+
+    - name: 'memory'
+      event_type: 'compute.instance.*'
+      type: 'gauge'
+      unit: 'MB'
+      volume: 'payload.memory_mb'
+      user_id: 'payload.user_id'
+      project_id: 'payload.tenant_id'
+      resource_id: 'payload.instance_id'
+
+String values of volume, user_id, project_id and resource_id are dotted
+paths into the notification, other values are used as they are.
+"""
+
+import fnmatch
+import os
+
+from oslo.config import cfg
+import yaml
+
+from ceilometer.openstack.common.gettextutils import _
+from ceilometer.openstack.common import log
+from ceilometer import plugin
+from ceilometer import sample
+
+OPTS = [
+    cfg.StrOpt('meter_definitions_cfg_file',
+               default="meters.yaml",
+               help="Configuration file for defining meters from "
+                    "notifications"),
+]
+
+cfg.CONF.register_opts(OPTS)
+
+cfg.CONF.import_opt('nova_control_exchange',
+                    'ceilometer.compute.notifications')
+cfg.CONF.import_opt('glance_control_exchange',
+                    'ceilometer.image.notifications')
+cfg.CONF.import_opt('cinder_control_exchange',
+                    'ceilometer.volume.notifications')
+
+LOG = log.getLogger(__name__)
+
+
+class MeterDefinitionException(Exception):
+    def __init__(self, message, definition_cfg):
+        self.msg = message
+        self.definition_cfg = definition_cfg
+
+    def __str__(self):
+        return 'Meter definition %s: %s' % (self.definition_cfg, self.msg)
+
+
+def _compile_field(value):
+    """Return a function extracting a sample field from a notification.
+
+    Strings are dotted paths into the notification, anything else is a
+    constant.
+    """
+    if not isinstance(value, basestring):
+        return lambda message: value
+
+    keys = value.split('.')
+
+    def extract(message):
+        for key in keys:
+            message = message[key]
+        return message
+    return extract
+
+
+class MeterDefinition(object):
+    """A meter definition compiled into the functions building its samples.
+    """
+
+    REQUIRED_FIELDS = ['name', 'event_type', 'type', 'unit', 'volume',
+                       'resource_id']
+    TYPES = [sample.TYPE_GAUGE, sample.TYPE_DELTA, sample.TYPE_CUMULATIVE]
+
+    def __init__(self, definition_cfg):
+        missing = [field for field in self.REQUIRED_FIELDS
+                   if field not in definition_cfg]
+        if missing:
+            raise MeterDefinitionException(
+                "Required fields %s not specified" % missing, definition_cfg)
+        if definition_cfg['type'] not in self.TYPES:
+            raise MeterDefinitionException(
+                "Invalid type %s specified" % definition_cfg['type'],
+                definition_cfg)
+
+        self.cfg = definition_cfg
+        self.name = definition_cfg['name']
+        self.type = definition_cfg['type']
+        self.unit = definition_cfg['unit']
+        event_type = definition_cfg['event_type']
+        if isinstance(event_type, basestring):
+            event_type = [event_type]
+        self.event_types = event_type
+
+        self._volume = _compile_field(definition_cfg['volume'])
+        self._resource_id = _compile_field(definition_cfg['resource_id'])
+        self._user_id = _compile_field(definition_cfg.get('user_id'))
+        self._project_id = _compile_field(definition_cfg.get('project_id'))
+
+    def match_type(self, event_type):
+        return any(fnmatch.fnmatch(event_type, t) for t in self.event_types)
+
+    def to_sample(self, message, resource_metadata=None):
+        return sample.Sample.from_notification(
+            name=self.name,
+            type=self.type,
+            unit=self.unit,
+            volume=self._volume(message),
+            user_id=self._user_id(message),
+            project_id=self._project_id(message),
+            resource_id=self._resource_id(message),
+            message=message,
+            resource_metadata=resource_metadata)
+
+
+def load_definitions():
+    """Load the meter definitions from the configured yaml file."""
+    cfg_file = cfg.CONF.meter_definitions_cfg_file
+    if not os.path.exists(cfg_file):
+        cfg_file = cfg.CONF.find_file(cfg_file)
+    if cfg_file is None:
+        # Fail loudly, the plugin loader would only log the failure
+        LOG.error(_("Meter definitions config file %s not found, set "
+                    "meter_definitions_cfg_file"),
+                  cfg.CONF.meter_definitions_cfg_file)
+        raise cfg.ConfigFilesNotFoundError(
+            [cfg.CONF.meter_definitions_cfg_file])
+
+    LOG.debug("Meter definitions config file: %s", cfg_file)
+
+    with open(cfg_file) as fap:
+        data = fap.read()
+
+    return [MeterDefinition(definition_cfg)
+            for definition_cfg in yaml.safe_load(data) or []]
+
+
+class ProcessMeterNotifications(plugin.NotificationBase):
+    """Produce the samples of every meter definition matching a
+    notification.
+    """
+
+    def __init__(self, definitions=None):
+        super(ProcessMeterNotifications, self).__init__()
+        if definitions is None:
+            definitions = load_definitions()
+        self.definitions = definitions
+        # Map each event type seen to its matching definitions, so that
+        # only the first notification of a type is matched against the
+        # event type patterns.
+        self._definitions_by_event_type = {}
+
+    @property
+    def event_types(self):
+        return sorted(set(t for d in self.definitions
+                          for t in d.event_types))
+
+    @staticmethod
+    def get_exchange_topics(conf):
+        """Return a sequence of ExchangeTopics defining the exchange and
+        topics to be connected for this plugin.
+        """
+        topics = set(topic + ".info" for topic in conf.notification_topics)
+        return [plugin.ExchangeTopics(exchange=exchange, topics=topics)
+                for exchange in [conf.nova_control_exchange,
+                                 conf.glance_control_exchange,
+                                 conf.cinder_control_exchange]]
+
+    def _get_definitions(self, event_type):
+        try:
+            return self._definitions_by_event_type[event_type]
+        except KeyError:
+            definitions = [d for d in self.definitions
+                           if d.match_type(event_type)]
+            self._definitions_by_event_type[event_type] = definitions
+            return definitions
+
+    def to_samples(self, notification):
+        return self.process_notification(notification)
+
+    def process_notification(self, message):
+        definitions = self._get_definitions(message['event_type'])
+        if not definitions:
+            return
+        metadata = sample.Sample.notification_metadata(message)
+        for definition in definitions:
+            try:
+                yield definition.to_sample(message, metadata)
+            except (KeyError, TypeError):
+                LOG.warning('Unable to build sample %s from %s notification',
+                            definition.name, message['event_type'])
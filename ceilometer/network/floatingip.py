@@ -31,9 +31,15 @@ class FloatingIPPollster(plugin.CentralPollster):
 
     LOG = log.getLogger(__name__ + '.floatingip')
 
+    def __init__(self):
+        super(FloatingIPPollster, self).__init__()
+        self._nv = None
+
     def _get_floating_ips(self):
-        nv = nova_client.Client()
-        return nv.floating_ip_get_all()
+        # Reuse the client, and thus its authentication, across polls
+        if self._nv is None:
+            self._nv = nova_client.Client()
+        return self._nv.floating_ip_get_all()
 
     def _iter_floating_ips(self, cache):
         if 'floating_ips' not in cache:
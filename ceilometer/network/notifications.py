@@ -75,6 +75,7 @@ class NetworkNotificationBase(plugin.NotificationBase):
         message['payload'] = message['payload'][self.resource_name]
         counter_name = getattr(self, 'counter_name', self.resource_name)
         unit_value = getattr(self, 'unit', self.resource_name)
+        metadata = sample.Sample.notification_metadata(message)
 
         yield sample.Sample.from_notification(
             name=counter_name,
@@ -84,7 +85,8 @@ class NetworkNotificationBase(plugin.NotificationBase):
             user_id=message['_context_user_id'],
             project_id=message['payload']['tenant_id'],
             resource_id=message['payload']['id'],
-            message=message)
+            message=message,
+            resource_metadata=metadata)
 
         event_type_split = message['event_type'].split('.')
         if len(event_type_split) > 2:
@@ -97,7 +99,8 @@ class NetworkNotificationBase(plugin.NotificationBase):
                 user_id=message['_context_user_id'],
                 project_id=message['payload']['tenant_id'],
                 resource_id=message['payload']['id'],
-                message=message)
+                message=message,
+                resource_metadata=metadata)
 
 
 class Network(NetworkNotificationBase):
@@ -21,7 +21,30 @@ from novaclient.v1_1 import client as nova_client
 from oslo.config import cfg
 
 from ceilometer.openstack.common import log
-
+from ceilometer.openstack.common import timeutils
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    # Python 2.6
+    from ordereddict import OrderedDict
+
+OPTS = [
+    cfg.IntOpt('nova_lookup_cache_ttl',
+               default=600,
+               help='Time in seconds the flavors and images looked up in '
+                    'Nova are cached, 0 disables the cache'),
+    cfg.IntOpt('nova_lookup_cache_size',
+               default=1000,
+               help='Maximum number of flavors and of images cached'),
+    cfg.IntOpt('nova_lookup_prefetch_threshold',
+               default=20,
+               help='Number of distinct flavors or images missing from the '
+                    'cache above which they are all listed at once rather '
+                    'than looked up one by one'),
+]
+
+cfg.CONF.register_opts(OPTS)
 cfg.CONF.import_group('service_credentials', 'ceilometer.service')
 
 LOG = log.getLogger(__name__)
@@ -40,8 +63,48 @@ def logged(func):
     return with_logging
 
 
+class TTLCache(object):
+    """A bounded cache whose entries expire after nova_lookup_cache_ttl.
+
+    The oldest entries are dropped when the cache is full.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+
+    def __contains__(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        if entry[0] < timeutils.utcnow_ts():
+            del self._entries[key]
+            return False
+        return True
+
+    def __getitem__(self, key):
+        return self._entries[key][1]
+
+    def __setitem__(self, key, value):
+        ttl = cfg.CONF.nova_lookup_cache_ttl
+        if ttl <= 0:
+            return
+        self._entries.pop(key, None)
+        while (self._entries and
+               len(self._entries) >= cfg.CONF.nova_lookup_cache_size):
+            self._entries.popitem(last=False)
+        self._entries[key] = (timeutils.utcnow_ts() + ttl, value)
+
+    def clear(self):
+        self._entries.clear()
+
+
 class Client(object):
 
+    # Flavors and images are shared by all the clients, None meaning
+    # that Nova does not know them.
+    _flavors = TTLCache()
+    _images = TTLCache()
+
     def __init__(self):
         """Returns a nova Client object."""
         conf = cfg.CONF.service_credentials
@@ -55,7 +118,40 @@ class Client(object):
             cacert=conf.os_cacert,
             no_cache=True)
 
+    @classmethod
+    def clear_cache(cls):
+        cls._flavors.clear()
+        cls._images.clear()
+
+    @staticmethod
+    def _prefetch(cache, ids, manager):
+        """List all the flavors or images when many of them are missing
+        from the cache.
+        """
+        missing = set(i for i in ids if i not in cache)
+        if len(missing) > cfg.CONF.nova_lookup_prefetch_threshold:
+            for item in manager.list(detailed=True):
+                cache[item.id] = item
+
+    @staticmethod
+    def _lookup(cache, id, manager):
+        if id in cache:
+            return cache[id]
+        try:
+            item = manager.get(id)
+        except novaclient.exceptions.NotFound:
+            item = None
+        cache[id] = item
+        return item
+
     def _with_flavor_and_image(self, instances):
+        self._prefetch(self._flavors,
+                       [instance.flavor['id'] for instance in instances],
+                       self.nova_client.flavors)
+        self._prefetch(self._images,
+                       [instance.image['id'] for instance in instances
+                        if instance.image],
+                       self.nova_client.images)
         for instance in instances:
             self._with_flavor(instance)
             self._with_image(instance)
@@ -64,10 +160,7 @@ class Client(object):
 
     def _with_flavor(self, instance):
         fid = instance.flavor['id']
-        try:
-            flavor = self.nova_client.flavors.get(fid)
-        except novaclient.exceptions.NotFound:
-            flavor = None
+        flavor = self._lookup(self._flavors, fid, self.nova_client.flavors)
 
         attr_defaults = [('name', 'unknown-id-%s' % fid),
                          ('vcpus', 0), ('ram', 0), ('disk', 0),
@@ -81,9 +174,8 @@ class Client(object):
 
     def _with_image(self, instance):
         iid = instance.image['id']
-        try:
-            image = self.nova_client.images.get(iid)
-        except novaclient.exceptions.NotFound:
+        image = self._lookup(self._images, iid, self.nova_client.images)
+        if image is None:
             instance.image['name'] = 'unknown-id-%s' % iid
             instance.kernel_id = None
             instance.ramdisk_id = None
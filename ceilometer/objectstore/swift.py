@@ -20,6 +20,10 @@
 
 from __future__ import absolute_import
 
+import httplib
+import socket
+import urlparse
+
 from oslo.config import cfg
 from swiftclient import client as swift
 from keystoneclient import exceptions
@@ -30,8 +34,6 @@ from ceilometer.openstack.common import log
 from ceilometer.openstack.common import timeutils
 from ceilometer import plugin
 
-from urlparse import urljoin
-
 
 LOG = log.getLogger(__name__)
 
@@ -49,6 +51,7 @@ class _Base(plugin.PollsterBase):
 
     CACHE_KEY_TENANT = 'tenants'
     CACHE_KEY_HEAD = 'swift.head_account'
+    CACHE_KEY_CONN = 'swift.connection'
 
     def _iter_accounts(self, ksclient, cache):
         if self.CACHE_KEY_TENANT not in cache:
@@ -58,6 +61,24 @@ class _Base(plugin.PollsterBase):
                                                                      cache))
         return iter(cache[self.CACHE_KEY_HEAD])
 
+    def _head_account(self, cache, url, token):
+        """HEAD an account through the connection to the proxy of the
+        polling cycle, or a new one if that connection failed.
+
+        The connection is not shared with the other polling cycles, which
+        may run concurrently.
+        """
+        conn = cache.get(self.CACHE_KEY_CONN)
+        if conn is not None:
+            try:
+                return swift.head_account(
+                    url, token, http_conn=(urlparse.urlparse(url), conn))
+            except (socket.error, httplib.HTTPException):
+                LOG.debug(_("Reconnecting to the Swift proxy"))
+        http_conn = swift.http_connection(url)
+        cache[self.CACHE_KEY_CONN] = http_conn[1]
+        return swift.head_account(url, token, http_conn=http_conn)
+
     def _get_account_info(self, ksclient, cache):
         try:
             endpoint = ksclient.service_catalog.url_for(
@@ -68,14 +89,16 @@ class _Base(plugin.PollsterBase):
             raise StopIteration()
 
         for t in cache['tenants']:
-            yield (t.id, swift.head_account(self._neaten_url(endpoint, t.id),
+            yield (t.id, self._head_account(cache,
+                                            self._neaten_url(endpoint, t.id),
                                             ksclient.auth_token))
 
     @staticmethod
     def _neaten_url(endpoint, tenant_id):
         """Transform the registered url to standard and valid format.
         """
-        return urljoin(endpoint, '/v1/' + cfg.CONF.reseller_prefix + tenant_id)
+        return urlparse.urljoin(endpoint,
+                                '/v1/' + cfg.CONF.reseller_prefix + tenant_id)
 
 
 class ObjectsPollster(_Base):
@@ -49,7 +49,7 @@ class UDPPublisher(publisher.PublisherBase):
         """
 
         for sample in samples:
-            msg = sample.as_dict()
+            msg = sample.to_message()
             host = self.host
             port = self.port
             LOG.debug(_("Publishing sample %(msg)s over UDP to "
@@ -57,6 +57,12 @@ cfg.CONF.register_opts(OPTS)
 # Resource metadata: various metadata
 class Sample(object):
 
+    FIELDS = ('name', 'type', 'unit', 'volume', 'user_id', 'project_id',
+              'resource_id', 'timestamp', 'resource_metadata', 'source',
+              'id')
+
+    __slots__ = FIELDS[:-1] + ('_id',)
+
     def __init__(self, name, type, unit, volume, user_id, project_id,
                  resource_id, timestamp, resource_metadata, source=None):
         self.name = name
@@ -69,18 +75,59 @@ class Sample(object):
         self.timestamp = timestamp
         self.resource_metadata = resource_metadata
         self.source = source or cfg.CONF.sample_source
-        self.id = str(uuid.uuid1())
+        self._id = None
+
+    @property
+    def id(self):
+        # Generated on first use so that samples dropped by a transformer
+        # never pay for a uuid.
+        if self._id is None:
+            self._id = str(uuid.uuid1())
+        return self._id
+
+    @id.setter
+    def id(self, value):
+        self._id = value
 
     def as_dict(self):
-        return copy.copy(self.__dict__)
+        return dict((field, getattr(self, field))
+                    for field in self.FIELDS)
 
-    @classmethod
-    def from_notification(cls, name, type, volume, unit,
-                          user_id, project_id, resource_id,
-                          message, source=None):
+    def to_message(self):
+        """Return the metering message for this sample, unsigned."""
+        return {'source': self.source,
+                'counter_name': self.name,
+                'counter_type': self.type,
+                'counter_unit': self.unit,
+                'counter_volume': self.volume,
+                'user_id': self.user_id,
+                'project_id': self.project_id,
+                'resource_id': self.resource_id,
+                'timestamp': self.timestamp,
+                'resource_metadata': self.resource_metadata,
+                'message_id': self.id,
+                }
+
+    @staticmethod
+    def notification_metadata(message):
+        """Return the resource metadata for a notification message.
+
+        A handler converting a notification into several samples builds
+        it once and passes it to from_notification() for each of them:
+        the samples then share the same dictionary, so it must be
+        treated as read-only.
+        """
         metadata = copy.copy(message['payload'])
         metadata['event_type'] = message['event_type']
         metadata['host'] = message['publisher_id']
+        return metadata
+
+    @classmethod
+    def from_notification(cls, name, type, volume, unit,
+                          user_id, project_id, resource_id,
+                          message, source=None, resource_metadata=None):
+        if resource_metadata is None:
+            resource_metadata = cls.notification_metadata(message)
         return cls(name=name,
                    type=type,
                    volume=volume,
@@ -89,7 +136,7 @@ class Sample(object):
                    project_id=project_id,
                    resource_id=resource_id,
                    timestamp=message['timestamp'],
-                   resource_metadata=metadata,
+                   resource_metadata=resource_metadata,
                    source=source)
 
 TYPE_GAUGE = 'gauge'
@@ -19,6 +19,9 @@
 """
 
 
+import contextlib
+import threading
+import time
 import urlparse
 
 from oslo.config import cfg
@@ -49,6 +52,18 @@ STORAGE_OPTS = [
                default=-1,
                help="""number of seconds that samples are kept
 in the database for (<= 0 means forever)"""),
+    cfg.IntOpt('connection_pool_size',
+               default=10,
+               help='Number of idle storage connections kept by the API '
+                    'for the drivers whose connections cannot be shared'),
+    cfg.IntOpt('connection_pool_overflow',
+               default=10,
+               help='Number of storage connections the API may open '
+                    'beyond connection_pool_size under load'),
+    cfg.IntOpt('connection_pool_timeout',
+               default=30,
+               help='Number of seconds an API request waits for a storage '
+                    'connection to be returned to the pool before failing'),
 ]
 
 cfg.CONF.register_opts(STORAGE_OPTS, group='database')
@@ -62,6 +77,10 @@ class StorageBadVersion(Exception):
     """Error raised when the storage backend version is not good enough."""
 
 
+class ConnectionPoolTimeout(Exception):
+    """Error raised when no storage connection was returned in time."""
+
+
 def get_engine(conf):
     """Load the configured engine and return an instance."""
     if conf.database_connection:
@@ -81,6 +100,99 @@ def get_connection(conf):
     return get_engine(conf).get_connection(conf)
 
 
+class ConnectionPool(object):
+    """Hand out storage connections to concurrent requests.
+
+    The connections of the drivers declaring them thread_safe are shared
+    by everyone. Otherwise each user checks out a connection of its own
+    and returns it once done: up to connection_pool_size of them are
+    kept for the next users, and up to connection_pool_overflow more
+    are opened under load, the users then waiting up to
+    connection_pool_timeout seconds for a connection to be returned.
+    A connection returned after a failure is discarded rather than
+    reused, as is an idle connection found dead when checked out.
+    """
+
+    def __init__(self, conf):
+        self.conf = conf
+        self.engine = get_engine(conf)
+        self.size = conf.database.connection_pool_size
+        self.limit = self.size + conf.database.connection_pool_overflow
+        self.timeout = conf.database.connection_pool_timeout
+        self._idle = []
+        self._shared = None
+        self._checked_out = 0
+        self._available = threading.Condition()
+        conn = self.engine.get_connection(conf)
+        if conn.thread_safe:
+            self._shared = conn
+        else:
+            self._idle.append(conn)
+
+    def _acquire(self):
+        deadline = time.time() + self.timeout
+        with self._available:
+            while self._checked_out >= self.limit:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise ConnectionPoolTimeout(
+                        'No storage connection returned within %s seconds'
+                        % self.timeout)
+                self._available.wait(remaining)
+            self._checked_out += 1
+
+    def _release(self):
+        with self._available:
+            self._checked_out -= 1
+            self._available.notify()
+
+    def get(self):
+        """Check out a connection.
+
+        :raises ConnectionPoolTimeout: if all the connections stay
+                                       checked out for too long
+        """
+        if self._shared is not None:
+            return self._shared
+        self._acquire()
+        try:
+            while True:
+                try:
+                    conn = self._idle.pop()
+                except IndexError:
+                    break
+                if conn.is_alive():
+                    return conn
+                LOG.debug('discarding dead idle storage connection')
+            return self.engine.get_connection(self.conf)
+        except Exception:
+            self._release()
+            raise
+
+    def put(self, conn, healthy=True):
+        """Return a connection checked out with get().
+
+        :param healthy: False if the connection failed and must not be
+                        reused
+        """
+        if conn is self._shared:
+            return
+        if healthy and len(self._idle) < self.size:
+            self._idle.append(conn)
+        self._release()
+
+    @contextlib.contextmanager
+    def connection(self):
+        conn = self.get()
+        try:
+            yield conn
+        except Exception:
+            self.put(conn, healthy=False)
+            raise
+        else:
+            self.put(conn)
+
+
 class SampleFilter(object):
     """Holds the properties for building a query from a meter/sample filter.
 
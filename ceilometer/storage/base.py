@@ -19,6 +19,7 @@
 """
 
 import abc
+import copy
 import datetime
 import math
 
@@ -117,6 +118,10 @@ class Connection(object):
 
     __metaclass__ = abc.ABCMeta
 
+    # Whether a connection can be used by several threads or green threads
+    # at once
+    thread_safe = False
+
     @abc.abstractmethod
     def __init__(self, conf):
         """Constructor."""
@@ -125,6 +130,14 @@ class Connection(object):
     def upgrade(self):
         """Migrate the database to `version` or the most recent version."""
 
+    def is_alive(self):
+        """Return whether a connection left idle may still be used.
+
+        The check must be cheap as it is done whenever an idle connection
+        is checked out of the API connection pool.
+        """
+        return True
+
     @abc.abstractmethod
     def record_metering_data(self, data):
         """Write the data to the backend storage system.
@@ -207,6 +220,42 @@ class Connection(object):
         The filter must have a meter value set.
         """
 
+    def get_meters_statistics(self, sample_filter, meters, period=None,
+                              groupby=None):
+        """Return an iterable of (meter name, model.Statistics) tuples.
+
+        The statistics of each meter are the ones get_meter_statistics()
+        returns for the filter with its meter replaced. Drivers able to
+        compute them for all the meters in a single query should
+        override this method.
+        """
+        for meter in meters:
+            f = copy.copy(sample_filter)
+            f.meter = meter
+            for stats in self.get_meter_statistics(f, period, groupby):
+                yield meter, stats
+
+    def get_latest_samples(self, sample_filter):
+        """Return an iterable of the latest model.Sample of each resource
+        matching the filter.
+
+        The filter must have a meter value set. The default
+        implementation queries the latest sample of the meter for each
+        resource having that meter, drivers able to do better should
+        override this method.
+        """
+        meters = self.get_meters(user=sample_filter.user,
+                                 project=sample_filter.project,
+                                 resource=sample_filter.resource,
+                                 source=sample_filter.source)
+        resources = set(m.resource_id for m in meters
+                        if m.name == sample_filter.meter)
+        for resource_id in sorted(resources):
+            f = copy.copy(sample_filter)
+            f.resource = resource_id
+            for s in self.get_samples(f, limit=1):
+                yield s
+
     @abc.abstractmethod
     def get_alarms(self, name=None, user=None,
                    project=None, enabled=True, alarm_id=None, pagination=None):
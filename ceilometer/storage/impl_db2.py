@@ -153,6 +153,9 @@ class Connection(base.Connection):
     """DB2 connection.
     """
 
+    # pymongo clients are thread safe
+    thread_safe = True
+
     CONNECTION_POOL = ConnectionPool()
 
     GROUP = {'_id': '$counter_name',
@@ -18,6 +18,7 @@
 # under the License.
 """HBase storage backend
 """
+import calendar
 import json
 import hashlib
 import itertools
@@ -27,6 +28,7 @@ import happybase
 import os
 import re
 import urlparse
+import uuid
 
 from ceilometer.openstack.common.gettextutils import _
 from ceilometer.openstack.common import log
@@ -62,6 +64,14 @@ class HBaseStorage(base.StorageEngine):
           project_id: uuid
           meter: [ array of {counter_name: string, counter_type: string} ]
         }
+    - event
+      - the raw events, the rowkey is made of an hourly time bucket
+        and the event name so that a time range scan of a given event
+        type reads contiguous rows
+      - { event_name: string
+          generated: timestamp of the event
+          t_{trait_name}!{trait_type}: value of the trait
+        }
     """
 
     @staticmethod
@@ -75,12 +85,16 @@ class Connection(base.Connection):
     """HBase connection.
     """
 
+    # A happybase connection wraps a single Thrift socket
+    thread_safe = False
+
     _memory_instance = None
 
     PROJECT_TABLE = "project"
     USER_TABLE = "user"
     RESOURCE_TABLE = "resource"
     METER_TABLE = "meter"
+    EVENT_TABLE = "event"
 
     def __init__(self, conf):
         """Hbase Connection Initialization."""
@@ -108,13 +122,22 @@ class Connection(base.Connection):
         self.conn.create_table(self.USER_TABLE, {'f': dict()})
         self.conn.create_table(self.RESOURCE_TABLE, {'f': dict()})
         self.conn.create_table(self.METER_TABLE, {'f': dict()})
+        self.conn.create_table(self.EVENT_TABLE, {'f': dict()})
+
+    def is_alive(self):
+        try:
+            self.conn.is_table_enabled(self.METER_TABLE)
+        except Exception:
+            return False
+        return True
 
     def clear(self):
         LOG.debug('Dropping HBase schema...')
         for table in [self.PROJECT_TABLE,
                       self.USER_TABLE,
                       self.RESOURCE_TABLE,
-                      self.METER_TABLE]:
+                      self.METER_TABLE,
+                      self.EVENT_TABLE]:
             try:
                 self.conn.disable_table(table)
             except Exception:
@@ -407,23 +430,19 @@ class Connection(base.Connection):
             # Meter columns are stored like this:
             # "m_{counter_name}|{counter_type}|{counter_unit}" => "1"
             # where 'm' is a prefix (m for meter), value is always set to 1
-            meter = None
-            for m in data:
-                if m.startswith('f:m_'):
-                    meter = m
-                    break
-            if meter is None:
-                continue
-            name, type, unit = meter[4:].split("!")
-            yield models.Meter(
-                name=name,
-                type=type,
-                unit=unit,
-                resource_id=data['f:resource_id'],
-                project_id=data['f:project_id'],
-                source=data['f:source'],
-                user_id=data['f:user_id'],
-            )
+            for m in sorted(data):
+                if not m.startswith('f:m_'):
+                    continue
+                name, type, unit = m[4:].split("!")
+                yield models.Meter(
+                    name=name,
+                    type=type,
+                    unit=unit,
+                    resource_id=data['f:resource_id'],
+                    project_id=data['f:project_id'],
+                    source=data['f:source'],
+                    user_id=data['f:user_id'],
+                )
 
     def get_samples(self, sample_filter, limit=None):
         """Return an iterable of models.Sample instances.
@@ -616,19 +635,81 @@ class Connection(base.Connection):
         """
         raise NotImplementedError('Alarms not implemented')
 
-    def record_events(self, events):
-        """Write the events.
+    def record_events(self, event_models):
+        """Write the events to HBase.
 
-        :param events: a list of model.Event objects.
+        All the events are sent in a single batch of puts.
+
+        :param event_models: a list of model.Event objects.
         """
-        raise NotImplementedError('Events not implemented.')
+        event_table = self.conn.table(self.EVENT_TABLE)
+        with event_table.batch() as batch:
+            for event_model in event_models:
+                # Rowkey consists of the time bucket, the event name and
+                # a random part for the purposes of uniqueness.
+                row = "%s_%s_%s" % (_event_bucket(event_model.generated),
+                                    event_model.event_name,
+                                    uuid.uuid4().hex)
+                record = {
+                    'f:event_name': event_model.event_name,
+                    'f:generated': timeutils.strtime(event_model.generated),
+                }
+                for trait in event_model.traits or []:
+                    column = 'f:t_%s!%d' % (trait.name, trait.dtype)
+                    record[column] = _serialize_trait_value(trait.dtype,
+                                                            trait.value)
+                batch.put(row, record)
+
+                # Update the models with the underlying DB ID.
+                event_model.id = row
+                for trait in event_model.traits or []:
+                    trait.id = '%s:%s' % (row, trait.name)
 
     def get_events(self, event_filter):
         """Return an iterable of model.Event objects.
 
         :param event_filter: EventFilter instance
         """
-        raise NotImplementedError('Events not implemented.')
+        event_table = self.conn.table(self.EVENT_TABLE)
+
+        q, start_row, stop_row = make_events_query_from_filter(event_filter)
+        LOG.debug("Query Event table: %s" % q)
+
+        trait_name = event_filter.traits.get('key')
+        trait_values = [(models.EVENT_TRAIT_TYPES[k], v)
+                        for k, v in event_filter.traits.iteritems()
+                        if k in models.EVENT_TRAIT_TYPES]
+
+        events = []
+        for ignored, data in event_table.scan(filter=q,
+                                              row_start=start_row,
+                                              row_stop=stop_row):
+            traits = []
+            for column, value in data.iteritems():
+                if not column.startswith('f:t_'):
+                    continue
+                name, dtype = column[4:].rsplit('!', 1)
+                dtype = int(dtype)
+                traits.append(models.Trait(
+                    name, dtype, _deserialize_trait_value(dtype, value)))
+
+            # Trait filters which could not be expressed as a column
+            # filter are checked here.
+            if trait_name or trait_values:
+                for trait in traits:
+                    if trait_name and trait.name != trait_name:
+                        continue
+                    if all(trait.dtype == dtype and trait.value == value
+                           for dtype, value in trait_values):
+                        break
+                else:
+                    continue
+
+            events.append(models.Event(
+                data['f:event_name'],
+                timeutils.parse_strtime(data['f:generated']),
+                sorted(traits, key=lambda t: t.name)))
+        return sorted(events, key=lambda e: e.generated)
 
 
 ###############
@@ -650,7 +731,11 @@ class MTable(object):
         return ((k, self.row(k)) for k in keys)
 
     def put(self, key, data):
-        self._rows[key] = data
+        # Like HBase, the columns put are added to the existing ones
+        self._rows.setdefault(key, {}).update(data)
+
+    def batch(self):
+        return MBatch(self)
 
     def scan(self, filter=None, columns=[], row_start=None, row_stop=None):
         sorted_keys = sorted(self._rows)
@@ -722,6 +807,28 @@ class MTable(object):
         return r
 
 
+class MBatch(object):
+    """HappyBase.Batch mock
+    """
+    def __init__(self, table):
+        self.table = table
+        self._mutations = []
+
+    def put(self, key, data):
+        self._mutations.append((key, data))
+
+    def send(self):
+        for key, data in self._mutations:
+            self.table.put(key, data)
+        self._mutations = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.send()
+
+
 class MConnection(object):
     """HappyBase.Connection mock
     """
@@ -741,12 +848,20 @@ class MConnection(object):
     def delete_table(self, name, use_prefix=True):
         del self.tables[name]
 
+    def is_table_enabled(self, name):
+        return name in self.tables
+
     def table(self, name):
         return self.create_table(name)
 
 
 #################################################
 # Here be various HBase helpers
+
+# Size in seconds of the time buckets used in the event rowkeys.
+EVENT_BUCKET_SIZE = 3600
+
+
 def reverse_timestamp(dt):
     """Reverse timestamp so that newer timestamps are represented by smaller
     numbers than older ones.
@@ -865,6 +980,69 @@ def _make_rowkey_scan(meter, rts_start=None, rts_end=None):
     return start_row, end_row
 
 
+def make_events_query_from_filter(event_filter):
+    """Return a filter query string and the start and stop rowkeys to scan
+    the event table with.
+
+    :param event_filter: EventFilter instance
+    """
+    q = ["SingleColumnValueFilter ('f', 'generated', >=, 'binary:%s')"
+         % timeutils.strtime(event_filter.start),
+         "SingleColumnValueFilter ('f', 'generated', <=, 'binary:%s')"
+         % timeutils.strtime(event_filter.end)]
+    if event_filter.event_name:
+        q.append("SingleColumnValueFilter ('f', 'event_name', =, 'binary:%s')"
+                 % event_filter.event_name)
+
+    # A trait can only be looked up by column when both its name and its
+    # value are known.
+    trait_name = event_filter.traits.get('key')
+    if trait_name:
+        for key, dtype in models.EVENT_TRAIT_TYPES.iteritems():
+            if key in event_filter.traits:
+                q.append("SingleColumnValueFilter "
+                         "('f', 't_%s!%d', =, 'binary:%s')"
+                         % (trait_name, dtype,
+                            _serialize_trait_value(
+                                dtype, event_filter.traits[key])))
+
+    start_row = _event_bucket(event_filter.start)
+    stop_row = "%010d" % (int(_event_bucket(event_filter.end))
+                          + EVENT_BUCKET_SIZE)
+    return " AND ".join(q), start_row, stop_row
+
+
+def _event_bucket(dt):
+    """Return the time bucket of an event rowkey as a fixed width string, so
+    that buckets sort chronologically.
+    """
+    ts = calendar.timegm(dt.utctimetuple())
+    return "%010d" % (ts - ts % EVENT_BUCKET_SIZE)
+
+
+def _serialize_trait_value(dtype, value):
+    """Serialise a trait value so that it can be stored in, and compared
+    against, an HBase column.
+    """
+    if dtype == models.Trait.DATETIME_TYPE:
+        return timeutils.strtime(value)
+    elif dtype == models.Trait.TEXT_TYPE:
+        return value
+    return json.dumps(value)
+
+
+def _deserialize_trait_value(dtype, value):
+    """Deserialise a trait value as stored by _serialize_trait_value.
+    """
+    if dtype == models.Trait.DATETIME_TYPE:
+        return timeutils.parse_strtime(value)
+    elif dtype == models.Trait.INT_TYPE:
+        return int(value)
+    elif dtype == models.Trait.FLOAT_TYPE:
+        return float(value)
+    return value
+
+
 def _load_hbase_list(d, prefix):
     """Deserialise dict stored as HBase column family
     """
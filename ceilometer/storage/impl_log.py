@@ -38,6 +38,8 @@ class Connection(base.Connection):
     """Base class for storage system connections.
     """
 
+    thread_safe = True
+
     def __init__(self, conf):
         pass
 
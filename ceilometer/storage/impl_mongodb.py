@@ -59,6 +59,9 @@ class MongoDBStorage(base.StorageEngine):
               }
         - meter
           - the raw incoming data
+        - latest_sample
+          - the latest of the raw incoming data of each meter of each
+            resource, unique on resource_id and counter_name
         - resource
           - the metadata for resources
           - { _id: uuid of resource,
@@ -68,6 +71,15 @@ class MongoDBStorage(base.StorageEngine):
               meter: [ array of {counter_name: string, counter_type: string,
                                  counter_unit: string} ]
             }
+        - event
+          - the raw events, with their traits embedded
+          - { _id: ObjectId of the event,
+              event_name: string,
+              generated: datetime,
+              traits: [ array of {trait_name: string,
+                                  trait_type: int,
+                                  trait_value: value} ]
+            }
     """
 
     def get_connection(self, conf):
@@ -160,6 +172,9 @@ class Connection(base.Connection):
     """MongoDB connection.
     """
 
+    # pymongo clients are thread safe
+    thread_safe = True
+
     CONNECTION_POOL = ConnectionPool()
 
     REDUCE_GROUP_CLEAN = bson.code.Code("""
@@ -335,30 +350,69 @@ class Connection(base.Connection):
         self.db.meter.ensure_index([('timestamp', pymongo.DESCENDING)],
                                    name='timestamp_idx')
 
-        indexes = self.db.meter.index_information()
+        if 'latest_sample' not in self.db.collection_names():
+            self._fill_latest_samples()
+        self.db.latest_sample.ensure_index([
+            ('resource_id', pymongo.ASCENDING),
+            ('counter_name', pymongo.ASCENDING),
+        ], name='latest_sample_idx', unique=True)
+
+        # Events are always queried on a time range, optionally narrowed
+        # down by event name or by a trait.
+        self.db.event.ensure_index([('generated', pymongo.ASCENDING)],
+                                   name='event_generated_idx')
+        self.db.event.ensure_index([
+            ('event_name', pymongo.ASCENDING),
+            ('generated', pymongo.ASCENDING),
+        ], name='event_name_idx')
+        self.db.event.ensure_index([
+            ('traits.trait_name', pymongo.ASCENDING),
+            ('traits.trait_value', pymongo.ASCENDING),
+        ], name='event_trait_idx')
 
         ttl = cfg.CONF.database.time_to_live
+        self._ensure_ttl_index(self.db.meter, 'meter_ttl', ttl)
+        # The latest sample of a meter expires with the last of its samples
+        self._ensure_ttl_index(self.db.latest_sample, 'latest_sample_ttl', ttl)
+
+    @staticmethod
+    def _ensure_ttl_index(collection, name, ttl):
+        indexes = collection.index_information()
 
         if ttl <= 0:
-            if 'meter_ttl' in indexes:
-                self.db.meter.drop_index('meter_ttl')
+            if name in indexes:
+                collection.drop_index(name)
             return
 
-        if 'meter_ttl' in indexes:
+        if name in indexes:
             # NOTE(sileht): manually check expireAfterSeconds because
             # ensure_index doesn't update index options if the index already
             # exists
-            if ttl == indexes['meter_ttl'].get('expireAfterSeconds', -1):
+            if ttl == indexes[name].get('expireAfterSeconds', -1):
                 return
 
-            self.db.meter.drop_index('meter_ttl')
+            collection.drop_index(name)
 
-        self.db.meter.create_index(
+        collection.create_index(
             [('timestamp', pymongo.ASCENDING)],
             expireAfterSeconds=ttl,
-            name='meter_ttl'
+            name=name
         )
 
+    def _fill_latest_samples(self):
+        """Record the latest samples of the meters already sampled.
+
+        Each of them is looked up through the meter index, rather than
+        sorting all the samples at once.
+        """
+        for r in self.db.resource.find():
+            for counter_name in set(m['counter_name'] for m in r['meter']):
+                for s in self.db.meter.find(
+                        {'resource_id': r['_id'],
+                         'counter_name': counter_name},
+                        limit=1, sort=[('timestamp', pymongo.DESCENDING)]):
+                    self._record_latest_sample(s)
+
     def clear(self):
         self.conn.drop_database(self.db)
         # Connection will be reopened automatically if needed
@@ -408,6 +462,24 @@ class Connection(base.Connection):
         # a new key '_id').
         record = copy.copy(data)
         self.db.meter.insert(record)
+        self._record_latest_sample(data)
+
+    def _record_latest_sample(self, data):
+        """Keep the sample if it is the latest of its meter and resource.
+
+        The update only applies to an older latest sample. When there is
+        a newer one, the upsert fails on the unique index and nothing is
+        done. When another writer inserted the first latest sample
+        meanwhile, this sample replaces it if it is newer.
+        """
+        latest = dict((k, v) for k, v in data.iteritems() if k != '_id')
+        q = {'resource_id': data['resource_id'],
+             'counter_name': data['counter_name'],
+             'timestamp': {'$lte': data['timestamp']}}
+        try:
+            self.db.latest_sample.update(q, {'$set': latest}, upsert=True)
+        except pymongo.errors.DuplicateKeyError:
+            self.db.latest_sample.update(q, {'$set': latest})
 
     def clear_expired_metering_data(self, ttl):
         """Clear expired data from the backend storage system according to the
@@ -698,13 +770,38 @@ class Connection(base.Connection):
                 q, sort=[("timestamp", pymongo.DESCENDING)])
 
         for s in samples:
-            # Remove the ObjectId generated by the database when
-            # the sample was inserted. It is an implementation
-            # detail that should not leak outside of the driver.
-            del s['_id']
-            # Backward compatibility for samples without units
-            s['counter_unit'] = s.get('counter_unit', '')
-            yield models.Sample(**s)
+            yield self._make_sample(s)
+
+    @staticmethod
+    def _make_sample(s):
+        # Remove the ObjectId generated by the database when
+        # the sample was inserted. It is an implementation
+        # detail that should not leak outside of the driver.
+        del s['_id']
+        # Backward compatibility for samples without units
+        s['counter_unit'] = s.get('counter_unit', '')
+        return models.Sample(**s)
+
+    def get_latest_samples(self, sample_filter):
+        """Return an iterable of the latest model.Sample of each resource
+        matching the filter.
+
+        The filter must have a meter value set. The latest samples
+        recorded along with the samples are read, unless the filter has a
+        time range.
+        """
+        if sample_filter.start or sample_filter.end:
+            return super(Connection, self).get_latest_samples(sample_filter)
+        q = make_query_from_filter(sample_filter)
+        return (self._make_sample(s)
+                for s in self.db.latest_sample.find(q))
+
+    @staticmethod
+    def _check_groupby(groupby):
+        if (groupby and
+                set(groupby) - set(['user_id', 'project_id',
+                                    'resource_id', 'source'])):
+            raise NotImplementedError("Unable to group by these fields")
 
     def get_meter_statistics(self, sample_filter, period=None, groupby=None):
         """Return an iterable of models.Statistics instance containing meter
@@ -713,16 +810,33 @@ class Connection(base.Connection):
         The filter must have a meter value set.
 
         """
-        if (groupby and
-                set(groupby) - set(['user_id', 'project_id',
-                                    'resource_id', 'source'])):
-            raise NotImplementedError("Unable to group by these fields")
-
+        self._check_groupby(groupby)
         q = make_query_from_filter(sample_filter)
+        return self._get_statistics(q, sample_filter.start, period, groupby)
+
+    def get_meters_statistics(self, sample_filter, meters, period=None,
+                              groupby=None):
+        """Return an iterable of (meter name, models.Statistics) tuples,
+        computed for all the meters in a single map-reduce by also
+        grouping the samples by meter name.
 
+        """
+        self._check_groupby(groupby)
+        q = make_query_from_filter(sample_filter, require_meter=False)
+        q['counter_name'] = {'$in': list(meters)}
+        results = []
+        for stats in self._get_statistics(q, sample_filter.start, period,
+                                          ['counter_name'] + (groupby or [])):
+            meter = stats.groupby.pop('counter_name')
+            if not groupby:
+                stats.groupby = None
+            results.append((meter, stats))
+        return results
+
+    def _get_statistics(self, q, start, period, groupby):
         if period:
-            if sample_filter.start:
-                period_start = sample_filter.start
+            if start:
+                period_start = start
             else:
                 period_start = self.db.meter.find(
                     limit=1, sort=[('timestamp',
@@ -847,18 +961,70 @@ class Connection(base.Connection):
         """
         raise NotImplementedError('Alarm history not implemented')
 
-    @staticmethod
-    def record_events(events):
-        """Write the events.
+    def record_events(self, event_models):
+        """Write the events to the backend storage system.
+
+        All the events are sent to MongoDB in a single bulk insert.
 
-        :param events: a list of model.Event objects.
+        :param event_models: a list of model.Event objects.
         """
-        raise NotImplementedError('Events not implemented.')
+        if not event_models:
+            return
+        docs = []
+        for event_model in event_models:
+            traits = [{'trait_name': trait.name,
+                       'trait_type': trait.dtype,
+                       'trait_value': trait.value}
+                      for trait in event_model.traits or []]
+            docs.append({'event_name': event_model.event_name,
+                         'generated': event_model.generated,
+                         'traits': traits})
+
+        ids = self.db.event.insert(docs)
+
+        # Update the models with the underlying DB ID.
+        for model, event_id in zip(event_models, ids):
+            model.id = str(event_id)
+            for trait in model.traits or []:
+                trait.id = '%s:%s' % (model.id, trait.name)
 
     @staticmethod
-    def get_events(event_filter):
+    def _make_event_query(event_filter):
+        """Return a query dictionary based on the settings in the filter.
+
+        :param event_filter: EventFilter instance
+        """
+        q = {'generated': {'$gte': event_filter.start,
+                           '$lte': event_filter.end}}
+        if event_filter.event_name:
+            q['event_name'] = event_filter.event_name
+
+        if event_filter.traits:
+            trait_q = {}
+            for key, value in event_filter.traits.iteritems():
+                if key == 'key':
+                    trait_q['trait_name'] = value
+                elif key in models.EVENT_TRAIT_TYPES:
+                    trait_q['trait_type'] = models.EVENT_TRAIT_TYPES[key]
+                    trait_q['trait_value'] = value
+            if trait_q:
+                q['traits'] = {'$elemMatch': trait_q}
+        return q
+
+    def get_events(self, event_filter):
         """Return an iterable of model.Event objects.
 
         :param event_filter: EventFilter instance
         """
-        raise NotImplementedError('Events not implemented.')
+        q = self._make_event_query(event_filter)
+        events = []
+        for event in self.db.event.find(
+                q, sort=[('generated', pymongo.ASCENDING)]):
+            traits = [models.Trait(trait['trait_name'],
+                                   trait['trait_type'],
+                                   trait['trait_value'])
+                      for trait in event['traits']]
+            events.append(models.Event(event['event_name'],
+                                       event['generated'],
+                                       traits))
+        return events
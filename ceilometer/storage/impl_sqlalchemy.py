@@ -19,13 +19,21 @@
 
 from __future__ import absolute_import
 
+import copy
 import datetime
+import hashlib
+import json
 import operator
 import os
-from sqlalchemy import func
+from sqlalchemy import and_
 from sqlalchemy import desc
-from sqlalchemy.orm import aliased
+from sqlalchemy import exc
+from sqlalchemy import func
+from sqlalchemy import null
+from sqlalchemy import or_
+from sqlalchemy.orm import joinedload
 
+from ceilometer.openstack.common.db import exception as db_exception
 from ceilometer.openstack.common.gettextutils import _
 from ceilometer.openstack.common import log
 from ceilometer.openstack.common import timeutils
@@ -39,6 +47,7 @@ from ceilometer.storage.sqlalchemy.models import Event
 from ceilometer.storage.sqlalchemy.models import Meter
 from ceilometer.storage.sqlalchemy.models import Project
 from ceilometer.storage.sqlalchemy.models import Resource
+from ceilometer.storage.sqlalchemy.models import ResourceMeter
 from ceilometer.storage.sqlalchemy.models import Source
 from ceilometer.storage.sqlalchemy.models import Trait
 from ceilometer.storage.sqlalchemy.models import UniqueName
@@ -138,9 +147,53 @@ def make_query_from_filter(query, sample_filter, require_meter=True):
     return query
 
 
+def _same(a, b):
+    """Return the condition of two columns being equal or both NULL."""
+    return or_(a == b, and_(a == null(), b == null()))
+
+
+def _meter_type_hash(resource_id, counter_name, counter_type, counter_unit,
+                     user_id, project_id, source_id):
+    """Return the unique key of a ResourceMeter row.
+
+    The key columns are too long to be indexed together by MySQL and may
+    be NULL, so their hash is indexed instead.
+    """
+    return hashlib.md5(json.dumps([resource_id, counter_name, counter_type,
+                                   counter_unit, user_id, project_id,
+                                   source_id])).hexdigest()
+
+
+def _sample_from_row(s):
+    """Return the api_models.Sample of a Meter row."""
+    # Remove the id generated by the database when
+    # the sample was inserted. It is an implementation
+    # detail that should not leak outside of the driver.
+    return api_models.Sample(
+        # Replace 'sources' with 'source' to meet the caller's
+        # expectation, Meter.sources contains one and only one
+        # source in the current implementation.
+        source=s.sources[0].id,
+        counter_name=s.counter_name,
+        counter_type=s.counter_type,
+        counter_unit=s.counter_unit,
+        counter_volume=s.counter_volume,
+        user_id=s.user_id,
+        project_id=s.project_id,
+        resource_id=s.resource_id,
+        timestamp=s.timestamp,
+        resource_metadata=s.resource_metadata,
+        message_id=s.message_id,
+        message_signature=s.message_signature,
+    )
+
+
 class Connection(base.Connection):
     """SqlAlchemy connection."""
 
+    # Every operation uses a session of its own
+    thread_safe = True
+
     def __init__(self, conf):
         url = conf.database.connection
         if url == 'sqlite://':
@@ -157,13 +210,26 @@ class Connection(base.Connection):
         for table in reversed(Base.metadata.sorted_tables):
             engine.execute(table.delete())
 
-    @staticmethod
-    def record_metering_data(data):
+    @classmethod
+    def record_metering_data(cls, data):
         """Write the data to the backend storage system.
 
         :param data: a dictionary such as returned by
                      ceilometer.meter.meter_message_from_counter
         """
+        try:
+            cls._record_metering_data(data)
+        except db_exception.DBError as err:
+            # Another collector recorded the same meter type, or user,
+            # project or resource, meanwhile: it is found when retrying.
+            # The violation of a unique key is not recognised as a
+            # DBDuplicateEntry with every database version.
+            if not isinstance(err.inner_exception, exc.IntegrityError):
+                raise
+            cls._record_metering_data(data)
+
+    @staticmethod
+    def _record_metering_data(data):
         session = sqlalchemy_session.get_session()
         with session.begin():
             if data['source']:
@@ -214,8 +280,52 @@ class Connection(base.Connection):
             meter.counter_volume = data['counter_volume']
             meter.message_signature = data['message_signature']
             meter.message_id = data['message_id']
+
             session.flush()
 
+            # Record the meter type of the resource if new, and the time
+            # range and latest of its samples. The rows are updated
+            # conditionally so that concurrent collectors do not overwrite
+            # the latest sample with an older one.
+            timestamp = data['timestamp']
+            type_hash = _meter_type_hash(resource.id,
+                                         data['counter_name'],
+                                         data['counter_type'],
+                                         data['counter_unit'],
+                                         user and user.id,
+                                         project and project.id,
+                                         source and source.id)
+            meter_type = session.query(ResourceMeter.id).filter(
+                ResourceMeter.type_hash == type_hash).first()
+            if meter_type is None:
+                session.add(ResourceMeter(
+                    resource_id=resource.id,
+                    counter_name=data['counter_name'],
+                    counter_type=data['counter_type'],
+                    counter_unit=data['counter_unit'],
+                    user_id=user and user.id,
+                    project_id=project and project.id,
+                    source_id=source and source.id,
+                    type_hash=type_hash,
+                    first_sample_timestamp=timestamp,
+                    last_sample_timestamp=timestamp,
+                    meter_id=meter.id))
+                session.flush()
+            else:
+                session.query(ResourceMeter).filter(
+                    ResourceMeter.id == meter_type.id,
+                    or_(ResourceMeter.first_sample_timestamp == null(),
+                        ResourceMeter.first_sample_timestamp > timestamp),
+                ).update({'first_sample_timestamp': timestamp},
+                         synchronize_session=False)
+                session.query(ResourceMeter).filter(
+                    ResourceMeter.id == meter_type.id,
+                    or_(ResourceMeter.last_sample_timestamp == null(),
+                        ResourceMeter.last_sample_timestamp <= timestamp),
+                ).update({'last_sample_timestamp': timestamp,
+                          'meter_id': meter.id},
+                         synchronize_session=False)
+
     @staticmethod
     def clear_expired_metering_data(ttl):
         """Clear expired data from the backend storage system according to the
@@ -225,11 +335,33 @@ class Connection(base.Connection):
 
         """
         session = sqlalchemy_session.get_session()
-        query = session.query(Meter.id)
         end = timeutils.utcnow() - datetime.timedelta(seconds=ttl)
+        # The meter types whose samples all expire, before their latest
+        # sample is deleted.
+        query = session.query(ResourceMeter.id).filter(
+            ResourceMeter.last_sample_timestamp < end)
+        query.delete()
+
+        query = session.query(Meter.id)
         query = query.filter(Meter.timestamp < end)
         query.delete()
 
+        # The subquery has to be correlated to the updated table explicitly
+        first_sample = session.query(func.min(Meter.timestamp)).join(
+            Meter.sources).filter(
+                Meter.resource_id == ResourceMeter.resource_id,
+                Meter.counter_name == ResourceMeter.counter_name,
+                Meter.counter_type == ResourceMeter.counter_type,
+                Meter.counter_unit == ResourceMeter.counter_unit,
+                _same(Meter.user_id, ResourceMeter.user_id),
+                _same(Meter.project_id, ResourceMeter.project_id),
+                Source.id == ResourceMeter.source_id,
+            ).correlate(ResourceMeter).as_scalar()
+        query = session.query(ResourceMeter).filter(
+            ResourceMeter.first_sample_timestamp < end)
+        query.update({'first_sample_timestamp': first_sample},
+                     synchronize_session=False)
+
         query = session.query(User.id).filter(~User.id.in_(
             session.query(Meter.user_id).group_by(Meter.user_id)
         ))
@@ -292,48 +424,84 @@ class Connection(base.Connection):
             raise NotImplementedError(_('Pagination not implemented'))
 
         session = sqlalchemy_session.get_session()
-        query = session.query(
-            Meter,
-            func.min(Meter.timestamp),
-            func.max(Meter.timestamp),
-        ).group_by(Meter.resource_id)
-        if user is not None:
-            query = query.filter(Meter.user_id == user)
-        if source is not None:
-            query = query.filter(Meter.sources.any(id=source))
-        if start_timestamp:
-            if start_timestamp_op == 'gt':
-                query = query.filter(Meter.timestamp > start_timestamp)
-            else:
-                query = query.filter(Meter.timestamp >= start_timestamp)
-        if end_timestamp:
-            if end_timestamp_op == 'le':
-                query = query.filter(Meter.timestamp <= end_timestamp)
-            else:
-                query = query.filter(Meter.timestamp < end_timestamp)
-        if project is not None:
-            query = query.filter(Meter.project_id == project)
-        if resource is not None:
-            query = query.filter(Meter.resource_id == resource)
         if metaquery:
             raise NotImplementedError('metaquery not implemented')
 
-        for meter, first_ts, last_ts in query.all():
+        if start_timestamp or end_timestamp:
+            # The time range of the matching samples of each resource,
+            # the resources being then read along with their meter types
+            # and sources rather than from their samples.
+            subquery = session.query(
+                Meter.resource_id.label('resource_id'),
+                func.min(Meter.timestamp).label('first_sample_timestamp'),
+                func.max(Meter.timestamp).label('last_sample_timestamp'),
+            ).group_by(Meter.resource_id)
+            if user is not None:
+                subquery = subquery.filter(Meter.user_id == user)
+            if source is not None:
+                subquery = subquery.filter(Meter.sources.any(id=source))
+            if start_timestamp:
+                if start_timestamp_op == 'gt':
+                    subquery = subquery.filter(
+                        Meter.timestamp > start_timestamp)
+                else:
+                    subquery = subquery.filter(
+                        Meter.timestamp >= start_timestamp)
+            if end_timestamp:
+                if end_timestamp_op == 'le':
+                    subquery = subquery.filter(
+                        Meter.timestamp <= end_timestamp)
+                else:
+                    subquery = subquery.filter(
+                        Meter.timestamp < end_timestamp)
+            if project is not None:
+                subquery = subquery.filter(Meter.project_id == project)
+            if resource is not None:
+                subquery = subquery.filter(Meter.resource_id == resource)
+        else:
+            # Without a time range, the one of the samples is recorded
+            # with the meter types.
+            subquery = session.query(
+                ResourceMeter.resource_id.label('resource_id'),
+                func.min(ResourceMeter.first_sample_timestamp).label(
+                    'first_sample_timestamp'),
+                func.max(ResourceMeter.last_sample_timestamp).label(
+                    'last_sample_timestamp'),
+            ).group_by(ResourceMeter.resource_id)
+            if user is not None:
+                subquery = subquery.filter(ResourceMeter.user_id == user)
+            if source is not None:
+                subquery = subquery.filter(ResourceMeter.source_id == source)
+            if project is not None:
+                subquery = subquery.filter(
+                    ResourceMeter.project_id == project)
+            if resource is not None:
+                subquery = subquery.filter(
+                    ResourceMeter.resource_id == resource)
+        subquery = subquery.subquery()
+
+        query = session.query(
+            Resource,
+            subquery.c.first_sample_timestamp,
+            subquery.c.last_sample_timestamp,
+        ).join(subquery, Resource.id == subquery.c.resource_id).options(
+            joinedload(Resource.meter_types), joinedload(Resource.sources))
+
+        for r, first_ts, last_ts in query.all():
             yield api_models.Resource(
-                resource_id=meter.resource_id,
-                project_id=meter.project_id,
+                resource_id=r.id,
+                project_id=r.project_id,
                 first_sample_timestamp=first_ts,
                 last_sample_timestamp=last_ts,
-                source=meter.sources[0].id,
-                user_id=meter.user_id,
-                metadata=meter.resource_metadata,
+                source=source or r.sources[0].id,
+                user_id=r.user_id,
+                metadata=r.resource_metadata,
                 meter=[
-                    api_models.ResourceMeter(
-                        counter_name=m.counter_name,
-                        counter_type=m.counter_type,
-                        counter_unit=m.counter_unit,
-                    )
-                    for m in meter.resource.meters
+                    api_models.ResourceMeter(*m)
+                    for m in sorted(set((m.counter_name,
+                                         m.counter_type,
+                                         m.counter_unit)
+                                        for m in r.meter_types))
                 ],
             )
 
@@ -355,29 +523,12 @@ class Connection(base.Connection):
 
         session = sqlalchemy_session.get_session()
 
-        # Meter table will store large records and join with resource
-        # will be very slow.
-        # subquery_meter is used to reduce meter records
-        # by selecting a record for each (resource_id, counter_name).
-        # max() is used to choice a meter record, so the latest record
-        # is selected for each (resource_id, counter_name).
-        #
-        subquery_meter = session.query(func.max(Meter.id).label('id')).\
-            group_by(Meter.resource_id, Meter.counter_name).subquery()
-
-        # The SQL of query_meter is essentially:
-        #
-        # SELECT meter.* FROM meter INNER JOIN
-        #  (SELECT max(meter.id) AS id FROM meter
-        #   GROUP BY meter.resource_id, meter.counter_name) AS anon_2
-        # ON meter.id = anon_2.id
-        #
-        query_meter = session.query(Meter).\
-            join(subquery_meter, Meter.id == subquery_meter.c.id)
-
-        alias_meter = aliased(Meter, query_meter.subquery())
-        query = session.query(Resource, alias_meter).join(
-            alias_meter, Resource.id == alias_meter.resource_id)
+        # The meter types are read rather than the samples, ordered so
+        # that the type of the latest sample of a meter comes last.
+        query = session.query(Resource, ResourceMeter).join(
+            ResourceMeter, Resource.id == ResourceMeter.resource_id).options(
+                joinedload(Resource.sources)).order_by(
+                    ResourceMeter.last_sample_timestamp)
 
         if user is not None:
             query = query.filter(Resource.user_id == user)
@@ -390,11 +541,14 @@ class Connection(base.Connection):
         if metaquery:
             raise NotImplementedError('metaquery not implemented')
 
-        for resource, meter in query.all():
+        meters = dict(((resource.id, meter_type.counter_name),
+                       (resource, meter_type))
+                      for resource, meter_type in query.all())
+        for resource, meter_type in meters.itervalues():
             yield api_models.Meter(
-                name=meter.counter_name,
-                type=meter.counter_type,
-                unit=meter.counter_unit,
+                name=meter_type.counter_name,
+                type=meter_type.counter_type,
+                unit=meter_type.counter_unit,
                 resource_id=resource.id,
                 project_id=resource.project_id,
                 source=resource.sources[0].id,
@@ -414,34 +568,42 @@ class Connection(base.Connection):
         query = session.query(Meter)
         query = make_query_from_filter(query, sample_filter,
                                        require_meter=False)
+        query = query.order_by(desc(Meter.timestamp))
         if limit:
             query = query.limit(limit)
-        samples = query.from_self().order_by(desc(Meter.timestamp)).all()
+        samples = query.all()
 
         for s in samples:
-            # Remove the id generated by the database when
-            # the sample was inserted. It is an implementation
-            # detail that should not leak outside of the driver.
-            yield api_models.Sample(
-                # Replace 'sources' with 'source' to meet the caller's
-                # expectation, Meter.sources contains one and only one
-                # source in the current implementation.
-                source=s.sources[0].id,
-                counter_name=s.counter_name,
-                counter_type=s.counter_type,
-                counter_unit=s.counter_unit,
-                counter_volume=s.counter_volume,
-                user_id=s.user_id,
-                project_id=s.project_id,
-                resource_id=s.resource_id,
-                timestamp=s.timestamp,
-                resource_metadata=s.resource_metadata,
-                message_id=s.message_id,
-                message_signature=s.message_signature,
-            )
+            yield _sample_from_row(s)
+
+    def get_latest_samples(self, sample_filter):
+        """Return an iterable of the latest api_models.Sample of each
+        resource matching the filter.
+
+        The latest sample of each meter type of the resources is recorded
+        along with the samples, it is read rather than the samples unless
+        the filter has a time range.
+
+        :param sample_filter: Filter, its meter must be set.
+        """
+        if sample_filter.start or sample_filter.end:
+            for s in super(Connection, self).get_latest_samples(
+                    sample_filter):
+                yield s
+            return
+
+        session = sqlalchemy_session.get_session()
+        query = session.query(Meter).join(
+            ResourceMeter, ResourceMeter.meter_id == Meter.id)
+        query = make_query_from_filter(query, sample_filter)
+        # A resource may have samples of several types or units of a meter
+        samples = dict((s.resource_id, s) for s in
+                       query.order_by(Meter.timestamp).all())
+        for s in samples.itervalues():
+            yield _sample_from_row(s)
 
     @staticmethod
-    def _make_stats_query(sample_filter, groupby):
+    def _make_stats_query(sample_filter, groupby, meters=None):
         select = [
             Meter.counter_unit.label('unit'),
             func.min(Meter.timestamp).label('tsmin'),
@@ -464,7 +626,11 @@ class Connection(base.Connection):
         if groupby:
             query = query.group_by(*group_attributes)
 
-        return make_query_from_filter(query, sample_filter)
+        if meters:
+            query = query.filter(Meter.counter_name.in_(meters))
+
+        return make_query_from_filter(query, sample_filter,
+                                      require_meter=not meters)
 
     @staticmethod
     def _stats_result_to_model(result, period, period_start,
@@ -489,6 +655,14 @@ class Connection(base.Connection):
                      if groupby else None)
         )
 
+    @staticmethod
+    def _check_groupby(groupby):
+        if groupby:
+            for group in groupby:
+                if group not in ['user_id', 'project_id', 'resource_id']:
+                    raise NotImplementedError(
+                        "Unable to group by these fields")
+
     def get_meter_statistics(self, sample_filter, period=None, groupby=None):
         """Return an iterable of api_models.Statistics instances containing
         meter statistics described by the query parameters.
@@ -496,14 +670,31 @@ class Connection(base.Connection):
         The filter must have a meter value set.
 
         """
-        if groupby:
-            for group in groupby:
-                if group not in ['user_id', 'project_id', 'resource_id']:
-                    raise NotImplementedError(
-                        "Unable to group by these fields")
+        self._check_groupby(groupby)
+        for stats in self._get_statistics(sample_filter, period, groupby):
+            yield stats
+
+    def get_meters_statistics(self, sample_filter, meters, period=None,
+                              groupby=None):
+        """Return an iterable of (meter name, api_models.Statistics)
+        tuples, computed for all the meters at once by grouping the
+        samples by meter name too.
 
+        """
+        self._check_groupby(groupby)
+        f = copy.copy(sample_filter)
+        f.meter = None
+        for stats in self._get_statistics(f, period,
+                                          ['counter_name'] + (groupby or []),
+                                          meters):
+            meter = stats.groupby.pop('counter_name')
+            if not groupby:
+                stats.groupby = None
+            yield meter, stats
+
+    def _get_statistics(self, sample_filter, period, groupby, meters=None):
         if not period:
-            for res in self._make_stats_query(sample_filter, groupby):
+            for res in self._make_stats_query(sample_filter, groupby, meters):
                 if res.count:
                     yield self._stats_result_to_model(res, 0,
                                                       res.tsmin, res.tsmax,
@@ -511,9 +702,9 @@ class Connection(base.Connection):
             return
 
         if not sample_filter.start or not sample_filter.end:
-            res = self._make_stats_query(sample_filter, None).first()
+            res = self._make_stats_query(sample_filter, None, meters).first()
 
-        query = self._make_stats_query(sample_filter, groupby)
+        query = self._make_stats_query(sample_filter, groupby, meters)
         # HACK(jd) This is an awful method to compute stats by period, but
         # since we're trying to be SQL agnostic we have to write portable
         # code, so here it is, admire! We're going to do one request to get
@@ -84,6 +84,15 @@ class Trait(Model):
         return "<Trait: %s %d %s>" % (self.name, self.dtype, self.value)
 
 
+# Map the EventFilter trait value keys to the Trait data types.
+EVENT_TRAIT_TYPES = {
+    't_string': Trait.TEXT_TYPE,
+    't_int': Trait.INT_TYPE,
+    't_float': Trait.FLOAT_TYPE,
+    't_datetime': Trait.DATETIME_TYPE,
+}
+
+
 class Resource(Model):
     """Something for which sample data has been collected.
     """
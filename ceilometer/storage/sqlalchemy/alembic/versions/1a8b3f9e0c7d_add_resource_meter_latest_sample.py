@@ -0,0 +1,115 @@
+# -*- encoding: utf-8 -*-
+#
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""Add the latest sample of the meter types of the resources
+
+Revision ID: 1a8b3f9e0c7d
+Revises: 4f38c4a6b2d1
+Create Date: 2013-11-12 10:47:08.613592
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '1a8b3f9e0c7d'
+down_revision = '4f38c4a6b2d1'
+
+import hashlib
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+TABLE_NAME = 'resource_meter'
+TYPE = ('counter_name', 'counter_type', 'counter_unit')
+KEY = ('resource_id', 'user_id', 'project_id') + TYPE
+# The columns of the hash, in the order of impl_sqlalchemy._meter_type_hash
+HASH_KEY = ('resource_id',) + TYPE + ('user_id', 'project_id', 'source_id')
+HASH_INDEX = 'uniq_resource_meter0type_hash'
+FOREIGN_KEYS = (('user_id', 'user'),
+                ('project_id', 'project'),
+                ('source_id', 'source'),
+                ('meter_id', 'meter'))
+
+
+def _same(column):
+    return ("(meter.%(c)s = resource_meter.%(c)s OR "
+            "(meter.%(c)s IS NULL AND resource_meter.%(c)s IS NULL))"
+            % {'c': column})
+
+
+def upgrade():
+    for column in (sa.Column('user_id', sa.String(255)),
+                   sa.Column('project_id', sa.String(255)),
+                   sa.Column('source_id', sa.String(255)),
+                   sa.Column('first_sample_timestamp', sa.DateTime),
+                   sa.Column('last_sample_timestamp', sa.DateTime),
+                   sa.Column('meter_id', sa.Integer),
+                   sa.Column('type_hash', sa.String(32))):
+        op.add_column(TABLE_NAME, column)
+    if op.get_bind().engine.name != 'sqlite':
+        for column, table in FOREIGN_KEYS:
+            op.create_foreign_key('fk_%s_%s' % (TABLE_NAME, column),
+                                  TABLE_NAME, table, [column], ['id'])
+
+    # Record the meter types per user, project and source of the samples
+    op.execute("DELETE FROM resource_meter")
+    op.execute(
+        "INSERT INTO resource_meter (%(key)s, source_id, "
+        "first_sample_timestamp, last_sample_timestamp) "
+        "SELECT %(meter_key)s, sourceassoc.source_id, "
+        "min(meter.timestamp), max(meter.timestamp) "
+        "FROM meter JOIN sourceassoc ON sourceassoc.meter_id = meter.id "
+        "GROUP BY %(meter_key)s, sourceassoc.source_id"
+        % {'key': ', '.join(KEY),
+           'meter_key': ', '.join('meter.%s' % c for c in KEY)})
+    op.execute(
+        "UPDATE resource_meter SET meter_id = (SELECT max(meter.id) "
+        "FROM meter JOIN sourceassoc ON sourceassoc.meter_id = meter.id "
+        "WHERE %s AND sourceassoc.source_id = resource_meter.source_id "
+        "AND meter.timestamp = resource_meter.last_sample_timestamp)"
+        % ' AND '.join(_same(c) for c in KEY))
+    bind = op.get_bind()
+    rows = bind.execute("SELECT id, %s FROM resource_meter"
+                        % ', '.join(HASH_KEY)).fetchall()
+    for row in rows:
+        bind.execute(
+            sa.text("UPDATE resource_meter SET type_hash = :type_hash "
+                    "WHERE id = :id"),
+            type_hash=hashlib.md5(json.dumps(list(row[1:]))).hexdigest(),
+            id=row[0])
+    op.create_index(HASH_INDEX, TABLE_NAME, ['type_hash'], unique=True)
+
+
+def downgrade():
+    op.drop_index(HASH_INDEX, TABLE_NAME)
+    engine = op.get_bind().engine
+    if engine.name != 'sqlite':
+        # The columns can not be dropped while they are in a foreign key
+        for column, table in FOREIGN_KEYS:
+            op.drop_constraint('fk_%s_%s' % (TABLE_NAME, column),
+                               TABLE_NAME, type_='foreignkey')
+    meta = sa.MetaData(engine)
+    for table in ('meter', 'user', 'project', 'source'):
+        sa.Table(table, meta, autoload=True)
+    resource_meter = sa.Table(TABLE_NAME, meta, autoload=True)
+    for column in ('type_hash', 'meter_id', 'last_sample_timestamp',
+                   'first_sample_timestamp', 'source_id', 'project_id',
+                   'user_id'):
+        resource_meter.c[column].drop()
+
+    # Keep one row per meter type of the resources
+    op.execute(
+        "DELETE FROM resource_meter WHERE id NOT IN "
+        "(SELECT id FROM (SELECT min(id) AS id FROM resource_meter "
+        "GROUP BY resource_id, %s) AS kept)" % ', '.join(TYPE))
@@ -0,0 +1,54 @@
+# -*- encoding: utf-8 -*-
+#
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""Add table resource_meter
+
+Revision ID: 4f38c4a6b2d1
+Revises: 2c3ccda5a3ad
+Create Date: 2013-11-04 15:12:31.274803
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '4f38c4a6b2d1'
+down_revision = '2c3ccda5a3ad'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.create_table(
+        'resource_meter',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('resource_id', sa.String(255),
+                  sa.ForeignKey('resource.id',
+                                name='fk_resource_meter_resource_id')),
+        sa.Column('counter_name', sa.String(255)),
+        sa.Column('counter_type', sa.String(255)),
+        sa.Column('counter_unit', sa.String(255)),
+    )
+    op.create_index('ix_resource_meter_resource_id', 'resource_meter',
+                    ['resource_id'])
+
+    # Record the meter types of the resources already sampled
+    op.execute(
+        "INSERT INTO resource_meter "
+        "(resource_id, counter_name, counter_type, counter_unit) "
+        "SELECT DISTINCT resource_id, counter_name, counter_type, "
+        "counter_unit FROM meter")
+
+
+def downgrade():
+    op.drop_table('resource_meter')
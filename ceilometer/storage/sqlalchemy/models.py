@@ -167,6 +167,34 @@ class Resource(Base):
     user_id = Column(String(255), ForeignKey('user.id'))
     project_id = Column(String(255), ForeignKey('project.id'))
     meters = relationship("Meter", backref='resource')
+    meter_types = relationship("ResourceMeter", backref='resource')
+
+
+class ResourceMeter(Base):
+    """Meter types a resource has samples of, per user, project and
+    source of the samples, recorded along with the samples so that the
+    resources are listed without reading them, with the time range and
+    the latest of these samples.
+    """
+    __tablename__ = 'resource_meter'
+    __table_args__ = (
+        Index('ix_resource_meter_resource_id', 'resource_id'),
+        Index('uniq_resource_meter0type_hash', 'type_hash', unique=True),
+    )
+    id = Column(Integer, primary_key=True)
+    resource_id = Column(String(255), ForeignKey('resource.id'))
+    counter_name = Column(String(255))
+    counter_type = Column(String(255))
+    counter_unit = Column(String(255))
+    user_id = Column(String(255), ForeignKey('user.id'))
+    project_id = Column(String(255), ForeignKey('project.id'))
+    source_id = Column(String(255), ForeignKey('source.id'))
+    first_sample_timestamp = Column(DateTime)
+    last_sample_timestamp = Column(DateTime)
+    meter_id = Column(Integer, ForeignKey('meter.id'))
+    meter = relationship("Meter")
+    # Unique hash of the resource and of the meter type columns
+    type_hash = Column(String(32))
 
 
 class Alarm(Base):
@@ -48,6 +48,12 @@ class TestCase(testtools.TestCase):
             'pipeline_cfg_file',
             self.path_get('etc/ceilometer/pipeline.yaml')
         )
+        cfg.CONF.import_opt('meter_definitions_cfg_file',
+                            'ceilometer.meter.notifications')
+        cfg.CONF.set_override(
+            'meter_definitions_cfg_file',
+            self.path_get('etc/ceilometer/meters.yaml')
+        )
 
     def path_get(self, project_file=None):
         root = os.path.abspath(os.path.join(os.path.dirname(__file__),
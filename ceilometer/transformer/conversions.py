@@ -16,6 +16,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import array
+import calendar
 from collections import defaultdict
 
 from ceilometer import sample
@@ -147,3 +149,164 @@ class RateOfChangeTransformer(ScalingTransformer):
                      (s,))
             s = None
         return s
+
+
+class VolumeStore(object):
+    """Last volume and timestamp of each (meter, resource).
+
+    The values are kept in arrays of doubles indexed through a single
+    dictionary, rather than in a tuple per key, to keep the memory
+    footprint low on hosts with many resources.
+
+    :param expiry: number of seconds after which the keys not seen are
+                   forgotten, their slots being reused, 0 to keep them
+                   forever
+    """
+
+    def __init__(self, expiry=0):
+        self.expiry = expiry
+        self._index = {}
+        self._free = []
+        self._volumes = array.array('d')
+        self._timestamps = array.array('d')
+        self._seen = array.array('d')
+        self._swept = None
+
+    def __len__(self):
+        return len(self._index)
+
+    def get(self, key):
+        """Return the (volume, timestamp) stored for key, or None."""
+        i = self._index.get(key)
+        if i is None:
+            return None
+        return self._volumes[i], self._timestamps[i]
+
+    def set(self, key, volume, timestamp):
+        i = self._index.get(key)
+        if i is None:
+            if self._free:
+                i = self._free.pop()
+                self._volumes[i] = volume
+                self._timestamps[i] = timestamp
+                self._seen[i] = timestamp
+            else:
+                i = len(self._volumes)
+                self._volumes.append(volume)
+                self._timestamps.append(timestamp)
+                self._seen.append(timestamp)
+            self._index[key] = i
+        else:
+            self._volumes[i] = volume
+            self._timestamps[i] = timestamp
+            self._seen[i] = timestamp
+        self._expire(timestamp)
+
+    def touch(self, key, timestamp):
+        """Record that key was seen without changing its volume."""
+        i = self._index.get(key)
+        if i is not None:
+            self._seen[i] = max(self._seen[i], timestamp)
+        self._expire(timestamp)
+
+    def _expire(self, now):
+        # Sweep the keys once per expiry period at most
+        if not self.expiry:
+            return
+        if self._swept is None:
+            self._swept = now
+        if now - self._swept < self.expiry:
+            return
+        self._swept = now
+        cutoff = now - self.expiry
+        for key, i in self._index.items():
+            if self._seen[i] < cutoff:
+                del self._index[key]
+                self._free.append(i)
+
+
+class DeltaTransformer(ScalingTransformer):
+    """Transformer emitting the change of a sample volume since the
+       previous sample of the same meter and resource, either as a
+       delta or as a rate per second, so that agents can publish
+       changes rather than raw cumulative values.
+    """
+
+    def __init__(self, rate=False, suppress_unchanged=False, threshold=0.0,
+                 expiry=3600, target={}, **kwargs):
+        """Initialize transformer with configured parameters.
+
+        :param rate: emit the change per second as a gauge rather than
+                     the change itself as a delta
+        :param suppress_unchanged: drop the samples whose change is not
+                                   greater than the threshold; the change
+                                   is then carried over to the next
+                                   emitted sample
+        :param threshold: absolute change at or below which a sample is
+                          deemed unchanged
+        :param expiry: number of seconds after which the volume of a
+                       meter and resource no longer sampled is forgotten,
+                       0 to keep it forever
+        :param target: as for the ScalingTransformer, the type defaulting
+                       to gauge for rates and to delta otherwise
+        """
+        self.rate = rate
+        self.suppress_unchanged = suppress_unchanged
+        self.threshold = threshold
+        self.store = VolumeStore(expiry)
+        target = dict(target)
+        target.setdefault('type', sample.TYPE_GAUGE if rate
+                          else sample.TYPE_DELTA)
+        super(DeltaTransformer, self).__init__(target=target, **kwargs)
+
+    @staticmethod
+    def _seconds(timestamp):
+        timestamp = timeutils.normalize_time(
+            timeutils.parse_isotime(timestamp))
+        return (calendar.timegm(timestamp.timetuple()) +
+                timestamp.microsecond / 1e6)
+
+    def handle_sample(self, context, s):
+        """Handle a sample, converting if necessary."""
+        LOG.debug('handling sample %s', (s,))
+        key = s.name + s.resource_id
+        prev = self.store.get(key)
+        timestamp = self._seconds(s.timestamp)
+
+        if prev is None:
+            self.store.set(key, s.volume, timestamp)
+            LOG.debug(_('dropping sample with no predecessor: %s') % (s,))
+            return None
+
+        prev_volume, prev_timestamp = prev
+        # as for the rate of change, a cumulative volume going down means
+        # that it was reset in the interim
+        volume_delta = (s.volume - prev_volume
+                        if (prev_volume <= s.volume or
+                            s.type != sample.TYPE_CUMULATIVE)
+                        else s.volume)
+        if self.suppress_unchanged and abs(volume_delta) <= self.threshold:
+            self.store.touch(key, timestamp)
+            LOG.debug(_('dropping unchanged sample: %s') % (s,))
+            return None
+        self.store.set(key, s.volume, timestamp)
+
+        if self.rate:
+            time_delta = timestamp - prev_timestamp
+            volume = (1.0 * volume_delta / time_delta) if time_delta else 0.0
+        else:
+            volume = volume_delta
+        s = self._convert(sample.Sample(
+            name=s.name,
+            type=s.type,
+            unit=s.unit + '/s' if self.rate else s.unit,
+            volume=volume,
+            user_id=s.user_id,
+            project_id=s.project_id,
+            resource_id=s.resource_id,
+            timestamp=s.timestamp,
+            resource_metadata=s.resource_metadata,
+            source=s.source,
+        ))
+        LOG.debug(_('converted to: %s') % (s,))
+        return s
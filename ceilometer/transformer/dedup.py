@@ -0,0 +1,67 @@
+# -*- encoding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from ceilometer import sample as sample_util
+from ceilometer import transformer
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    # Python 2.6
+    from ordereddict import OrderedDict
+
+
+class DedupTransformer(transformer.TransformerBase):
+    """Transformer that drops the samples whose volume and metadata did not
+    change since the last one emitted for the same meter and resource.
+
+    """
+
+    def __init__(self, heartbeat=10, metadata_keys=[], size=10000,
+                 **kwargs):
+        """Initialize transformer with configured parameters.
+
+        :param heartbeat: number of samples after which an unchanged
+                          sample is emitted again anyway, 0 to never
+                          emit them again
+        :param metadata_keys: resource metadata keys whose change causes
+                              a sample to be emitted
+        :param size: maximum number of meters and resources remembered,
+                     the least recently seen being forgotten first
+        """
+        self.heartbeat = heartbeat
+        self.metadata_keys = metadata_keys
+        self.size = size
+        # (volume, metadata values, samples dropped) keyed by
+        # (name, resource_id), the least recently seen first
+        self.last = OrderedDict()
+        super(DedupTransformer, self).__init__(**kwargs)
+
+    def handle_sample(self, context, sample):
+        # Deltas repeating the same volume are changes on their own
+        if sample.type == sample_util.TYPE_DELTA:
+            return sample
+        key = (sample.name, sample.resource_id)
+        metadata = tuple((sample.resource_metadata or {}).get(k)
+                         for k in self.metadata_keys)
+        last = self.last.pop(key, None)
+        if (last is not None and last[0] == sample.volume and
+                last[1] == metadata and
+                (not self.heartbeat or last[2] + 1 < self.heartbeat)):
+            self.last[key] = (last[0], last[1], last[2] + 1)
+            return None
+        self.last[key] = (sample.volume, metadata, 0)
+        if len(self.last) > self.size:
+            self.last.popitem(last=False)
+        return sample
@@ -15,15 +15,14 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
-"""Converters for producing volume counter messages from cinder notification
-events.
+"""Options for consuming cinder notification events.
+
+Volume meters are produced from the definitions of meters.yaml, see
+ceilometer.meter.notifications.
 """
 
 from oslo.config import cfg
 
-from ceilometer import sample
-from ceilometer import plugin
-
 
 OPTS = [
     cfg.StrOpt('cinder_control_exchange',
@@ -33,51 +32,3 @@ OPTS = [
 
 
 cfg.CONF.register_opts(OPTS)
-
-
-class _Base(plugin.NotificationBase):
-    """Convert volume notifications into Counters."""
-
-    event_types = [
-        'volume.exists',
-        'volume.create.*',
-        'volume.delete.*',
-    ]
-
-    @staticmethod
-    def get_exchange_topics(conf):
-        """Return a sequence of ExchangeTopics defining the exchange and
-        topics to be connected for this plugin.
-        """
-        return [
-            plugin.ExchangeTopics(
-                exchange=conf.cinder_control_exchange,
-                topics=set(topic + ".info"
-                           for topic in conf.notification_topics)),
-        ]
-
-
-class Volume(_Base):
-    def process_notification(self, message):
-        yield sample.Sample.from_notification(
-            name='volume',
-            type=sample.TYPE_GAUGE,
-            unit='volume',
-            volume=1,
-            user_id=message['payload']['user_id'],
-            project_id=message['payload']['tenant_id'],
-            resource_id=message['payload']['volume_id'],
-            message=message)
-
-
-class VolumeSize(_Base):
-    def process_notification(self, message):
-        yield sample.Sample.from_notification(
-            name='volume.size',
-            type=sample.TYPE_GAUGE,
-            unit='GB',
-            volume=message['payload']['size'],
-            user_id=message['payload']['user_id'],
-            project_id=message['payload']['tenant_id'],
-            resource_id=message['payload']['volume_id'],
-            message=message)
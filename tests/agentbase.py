@@ -23,6 +23,7 @@ import abc
 import datetime
 import mock
 
+from oslo.config import cfg
 from stevedore import extension
 from stevedore.tests import manager as extension_tests
 
@@ -245,3 +246,90 @@ class BaseAgentManagerTestCase(base.TestCase):
         self.mgr.interval_task(polling_tasks.get(10))
         pub = self.mgr.pipeline_manager.pipelines[0].publishers[0]
         self.assertEqual(len(pub.samples), 0)
+
+    def _initial_delay(self, host, now=1000.0):
+        cfg.CONF.set_override('host', host)
+        service = mock.MagicMock()
+        with mock.patch('ceilometer.pipeline.setup_pipeline',
+                        return_value=self.mgr.pipeline_manager):
+            with mock.patch('time.time', return_value=now):
+                self.mgr.initialize_service_hook(service)
+        return service.tg.add_timer.call_args[0][2]
+
+    def test_initialize_service_hook_jitter(self):
+        cfg.CONF.set_override('polling_jitter', 10)
+        delays = [self._initial_delay('host%d' % i, now=1200.0)
+                  for i in range(10)]
+        for delay in delays:
+            self.assertTrue(0 <= delay < 10)
+        self.assertTrue(len(set(delays)) > 1)
+        self.assertEqual(delays[0], self._initial_delay('host0', now=1200.0))
+
+    def test_initialize_service_hook_jitter_across_restarts(self):
+        cfg.CONF.set_override('polling_jitter', 10)
+        # whenever the agent starts, it polls at the same times of the
+        # 60 seconds interval
+        polls = [(now + self._initial_delay('host0', now)) % 60
+                 for now in (1000.0, 1003.5, 2007.25)]
+        self.assertAlmostEqual(polls[0], polls[1])
+        self.assertAlmostEqual(polls[0], polls[2])
+        self.assertTrue(0 <= polls[0] < 10)
+
+    def test_initialize_service_hook_no_jitter(self):
+        service = mock.MagicMock()
+        with mock.patch('ceilometer.pipeline.setup_pipeline',
+                        return_value=self.mgr.pipeline_manager):
+            self.mgr.initialize_service_hook(service)
+        self.assertEqual(service.tg.add_timer.call_args[0][2], None)
+
+    def test_schedule_task(self):
+        self.mgr.service = mock.MagicMock()
+        task = self.mgr.setup_polling_tasks()[60]
+        self.mgr.schedule_task(task, 60)
+        self.assertTrue(task.running)
+        self.mgr.service.tg.add_thread.assert_called_once_with(
+            self.mgr._run_task, task, 60)
+
+    def test_schedule_task_skips_overrun(self):
+        self.mgr.service = mock.MagicMock()
+        task = self.mgr.setup_polling_tasks()[60]
+        task.running = True
+        self.mgr.schedule_task(task, 60)
+        self.mgr.schedule_task(task, 60)
+        self.assertFalse(self.mgr.service.tg.add_thread.called)
+        self.assertEqual(task.overruns, 2)
+
+    def test_run_task(self):
+        task = self.mgr.setup_polling_tasks()[60]
+        task.running = True
+        self.mgr._run_task(task, 60)
+        self.assertFalse(task.running)
+        self.assertEqual(task.durations.keys(), ['test'])
+        pub = self.mgr.pipeline_manager.pipelines[0].publishers[0]
+        self.assertEqual(pub.samples[0], self.Pollster.test_data)
+
+    def test_run_task_publishes_statistics(self):
+        cfg.CONF.set_override('publish_polling_statistics', True)
+        self.pipeline_cfg[0]['counters'].append('ceilometer.polling.*')
+        self.setup_pipeline()
+        task = self.mgr.setup_polling_tasks()[60]
+        task.running = True
+        task.overruns = 3
+        self.mgr._run_task(task, 60)
+        pub = self.mgr.pipeline_manager.pipelines[0].publishers[0]
+        stats = dict((s.name, s) for s in pub.samples
+                     if s.name.startswith('ceilometer.polling.'))
+        self.assertEqual(stats['ceilometer.polling.overruns'].volume, 3)
+        duration = stats['ceilometer.polling.duration']
+        self.assertEqual(duration.resource_id,
+                         '%s-60' % cfg.CONF.host)
+        self.assertEqual(duration.resource_metadata['pollsters'].keys(),
+                         ['test'])
+
+    def test_run_task_exception(self):
+        task = self.mgr.setup_polling_tasks()[60]
+        task.running = True
+        with mock.patch.object(self.mgr, 'interval_task',
+                               side_effect=Exception('boom')):
+            self.mgr._run_task(task, 60)
+        self.assertFalse(task.running)
@@ -0,0 +1,87 @@
+# -*- encoding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""Tests for ceilometer/api/acl.py
+"""
+
+import mock
+from oslo.config import cfg
+import webob
+
+from ceilometer.api import acl
+from ceilometer.openstack.common import fileutils
+from ceilometer.tests import base
+
+
+class TestEnforcer(base.TestCase):
+
+    def setUp(self):
+        super(TestEnforcer, self).setUp()
+        cfg.CONF.set_override('policy_file',
+                              self.path_get('tests/policy.json'))
+        self.enforcer = acl.Enforcer()
+
+    def test_is_admin(self):
+        self.assertTrue(self.enforcer.is_admin('Member,admin'))
+        self.assertFalse(self.enforcer.is_admin('Member'))
+        self.assertFalse(self.enforcer.is_admin(''))
+
+    def test_role_sets_remembered(self):
+        with mock.patch.object(self.enforcer, 'enforce',
+                               return_value=True) as enforce:
+            self.assertTrue(self.enforcer.is_admin('Member,admin'))
+            self.assertTrue(self.enforcer.is_admin('admin,Member'))
+        self.assertEqual(1, enforce.call_count)
+
+    def test_policy_checked_once_per_interval(self):
+        with mock.patch.object(fileutils, 'read_cached_file',
+                               wraps=fileutils.read_cached_file) as read:
+            for roles in ('admin', 'Member', 'admin'):
+                self.enforcer.is_admin(roles)
+            self.assertEqual(1, read.call_count)
+
+            cfg.CONF.set_override('policy_check_interval', 0, group='api')
+            self.enforcer.is_admin('admin')
+            self.assertEqual(2, read.call_count)
+
+    def test_reload_forgets_role_sets(self):
+        self.enforcer.is_admin('admin')
+        self.enforcer.set_rules({})
+        self.assertIsNone(self.enforcer.admin_roles.get(frozenset(['admin'])))
+
+
+class TestGetLimitedToProject(base.TestCase):
+
+    def setUp(self):
+        super(TestGetLimitedToProject, self).setUp()
+        self.enforcer = mock.Mock()
+        self.stubs.Set(acl, '_ENFORCER', self.enforcer)
+
+    def test_limited_to_own_project(self):
+        self.enforcer.is_admin.return_value = False
+        headers = {'X-Roles': 'Member', 'X-Project-Id': 'project-good'}
+        self.assertEqual('project-good', acl.get_limited_to_project(headers))
+
+    def test_admin_not_limited(self):
+        self.enforcer.is_admin.return_value = True
+        headers = {'X-Roles': 'admin', 'X-Project-Id': 'project-good'}
+        self.assertIsNone(acl.get_limited_to_project(headers))
+
+    def test_remembered_for_the_request(self):
+        self.enforcer.is_admin.return_value = False
+        request = webob.Request.blank('/', headers={
+            'X-Roles': 'Member', 'X-Project-Id': 'project-good'})
+        for i in range(3):
+            self.assertEqual('project-good',
+                             acl.get_limited_to_project(request.headers))
+        self.assertEqual(1, self.enforcer.is_admin.call_count)
@@ -0,0 +1,63 @@
+# -*- encoding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""Tests for the ceilometer-api server.
+"""
+
+import mock
+from oslo.config import cfg
+
+from ceilometer.api import app
+from ceilometer.tests import base
+
+
+class TestApp(base.TestCase):
+
+    def _start(self):
+        with mock.patch('ceilometer.service.prepare_service'):
+            with mock.patch('eventlet.listen') as listen:
+                with mock.patch.object(app.os_service, 'launch') as launch:
+                    app.start()
+        return listen, launch
+
+    def test_start_single_process(self):
+        cfg.CONF.set_override('backlog', 16, group='api')
+        listen, launch = self._start()
+        listen.assert_called_once_with(('0.0.0.0', 8777), backlog=16)
+        service = launch.call_args[0][0]
+        self.assertIsInstance(service, app.WSGIService)
+        self.assertIs(service.sock, listen.return_value)
+        self.assertIsNone(launch.call_args[1]['workers'])
+
+    def test_start_workers(self):
+        cfg.CONF.set_override('workers', 4, group='api')
+        listen, launch = self._start()
+        self.assertEqual(launch.call_args[1]['workers'], 4)
+
+    def test_start_worker_per_cpu(self):
+        cfg.CONF.set_override('workers', 0, group='api')
+        with mock.patch('multiprocessing.cpu_count', return_value=8):
+            listen, launch = self._start()
+        self.assertEqual(launch.call_args[1]['workers'], 8)
+
+    def test_service_start(self):
+        cfg.CONF.set_override('pool_size', 10, group='api')
+        service = app.WSGIService(mock.sentinel.sock)
+        with mock.patch.object(app, 'VersionSelectorApplication') as vsa:
+            with mock.patch.object(service.tg, 'add_thread') as add_thread:
+                service.start()
+        args, kwargs = add_thread.call_args
+        self.assertEqual(args, (app.eventlet.wsgi.server,
+                                mock.sentinel.sock,
+                                vsa.return_value))
+        self.assertEqual(kwargs['custom_pool'].size, 10)
@@ -0,0 +1,154 @@
+# -*- encoding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""Tests for ceilometer/api/cache.py
+"""
+
+import datetime
+
+import mock
+from oslo.config import cfg
+
+from ceilometer.api import cache
+from ceilometer.openstack.common import timeutils
+from ceilometer import storage
+from ceilometer.storage import models
+from ceilometer.tests import base
+
+
+def _stats(start, period=3600):
+    return models.Statistics(
+        unit='%', min=1, max=1, avg=1, sum=1, count=1,
+        period=period, period_start=start,
+        period_end=start + datetime.timedelta(seconds=period),
+        duration=0, duration_start=start, duration_end=start,
+        groupby=None)
+
+
+class TestMemoryBackend(base.TestCase):
+
+    def test_least_recently_used_dropped(self):
+        backend = cache.MemoryBackend(2)
+        backend.set('a', 1)
+        backend.set('b', 2)
+        self.assertEqual(backend.get('a'), 1)
+        backend.set('c', 3)
+        self.assertIsNone(backend.get('b'))
+        self.assertEqual(backend.get('a'), 1)
+        self.assertEqual(backend.get('c'), 3)
+
+
+class TestMemcachedBackend(base.TestCase):
+
+    def test_client(self):
+        client = mock.Mock()
+        client.get.return_value = 'value'
+        backend = cache.MemcachedBackend(['127.0.0.1:11211'], client=client)
+        backend.set('key', 'value')
+        client.set.assert_called_once_with('key', 'value')
+        self.assertEqual(backend.get('key'), 'value')
+
+    def test_memcache_missing(self):
+        with mock.patch.object(cache, 'memcache', None):
+            self.assertRaises(RuntimeError, cache.MemcachedBackend,
+                              ['127.0.0.1:11211'])
+
+
+class TestStatisticsCache(base.TestCase):
+
+    def setUp(self):
+        super(TestStatisticsCache, self).setUp()
+        self.start = datetime.datetime(2013, 9, 1, 0, 0)
+        timeutils.set_time_override(datetime.datetime(2013, 9, 1, 2, 30))
+        self.addCleanup(timeutils.clear_time_override)
+        self.cache = cache.StatisticsCache(cache.MemoryBackend(10), 600)
+        self.conn = mock.Mock()
+
+    def _filter(self, **kwargs):
+        return storage.SampleFilter(meter='cpu_util', **kwargs)
+
+    def test_from_conf(self):
+        self.assertIsNone(cache.StatisticsCache.from_conf(cfg.CONF))
+        cfg.CONF.set_override('statistics_cache_backend', 'memory',
+                              group='api')
+        statistics_cache = cache.StatisticsCache.from_conf(cfg.CONF)
+        self.assertIsInstance(statistics_cache.backend, cache.MemoryBackend)
+        cfg.CONF.set_override('statistics_cache_backend', 'nosuch',
+                              group='api')
+        self.assertRaises(RuntimeError,
+                          cache.StatisticsCache.from_conf, cfg.CONF)
+
+    def test_open_query_not_cached(self):
+        self.conn.get_meter_statistics.return_value = [_stats(self.start)]
+        f = self._filter()
+        self.cache.get_meter_statistics(self.conn, f)
+        self.cache.get_meter_statistics(self.conn, f)
+        self.assertEqual(self.conn.get_meter_statistics.call_count, 2)
+
+    def test_closed_query_cached(self):
+        self.conn.get_meter_statistics.return_value = [_stats(self.start)]
+        f = self._filter(start=self.start,
+                         end=self.start + datetime.timedelta(hours=1))
+        self.cache.get_meter_statistics(self.conn, f)
+        stats = self.cache.get_meter_statistics(
+            self.conn,
+            self._filter(start=self.start,
+                         end=self.start + datetime.timedelta(hours=1)))
+        self.assertEqual(self.conn.get_meter_statistics.call_count, 1)
+        self.assertEqual([s.period_start for s in stats], [self.start])
+
+    def test_different_filter_not_shared(self):
+        self.conn.get_meter_statistics.return_value = []
+        end = self.start + datetime.timedelta(hours=1)
+        self.cache.get_meter_statistics(
+            self.conn, self._filter(start=self.start, end=end))
+        self.cache.get_meter_statistics(
+            self.conn, self._filter(start=self.start, end=end,
+                                    project='project1'))
+        self.assertEqual(self.conn.get_meter_statistics.call_count, 2)
+
+    def test_only_open_periods_recomputed(self):
+        periods = [self.start + datetime.timedelta(hours=i)
+                   for i in range(3)]
+        self.conn.get_meter_statistics.return_value = [
+            _stats(p) for p in periods]
+        f = self._filter(start=self.start)
+        self.cache.get_meter_statistics(self.conn, f, 3600)
+        # 02:20 is the cutoff, the first two periods are closed
+        self.conn.get_meter_statistics.return_value = [_stats(periods[2])]
+        stats = self.cache.get_meter_statistics(
+            self.conn, self._filter(start=self.start), 3600)
+        self.assertEqual([s.period_start for s in stats], periods)
+        open_filter = self.conn.get_meter_statistics.call_args[0][0]
+        self.assertEqual(open_filter.start, periods[2])
+        self.assertEqual(open_filter.start_timestamp_op, 'ge')
+        self.assertEqual(f.start, self.start)
+
+    def test_newly_closed_periods_cached(self):
+        periods = [self.start + datetime.timedelta(hours=i)
+                   for i in range(4)]
+        self.conn.get_meter_statistics.return_value = [
+            _stats(p) for p in periods[:3]]
+        self.cache.get_meter_statistics(
+            self.conn, self._filter(start=self.start), 3600)
+        timeutils.advance_time_seconds(3600)
+        self.conn.get_meter_statistics.return_value = [
+            _stats(p) for p in periods[2:]]
+        self.cache.get_meter_statistics(
+            self.conn, self._filter(start=self.start), 3600)
+        self.conn.get_meter_statistics.return_value = [_stats(periods[3])]
+        stats = self.cache.get_meter_statistics(
+            self.conn, self._filter(start=self.start), 3600)
+        self.assertEqual([s.period_start for s in stats], periods)
+        open_filter = self.conn.get_meter_statistics.call_args[0][0]
+        self.assertEqual(open_filter.start, periods[3])
@@ -0,0 +1,58 @@
+# -*- encoding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""Tests for the API hooks.
+"""
+
+import mock
+from webob import exc
+import wsme
+
+from ceilometer.api import hooks
+from ceilometer import storage
+from ceilometer.tests import base
+
+
+class TestDBHook(base.TestCase):
+
+    def setUp(self):
+        super(TestDBHook, self).setUp()
+        self.pool = mock.Mock()
+        self.hook = hooks.DBHook(self.pool)
+        self.state = mock.Mock()
+        self.state.request = mock.Mock(spec=[])
+
+    def _fail(self, error):
+        self.hook.before(self.state)
+        self.hook.on_error(self.state, error)
+        self.hook.after(self.state)
+        conn = self.pool.get.return_value
+        return self.pool.put.call_args == mock.call(conn, healthy=True)
+
+    def test_connection_reused_after_client_error(self):
+        self.assertTrue(self._fail(exc.HTTPNotFound()))
+
+    def test_connection_reused_after_invalid_input(self):
+        self.assertTrue(self._fail(wsme.exc.ClientSideError('wrong')))
+
+    def test_connection_discarded_after_server_error(self):
+        self.assertFalse(self._fail(ValueError()))
+
+    def test_pool_timeout(self):
+        self.pool.get.side_effect = storage.ConnectionPoolTimeout()
+        try:
+            self.hook.before(self.state)
+        except exc.HTTPException as err:
+            self.assertEqual(err.status_int, 503)
+        else:
+            self.fail('HTTPException not raised')
@@ -0,0 +1,58 @@
+# -*- encoding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""Tests for ceilometer/api/ingest.py
+"""
+
+import mock
+
+from ceilometer.api import ingest
+from ceilometer.tests import base
+
+
+class TestSampleQueue(base.TestCase):
+
+    def setUp(self):
+        super(TestSampleQueue, self).setUp()
+        self.published = []
+        self.manager = mock.MagicMock()
+        publisher = self.manager.publisher.return_value.__enter__
+        publisher.return_value = self.published.append
+        self.queue = ingest.SampleQueue(self.manager, 5, batch_size=2)
+
+    def test_published_in_batches(self):
+        self.queue.put(range(5))
+        self.queue.join()
+        self.assertEqual([[0, 1], [2, 3], [4]], self.published)
+
+    def test_all_or_nothing(self):
+        self.queue.put(range(3))
+        self.assertRaises(ingest.QueueFull, self.queue.put, range(3))
+        self.queue.put(range(2))
+        self.queue.join()
+        self.assertEqual([0, 1, 2, 0, 1], sum(self.published, []))
+
+    def test_batch_too_large(self):
+        # Rejected even though the queue is empty
+        self.assertRaises(ingest.BatchTooLarge, self.queue.put, range(6))
+        self.queue.put(range(5))
+        self.queue.join()
+        self.assertEqual(range(5), sum(self.published, []))
+
+    def test_publication_failure(self):
+        publisher = self.manager.publisher.return_value.__enter__
+        publisher.side_effect = Exception('boom')
+        self.queue.put(range(3))
+        self.queue.join()
+        self.queue.put(range(5))
+        self.assertEqual([], self.published)
@@ -21,10 +21,12 @@
 
 import datetime
 import logging
+import mock
 import testscenarios
 
 from oslo.config import cfg
 
+from ceilometer.api.controllers import v2
 from ceilometer.publisher import rpc
 from ceilometer import sample
 from ceilometer.tests import db as tests_db
@@ -147,6 +149,29 @@ class TestListMeters(FunctionalTest,
         self.assertEqual(set(r['name'] for r in data),
                          set(['meter.test', 'meter.mine']))
 
+    def test_latest(self):
+        data = self.get_json('/meters/meter.test/latest')
+        self.assertEqual(dict((s['resource_id'], s['counter_volume'])
+                              for s in data),
+                         {'resource-id': 3, 'resource-id3': 1})
+
+    def test_latest_with_project(self):
+        data = self.get_json('/meters/meter.test/latest',
+                             q=[{'field': 'project_id',
+                                 'value': 'project-id2',
+                                 }])
+        self.assertEqual(['resource-id3'], [s['resource_id'] for s in data])
+
+    def test_list_json_stream(self):
+        for path in ('/meters', '/meters/meter.mine', '/meters/meter.test'):
+            cfg.CONF.set_override('json_stream_threshold', -1, group='api')
+            expected = self.get_json(path)
+            cfg.CONF.set_override('json_stream_threshold', 0, group='api')
+            with mock.patch.object(v2, '_iter_json',
+                                   side_effect=v2._iter_json) as iter_json:
+                self.assertEqual(self.get_json(path), expected)
+            self.assertEqual(iter_json.call_count, 1)
+
     def test_list_meters_with_dict_metadata(self):
         data = self.get_json('/meters/meter.mine',
                              q=[{'field':
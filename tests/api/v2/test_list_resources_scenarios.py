@@ -431,6 +431,32 @@ class TestListResources(FunctionalTest,
              ],
             list(sorted(metadata.iteritems())))
 
+    def test_json_stream(self):
+        sample1 = sample.Sample(
+            'instance',
+            'cumulative',
+            '',
+            1,
+            'user-id',
+            'project-id',
+            'resource-id',
+            timestamp=datetime.datetime(2012, 7, 2, 10, 40),
+            resource_metadata={'display_name': 'test-server',
+                               'dict_properties': {'key': 'value'},
+                               },
+            source='test',
+        )
+        msg = rpc.meter_message_from_counter(
+            sample1,
+            cfg.CONF.publisher_rpc.metering_secret,
+        )
+        self.conn.record_metering_data(msg)
+
+        cfg.CONF.set_override('json_stream_threshold', -1, group='api')
+        expected = self.get_json('/resources')
+        cfg.CONF.set_override('json_stream_threshold', 0, group='api')
+        self.assertEqual(self.get_json('/resources'), expected)
+
     def test_resource_meter_links(self):
         sample1 = sample.Sample(
             'instance',
@@ -20,11 +20,15 @@
 
 import copy
 import datetime
+import json
 import logging
-import testscenarios
 
+import msgpack
 from oslo.config import cfg
+import testscenarios
 
+from ceilometer.api import hooks
+from ceilometer.api import ingest
 from ceilometer.openstack.common import rpc
 from ceilometer.openstack.common import timeutils
 from ceilometer.tests import db as tests_db
@@ -305,3 +309,111 @@ class TestPostSamples(FunctionalTest,
 
             self.assertEqual(s, data.json[x])
             self.assertEqual(s, self.published[0][1]['args']['data'][x])
+
+
+class TestPostBulkSamples(FunctionalTest,
+                          tests_db.MixinTestsWithBackendScenarios):
+
+    def faux_cast(self, context, topic, msg):
+        for s in msg['args']['data']:
+            del s['message_signature']
+        self.published.extend(msg['args']['data'])
+
+    def setUp(self):
+        super(TestPostBulkSamples, self).setUp()
+        self.published = []
+        self.stubs.Set(rpc, 'cast', self.faux_cast)
+        self.samples = [{'counter_name': name,
+                         'counter_type': 'gauge',
+                         'counter_unit': 'instance',
+                         'counter_volume': i,
+                         'resource_id': 'resource-%d' % i,
+                         'project_id': 'project-good',
+                         'user_id': 'user-good',
+                         'timestamp': '2013-11-01T10:%02d:00' % i,
+                         'resource_metadata': {'name': 'value'}}
+                        for i, name in enumerate(['apples', 'pears',
+                                                  'apples'])]
+
+    def _check_published(self, data):
+        hooks.PipelineHook.sample_queue.join()
+        self.assertEqual(202, data.status_int)
+        self.assertEqual(3, len(data.json))
+        # The publisher may group the samples by meter
+        published = dict((s['message_id'], s) for s in self.published)
+        self.assertEqual(sorted(data.json), sorted(published))
+        for s, message_id in zip(self.samples, data.json):
+            s['message_id'] = message_id
+            s['source'] = 'project-good:openstack'
+            self.assertEqual(s, published[message_id])
+
+    def test_json(self):
+        data = self.post_json('/samples', self.samples)
+        self._check_published(data)
+
+    def test_msgpack(self):
+        data = self.app.post(self.PATH_PREFIX + '/samples',
+                             msgpack.dumps(self.samples),
+                             content_type='application/x-msgpack')
+        self._check_published(data)
+
+    def test_invalid_samples(self):
+        self.samples[0]['message_id'] = 'forged'
+        del self.samples[1]['counter_volume']
+        self.samples[2]['counter_type'] = 'unknown'
+        data = self.post_json('/samples', self.samples, expect_errors=True)
+        self.assertEqual(400, data.status_int)
+        faultstring = json.loads(
+            data.json['error_message'])['faultstring']
+        self.assertIn('0: the message_id must not be set', faultstring)
+        self.assertIn('1: missing counter_volume', faultstring)
+        self.assertIn('2: invalid counter_type', faultstring)
+        self.assertEqual([], self.published)
+
+    def test_invalid_types(self):
+        self.samples[0]['resource_id'] = 42
+        self.samples[1]['counter_name'] = ['pears']
+        self.samples[1]['user_id'] = {'id': 'user-good'}
+        self.samples[2]['resource_metadata'] = 'name=value'
+        data = self.post_json('/samples', self.samples, expect_errors=True)
+        self.assertEqual(400, data.status_int)
+        faultstring = json.loads(
+            data.json['error_message'])['faultstring']
+        self.assertIn('0: invalid resource_id', faultstring)
+        self.assertIn('1: invalid counter_name, user_id', faultstring)
+        self.assertIn('2: invalid resource_metadata', faultstring)
+        self.assertEqual([], self.published)
+
+    def test_undecodable_body(self):
+        data = self.app.post(self.PATH_PREFIX + '/samples', '[{',
+                             content_type='application/json',
+                             expect_errors=True)
+        self.assertEqual(400, data.status_int)
+
+    def test_wrong_project_id(self):
+        data = self.post_json('/samples', self.samples,
+                              expect_errors=True,
+                              headers={'X-Roles': 'Member',
+                                       'X-Tenant-Name': 'lu-tenant',
+                                       'X-Project-Id': 'project-bad'})
+        self.assertEqual(400, data.status_int)
+        self.assertEqual([], self.published)
+
+    def test_queue_full(self):
+        def put(samples):
+            raise ingest.QueueFull()
+        self.stubs.Set(hooks.PipelineHook.sample_queue, 'put', put)
+        data = self.post_json('/samples', self.samples, expect_errors=True)
+        self.assertEqual(503, data.status_int)
+        self.assertEqual('1', data.headers['Retry-After'])
+
+    def test_batch_too_large(self):
+        def put(samples):
+            raise ingest.BatchTooLarge(2)
+        self.stubs.Set(hooks.PipelineHook.sample_queue, 'put', put)
+        data = self.post_json('/samples', self.samples, expect_errors=True)
+        self.assertEqual(413, data.status_int)
+        self.assertNotIn('Retry-After', data.headers)
+        faultstring = json.loads(
+            data.json['error_message'])['faultstring']
+        self.assertIn('At most 2 samples', faultstring)
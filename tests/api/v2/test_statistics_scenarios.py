@@ -18,11 +18,13 @@
 """Test events statistics retrieval."""
 
 import datetime
+import mock
 import testscenarios
 
 from oslo.config import cfg
 
 from . import base
+from ceilometer.openstack.common import timeutils
 from ceilometer import sample
 from ceilometer.publisher import rpc
 from ceilometer.tests import db as tests_db
@@ -477,3 +479,207 @@ class TestSumResourceVolume(base.FunctionalTest,
                                             }])
         self.assertEqual(data[0]['sum'], 6)
         self.assertEqual(data[0]['count'], 1)
+
+
+class TestStatisticsCache(base.FunctionalTest,
+                          tests_db.MixinTestsWithBackendScenarios):
+
+    PATH = '/meters/volume.size/statistics'
+
+    def setUp(self):
+        super(TestStatisticsCache, self).setUp()
+        cfg.CONF.set_override('statistics_cache_backend', 'memory',
+                              group='api')
+        self.app = self._make_app()
+        self._record(5, datetime.datetime(2012, 9, 25, 10, 30))
+
+    def _record(self, volume, timestamp):
+        s = sample.Sample(
+            'volume.size',
+            'gauge',
+            'GiB',
+            volume,
+            'user-id',
+            'project1',
+            'resource-id',
+            timestamp=timestamp,
+            resource_metadata={},
+            source='source1',
+        )
+        msg = rpc.meter_message_from_counter(
+            s,
+            cfg.CONF.publisher_rpc.metering_secret,
+        )
+        self.conn.record_metering_data(msg)
+
+    def test_closed_periods_cached(self):
+        q = [{'field': 'timestamp',
+              'op': 'ge',
+              'value': '2012-09-25T10:00:00',
+              },
+             {'field': 'timestamp',
+              'op': 'lt',
+              'value': '2012-09-25T12:00:00',
+              }]
+        data = self.get_json(self.PATH, q=q, period=3600)
+        self.assertEqual(data[0]['sum'], 5)
+        self._record(6, datetime.datetime(2012, 9, 25, 10, 45))
+        data = self.get_json(self.PATH, q=q, period=3600)
+        self.assertEqual(data[0]['sum'], 5)
+        self.assertEqual(data[0]['count'], 1)
+
+
+class TestMetersStatistics(base.FunctionalTest,
+                           tests_db.MixinTestsWithBackendScenarios):
+
+    PATH = '/statistics'
+
+    def setUp(self):
+        super(TestMetersStatistics, self).setUp()
+        for i, (name, volume, project) in enumerate((
+                ('cpu_util', 10, 'project1'),
+                ('cpu_util', 20, 'project2'),
+                ('memory', 512, 'project1'),
+                ('memory', 1024, 'project1'),
+                ('disk.read.bytes', 1, 'project1'))):
+            s = sample.Sample(
+                name,
+                'gauge',
+                'B',
+                volume,
+                'user-id',
+                project,
+                'resource-id',
+                timestamp=datetime.datetime(2012, 9, 25, 10, 30 + i),
+                resource_metadata={},
+                source='source1',
+            )
+            msg = rpc.meter_message_from_counter(
+                s,
+                cfg.CONF.publisher_rpc.metering_secret,
+            )
+            self.conn.record_metering_data(msg)
+
+    def test_meters(self):
+        data = self.get_json(self.PATH, meter=['cpu_util', 'memory'])
+        results = dict((d['meter'], d) for d in data)
+        self.assertEqual(set(results), set(['cpu_util', 'memory']))
+        self.assertEqual(results['cpu_util']['sum'], 30)
+        self.assertEqual(results['memory']['count'], 2)
+
+    def test_meters_group_by_project(self):
+        data = self.get_json(self.PATH, meter=['cpu_util', 'memory'],
+                             groupby='project_id')
+        results = dict(((d['meter'], d['groupby']['project_id']), d)
+                       for d in data)
+        self.assertEqual(set(results), set([('cpu_util', 'project1'),
+                                            ('cpu_util', 'project2'),
+                                            ('memory', 'project1')]))
+        self.assertEqual(results[('cpu_util', 'project2')]['max'], 20)
+        self.assertEqual(results[('memory', 'project1')]['avg'], 768)
+
+    def test_meter_group_by_project(self):
+        data = self.get_json('/meters/cpu_util/statistics',
+                             groupby='project_id')
+        self.assertEqual(sorted(d['groupby']['project_id'] for d in data),
+                         ['project1', 'project2'])
+
+    def test_no_meter(self):
+        resp = self.get_json(self.PATH, expect_errors=True)
+        self.assertEqual(resp.status_code, 400)
+
+    def test_group_by_unknown_field(self):
+        resp = self.get_json(self.PATH, meter=['cpu_util'], groupby='wtf',
+                             expect_errors=True)
+        self.assertEqual(resp.status_code, 400)
+
+    def test_group_by_unsupported_by_driver(self):
+        with mock.patch.object(type(self.conn), 'get_meters_statistics',
+                               side_effect=NotImplementedError('source')):
+            resp = self.get_json(self.PATH, meter=['cpu_util'],
+                                 groupby='source', expect_errors=True)
+        self.assertEqual(resp.status_code, 400)
+
+    def test_meter_group_by_unsupported_by_driver(self):
+        with mock.patch.object(type(self.conn), 'get_meter_statistics',
+                               side_effect=NotImplementedError('source')):
+            resp = self.get_json('/meters/cpu_util/statistics',
+                                 groupby='source', expect_errors=True)
+        self.assertEqual(resp.status_code, 400)
+
+
+class TestFinalQueriesHTTPCache(base.FunctionalTest,
+                                tests_db.MixinTestsWithBackendScenarios):
+
+    PATH = '/meters/volume.size/statistics'
+    QUERY = {'q.field': 'timestamp',
+             'q.op': 'lt',
+             'q.value': '2012-09-26T00:00:00'}
+
+    def setUp(self):
+        super(TestFinalQueriesHTTPCache, self).setUp()
+        s = sample.Sample(
+            'volume.size',
+            'gauge',
+            'GiB',
+            5,
+            'user-id',
+            'project1',
+            'resource-id',
+            timestamp=datetime.datetime(2012, 9, 25, 10, 30),
+            resource_metadata={},
+            source='source1',
+        )
+        msg = rpc.meter_message_from_counter(
+            s,
+            cfg.CONF.publisher_rpc.metering_secret,
+        )
+        self.conn.record_metering_data(msg)
+
+    def test_final_query_headers(self):
+        for path in (self.PATH, '/meters/volume.size'):
+            response = self.app.get(self.PATH_PREFIX + path,
+                                    params=self.QUERY)
+            self.assertIsNotNone(response.etag)
+            self.assertEqual(timeutils.normalize_time(response.last_modified),
+                             datetime.datetime(2012, 9, 26, 0, 5))
+            self.assertEqual(response.cache_control.max_age, 86400)
+
+    def test_open_query_no_headers(self):
+        response = self.app.get(self.PATH_PREFIX + self.PATH)
+        self.assertIsNone(response.etag)
+        self.assertIsNone(response.cache_control.max_age)
+
+    def test_if_none_match(self):
+        response = self.app.get(self.PATH_PREFIX + self.PATH,
+                                params=self.QUERY)
+        with mock.patch.object(type(self.conn), 'get_meter_statistics') as s:
+            response = self.app.get(
+                self.PATH_PREFIX + self.PATH,
+                params=self.QUERY,
+                headers={'If-None-Match': '"%s"' % response.etag},
+                status=304)
+        self.assertFalse(s.called)
+        self.assertEqual(response.body, '')
+
+    def test_if_none_match_other_query(self):
+        response = self.app.get(self.PATH_PREFIX + self.PATH,
+                                params=self.QUERY)
+        response = self.app.get(
+            self.PATH_PREFIX + self.PATH,
+            params=dict(self.QUERY, period=3600),
+            headers={'If-None-Match': '"%s"' % response.etag})
+        self.assertEqual(response.status_int, 200)
+        self.assertEqual(response.json[0]['count'], 1)
+
+    def test_if_modified_since(self):
+        self.app.get(self.PATH_PREFIX + self.PATH,
+                     params=self.QUERY,
+                     headers={'If-Modified-Since':
+                              'Wed, 26 Sep 2012 01:00:00 GMT'},
+                     status=304)
+        response = self.app.get(self.PATH_PREFIX + self.PATH,
+                                params=self.QUERY,
+                                headers={'If-Modified-Since':
+                                         'Tue, 25 Sep 2012 23:00:00 GMT'})
+        self.assertEqual(response.status_int, 200)
@@ -19,9 +19,11 @@
 """
 
 import mock
+from keystoneclient import exceptions as ks_exceptions
 from keystoneclient.v2_0 import client as ksclient
 
 from ceilometer.central import manager
+from ceilometer.central import plugin
 from ceilometer.tests import base
 from tests import agentbase
 
@@ -45,3 +47,52 @@ class TestRunTasks(agentbase.BaseAgentManagerTestCase):
 
     def tearDown(self):
         super(TestRunTasks, self).tearDown()
+
+    def _fake_keystone(self, expires_soon):
+        keystone = mock.Mock()
+        keystone.auth_ref.will_expire_soon.return_value = expires_soon
+        return keystone
+
+    def test_interval_task_reuses_keystone(self):
+        clients = [self._fake_keystone(False)]
+        self.stubs.Set(ksclient, 'Client',
+                       lambda *args, **kwargs: clients.pop())
+        task = self.mgr.setup_polling_tasks()[60]
+        self.mgr.interval_task(task)
+        keystone = self.mgr.keystone
+        self.mgr.interval_task(task)
+        self.assertIs(self.mgr.keystone, keystone)
+        keystone.auth_ref.will_expire_soon.assert_called_with(300)
+
+    def test_interval_task_renews_expiring_token(self):
+        clients = [self._fake_keystone(False), self._fake_keystone(True)]
+        self.stubs.Set(ksclient, 'Client',
+                       lambda *args, **kwargs: clients.pop())
+        task = self.mgr.setup_polling_tasks()[60]
+        self.mgr.interval_task(task)
+        self.mgr.interval_task(task)
+        self.assertEqual(clients, [])
+
+    def test_interval_task_rejected_token(self):
+        clients = [self._fake_keystone(False), self._fake_keystone(False)]
+        self.stubs.Set(ksclient, 'Client',
+                       lambda *args, **kwargs: clients.pop())
+        plugin._CLIENTS['image'] = 'client'
+        self.addCleanup(plugin._CLIENTS.clear)
+        task = self.mgr.setup_polling_tasks()[60]
+        with mock.patch.object(self.Pollster, 'get_samples',
+                               side_effect=ks_exceptions.Unauthorized('no')):
+            self.mgr.interval_task(task)
+        self.assertIsNone(self.mgr.keystone)
+        self.assertEqual({}, plugin._CLIENTS)
+        self.mgr.interval_task(task)
+        self.assertIsNotNone(self.mgr.keystone)
+        self.assertEqual(clients, [])
+
+    def test_is_unauthorized(self):
+        class ClientException(Exception):
+            http_status = 401
+        self.assertTrue(manager._is_unauthorized(
+            ks_exceptions.Unauthorized('no')))
+        self.assertTrue(manager._is_unauthorized(ClientException()))
+        self.assertFalse(manager._is_unauthorized(Exception()))
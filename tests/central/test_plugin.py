@@ -0,0 +1,51 @@
+# -*- encoding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""Tests for ceilometer/central/plugin.py
+"""
+
+import mock
+
+from ceilometer.central import plugin
+from ceilometer.tests import base
+
+
+class TestGetClient(base.TestCase):
+
+    def setUp(self):
+        super(TestGetClient, self).setUp()
+        self.addCleanup(plugin._CLIENTS.clear)
+        self.ksclient = mock.Mock()
+        self.ksclient.service_catalog.url_for.return_value = 'http://image'
+        self.ksclient.auth_token = 'token-1'
+        self.factory = mock.Mock(side_effect=lambda e, t: object())
+
+    def test_client_reused(self):
+        client = plugin.get_client(self.ksclient, 'image', self.factory)
+        self.assertIs(plugin.get_client(self.ksclient, 'image', self.factory),
+                      client)
+        self.factory.assert_called_once_with('http://image', 'token-1')
+
+    def test_client_per_service(self):
+        client = plugin.get_client(self.ksclient, 'image', self.factory)
+        self.assertIsNot(plugin.get_client(self.ksclient, 'energy',
+                                           self.factory),
+                         client)
+
+    def test_new_client_for_new_token(self):
+        client = plugin.get_client(self.ksclient, 'image', self.factory)
+        self.ksclient.auth_token = 'token-2'
+        self.assertIsNot(plugin.get_client(self.ksclient, 'image',
+                                           self.factory),
+                         client)
+        self.factory.assert_called_with('http://image', 'token-2')
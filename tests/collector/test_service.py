@@ -33,7 +33,7 @@ from ceilometer.openstack.common import timeutils
 from ceilometer.collector import service
 from ceilometer.storage import base
 from ceilometer.tests import base as tests_base
-from ceilometer.compute import notifications
+from ceilometer.meter import notifications
 
 
 TEST_NOTICE = {
@@ -144,6 +144,25 @@ class TestUDPCollectorService(TestCollector):
         with patch('socket.socket', self._make_fake_socket):
             self.srv.start()
 
+    def test_udp_receive_message(self):
+        self.srv.storage_conn = self.mox.CreateMock(base.Connection)
+        self.counter = sample.Sample(
+            name='foobar',
+            type='bad',
+            unit='F',
+            volume=1,
+            user_id='jd',
+            project_id='ceilometer',
+            resource_id='cat',
+            timestamp='NOW!',
+            resource_metadata={},
+        ).to_message()
+        self.srv.storage_conn.record_metering_data(self.counter)
+        self.mox.ReplayAll()
+
+        with patch('socket.socket', self._make_fake_socket):
+            self.srv.start()
+
     @staticmethod
     def _raise_error():
         raise Exception
@@ -200,7 +219,7 @@ class TestCollectorService(TestCollector):
             [extension.Extension('test',
                                  None,
                                  None,
-                                 notifications.Instance(),
+                                 notifications.ProcessMeterNotifications(),
                                  ),
              ])
         self.srv.process_notification(TEST_NOTICE)
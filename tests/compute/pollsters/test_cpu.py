@@ -34,14 +34,18 @@ class TestCPUPollster(base.TestPollsterBase):
     def setUp(self):
         super(TestCPUPollster, self).setUp()
 
+    def _expect_cpu_stats(self, cpu):
+        self.inspector.inspect_domain_stats(self.instance.name).AndReturn(
+            virt_inspector.DomainStats(cpu=cpu, vnics=[], disks=[]))
+
     @mock.patch('ceilometer.pipeline.setup_pipeline', mock.MagicMock())
     def test_get_samples(self):
-        self.inspector.inspect_cpus(self.instance.name).AndReturn(
+        self._expect_cpu_stats(
             virt_inspector.CPUStats(time=1 * (10 ** 6), number=2))
-        self.inspector.inspect_cpus(self.instance.name).AndReturn(
+        self._expect_cpu_stats(
             virt_inspector.CPUStats(time=3 * (10 ** 6), number=2))
         # cpu_time resets on instance restart
-        self.inspector.inspect_cpus(self.instance.name).AndReturn(
+        self._expect_cpu_stats(
             virt_inspector.CPUStats(time=2 * (10 ** 6), number=2))
         self.mox.ReplayAll()
 
@@ -65,7 +69,7 @@ class TestCPUPollster(base.TestPollsterBase):
 
     @mock.patch('ceilometer.pipeline.setup_pipeline', mock.MagicMock())
     def test_get_samples_no_caching(self):
-        self.inspector.inspect_cpus(self.instance.name).AndReturn(
+        self._expect_cpu_stats(
             virt_inspector.CPUStats(time=1 * (10 ** 6), number=2))
         self.mox.ReplayAll()
 
@@ -76,4 +80,33 @@ class TestCPUPollster(base.TestPollsterBase):
         samples = list(pollster.get_samples(mgr, cache, self.instance))
         self.assertEqual(len(samples), 1)
         self.assertEqual(samples[0].volume, 10 ** 6)
-        self.assertEqual(len(cache), 0)
+        self.assertEqual(sorted(cache.keys()),
+                         ['domain_stats', 'resource_metadata'])
+        self.assertNotIn('cpu_number',
+                         cache['resource_metadata'][self.instance.id])
+
+    @mock.patch('ceilometer.pipeline.setup_pipeline', mock.MagicMock())
+    def test_get_samples_without_cpu_stats(self):
+        self._expect_cpu_stats(None)
+        self.mox.ReplayAll()
+
+        mgr = manager.AgentManager()
+        pollster = cpu.CPUPollster()
+        samples = list(pollster.get_samples(mgr, {}, self.instance))
+        self.assertEqual(samples, [])
+
+    @mock.patch('ceilometer.pipeline.setup_pipeline', mock.MagicMock())
+    def test_get_samples_failure_cached(self):
+        self.inspector.inspect_domain_stats(self.instance.name).AndRaise(
+            virt_inspector.InspectorException('boom'))
+        self.mox.ReplayAll()
+
+        mgr = manager.AgentManager()
+        pollster = cpu.CPUPollster()
+        cache = {}
+        # the failure is not inspected again within the same cycle
+        for i in range(2):
+            samples = list(pollster.get_samples(mgr, cache, self.instance))
+            self.assertEqual(samples, [])
+        self.assertIsInstance(cache['domain_stats'][self.instance.name],
+                              virt_inspector.InspectorException)
@@ -38,7 +38,8 @@ class TestDiskPollsters(base.TestPollsterBase):
 
     def setUp(self):
         super(TestDiskPollsters, self).setUp()
-        self.inspector.inspect_disks(self.instance.name).AndReturn(self.DISKS)
+        self.inspector.inspect_domain_stats(self.instance.name).AndReturn(
+            virt_inspector.DomainStats(cpu=None, vnics=[], disks=self.DISKS))
         self.mox.ReplayAll()
 
     @mock.patch('ceilometer.pipeline.setup_pipeline', mock.MagicMock())
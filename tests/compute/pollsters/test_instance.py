@@ -55,3 +55,19 @@ class TestInstancePollster(base.TestPollsterBase):
         samples = list(pollster.get_samples(mgr, {}, self.instance))
         self.assertEqual(len(samples), 1)
         self.assertEqual(samples[0].name, 'instance:m1.small')
+
+    @mock.patch('ceilometer.pipeline.setup_pipeline', mock.MagicMock())
+    def test_get_samples_share_metadata(self):
+        self.mox.ReplayAll()
+
+        mgr = manager.AgentManager()
+        cache = {}
+        samples = []
+        for pollster in [pollsters_instance.InstancePollster(),
+                         pollsters_instance.InstanceFlavorPollster()]:
+            samples.extend(pollster.get_samples(mgr, cache, self.instance))
+        self.assertEqual(len(samples), 2)
+        self.assertIs(samples[0].resource_metadata,
+                      samples[1].resource_metadata)
+        self.assertIs(cache['resource_metadata'][self.instance.id],
+                      samples[0].resource_metadata)
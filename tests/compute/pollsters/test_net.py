@@ -67,7 +67,8 @@ class TestNetPollster(base.TestPollsterBase):
             (self.vnic1, stats1),
             (self.vnic2, stats2),
         ]
-        self.inspector.inspect_vnics(self.instance.name).AndReturn(vnics)
+        self.inspector.inspect_domain_stats(self.instance.name).AndReturn(
+            virt_inspector.DomainStats(cpu=None, vnics=vnics, disks=[]))
         self.mox.ReplayAll()
 
     @mock.patch('ceilometer.pipeline.setup_pipeline', mock.MagicMock())
@@ -17,10 +17,14 @@
 # under the License.
 """Tests for ceilometer/agent/manager.py
 """
+import eventlet
 import mock
+from oslo.config import cfg
 
 from ceilometer import nova_client
 from ceilometer.compute import manager
+from ceilometer.compute.virt import inspector as virt_inspector
+from ceilometer.openstack.common import timeutils
 from ceilometer.tests import base
 from tests import agentbase
 
@@ -71,3 +75,130 @@ class TestRunTasks(agentbase.BaseAgentManagerTestCase):
         super(TestRunTasks, self).test_interval_exception_isolation()
         self.assertEqual(len(self.PollsterException.samples), 1)
         self.assertEqual(len(self.PollsterExceptionAnother.samples), 1)
+
+    def _poll_instances(self, instances):
+        polling_tasks = self.mgr.setup_polling_tasks()
+        polling_tasks[60].poll_and_publish_instances(instances)
+        return self.mgr.pipeline_manager.pipelines[0].publishers[0]
+
+    def test_poll_instances_concurrently(self):
+        cfg.CONF.set_override('polling_workers', 4)
+        instances = [self._fake_instance('vm%d' % i, 'active')
+                     for i in range(10)]
+        pub = self._poll_instances(instances)
+        self.assertEqual(len(pub.samples), 10)
+        self.assertEqual([i for m, i in self.Pollster.samples], instances)
+
+    def test_poll_instances_one_batch(self):
+        instances = [self._fake_instance('vm%d' % i, 'active')
+                     for i in range(3)]
+        publisher = mock.MagicMock()
+        polling_task = self.mgr.setup_polling_tasks()[60]
+        polling_task.publish_context = mock.MagicMock()
+        polling_task.publish_context.__enter__.return_value = publisher
+        polling_task.poll_and_publish_instances(instances)
+        publisher.assert_called_once_with([self.Pollster.test_data] * 3)
+
+    def test_poll_instance_timeout(self):
+        cfg.CONF.set_override('instance_polling_timeout', 0.01)
+        slow = self._fake_instance('slow', 'active')
+
+        def get_samples(manager, cache, instance=None):
+            if instance is slow:
+                eventlet.sleep(1)
+            return [self.Pollster.test_data]
+
+        self.stubs.Set(self.Pollster, 'get_samples',
+                       staticmethod(get_samples))
+        pub = self._poll_instances([slow, self.instance])
+        self.assertEqual(len(pub.samples), 1)
+
+    def test_poll_and_publish_inspects_all_domains(self):
+        stats = {'faux': 'stats'}
+        self.Pollster.inspects_domain = True
+        self.mgr._inspector = mock.MagicMock()
+        self.mgr.inspector.inspect_all_domain_stats.return_value = stats
+        caches = []
+
+        def get_samples(manager, cache, instance=None):
+            caches.append(cache)
+            return [self.Pollster.test_data]
+
+        self.stubs.Set(self.Pollster, 'get_samples',
+                       staticmethod(get_samples))
+        try:
+            self.mgr.setup_polling_tasks()[60].poll_and_publish()
+        finally:
+            del self.Pollster.inspects_domain
+        self.assertEqual(
+            self.mgr.inspector.inspect_all_domain_stats.call_count, 1)
+        self.assertEqual([c['domain_stats'] for c in caches], [stats])
+
+    def test_poll_and_publish_no_domain_inspection(self):
+        self.mgr._inspector = mock.MagicMock()
+        self.mgr.setup_polling_tasks()[60].poll_and_publish()
+        self.assertFalse(self.mgr.inspector.inspect_all_domain_stats.called)
+
+
+class TestLocalDiscovery(base.TestCase):
+
+    @mock.patch('ceilometer.pipeline.setup_pipeline', mock.MagicMock())
+    def setUp(self):
+        super(TestLocalDiscovery, self).setUp()
+        cfg.CONF.set_override('instance_discovery', 'local')
+        self.addCleanup(timeutils.clear_time_override)
+        timeutils.set_time_override()
+        self.instances = []
+        for name in ['instance-1', 'instance-2']:
+            instance = mock.MagicMock()
+            setattr(instance, 'OS-EXT-SRV-ATTR:instance_name', name)
+            self.instances.append(instance)
+        self.mgr = manager.AgentManager()
+        self.mgr.nv = mock.MagicMock()
+        self.mgr.nv.instance_get_all_by_host.return_value = self.instances
+        self.mgr._inspector = mock.MagicMock()
+        self._set_local(['instance-1', 'instance-2'])
+
+    def _set_local(self, names):
+        self.mgr.inspector.inspect_instances.return_value = [
+            virt_inspector.Instance(name=name, UUID=name) for name in names]
+
+    def test_nova_discovery(self):
+        cfg.CONF.set_override('instance_discovery', 'nova')
+        self.assertEqual(self.mgr.discover_instances(), self.instances)
+        self.assertEqual(self.mgr.discover_instances(), self.instances)
+        self.assertEqual(self.mgr.nv.instance_get_all_by_host.call_count, 2)
+        self.assertFalse(self.mgr.inspector.inspect_instances.called)
+
+    def test_unchanged_instances(self):
+        self.assertEqual(self.mgr.discover_instances(), self.instances)
+        self.assertEqual(self.mgr.discover_instances(), self.instances)
+        self.assertEqual(self.mgr.nv.instance_get_all_by_host.call_count, 1)
+
+    def test_changed_instances(self):
+        self.mgr.discover_instances()
+        self._set_local(['instance-2'])
+        self.assertEqual(self.mgr.discover_instances(), self.instances[1:])
+        self.assertEqual(self.mgr.nv.instance_get_all_by_host.call_count, 2)
+
+    def test_refresh_interval(self):
+        self.mgr.discover_instances()
+        timeutils.advance_time_seconds(
+            cfg.CONF.instance_metadata_refresh_interval + 1)
+        self.mgr.discover_instances()
+        self.assertEqual(self.mgr.nv.instance_get_all_by_host.call_count, 2)
+
+    def test_instance_unknown_to_nova(self):
+        self._set_local(['instance-1', 'instance-3'])
+        self.assertEqual(self.mgr.discover_instances(), self.instances[:1])
+
+    def test_nova_failure_keeps_instances(self):
+        self.mgr.discover_instances()
+        self._set_local(['instance-1'])
+        self.mgr.nv.instance_get_all_by_host.side_effect = Exception('boom')
+        self.assertEqual(self.mgr.discover_instances(), self.instances[:1])
+
+    def test_inspector_failure(self):
+        self.mgr.inspector.inspect_instances.side_effect = (
+            NotImplementedError())
+        self.assertEqual(self.mgr.discover_instances(), self.instances)
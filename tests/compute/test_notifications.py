@@ -21,9 +21,10 @@
 notification events.
 """
 
-from ceilometer.tests import base
 from ceilometer.compute import notifications
+from ceilometer.meter import notifications as meter_notifications
 from ceilometer import sample
+from ceilometer.tests import base
 
 
 INSTANCE_CREATE_END = {
@@ -401,9 +402,7 @@ INSTANCE_SCHEDULED = {
 class TestNotifications(base.TestCase):
 
     def test_process_notification(self):
-        info = list(notifications.Instance().process_notification(
-            INSTANCE_CREATE_END
-        ))[0]
+        info = self._process('instance', INSTANCE_CREATE_END)[0]
         for name, actual, expected in [
                 ('counter_name', info.name, 'instance'),
                 ('counter_type', info.type, sample.TYPE_GAUGE),
@@ -421,12 +420,13 @@ class TestNotifications(base.TestCase):
             self.assertEqual(actual, expected, name)
 
     @staticmethod
-    def _find_counter(counters, name):
-        return filter(lambda counter: counter.name == name, counters)[0]
+    def _process(name, message):
+        handler = meter_notifications.ProcessMeterNotifications()
+        return [c for c in handler.process_notification(message)
+                if c.name == name]
 
     def test_instance_create_instance(self):
-        ic = notifications.Instance()
-        counters = list(ic.process_notification(INSTANCE_CREATE_END))
+        counters = self._process('instance', INSTANCE_CREATE_END)
         self.assertEqual(len(counters), 1)
         c = counters[0]
         self.assertEqual(c.volume, 1)
@@ -439,57 +439,48 @@ class TestNotifications(base.TestCase):
         self.assertEqual(c.volume, 1)
 
     def test_instance_create_memory(self):
-        ic = notifications.Memory()
-        counters = list(ic.process_notification(INSTANCE_CREATE_END))
+        counters = self._process('memory', INSTANCE_CREATE_END)
         self.assertEqual(len(counters), 1)
         c = counters[0]
         self.assertEqual(c.volume, INSTANCE_CREATE_END['payload']['memory_mb'])
 
     def test_instance_create_vcpus(self):
-        ic = notifications.VCpus()
-        counters = list(ic.process_notification(INSTANCE_CREATE_END))
+        counters = self._process('vcpus', INSTANCE_CREATE_END)
         self.assertEqual(len(counters), 1)
         c = counters[0]
         self.assertEqual(c.volume, INSTANCE_CREATE_END['payload']['vcpus'])
 
     def test_instance_create_root_disk_size(self):
-        ic = notifications.RootDiskSize()
-        counters = list(ic.process_notification(INSTANCE_CREATE_END))
+        counters = self._process('disk.root.size', INSTANCE_CREATE_END)
         self.assertEqual(len(counters), 1)
         c = counters[0]
         self.assertEqual(c.volume, INSTANCE_CREATE_END['payload']['root_gb'])
 
     def test_instance_create_ephemeral_disk_size(self):
-        ic = notifications.EphemeralDiskSize()
-        counters = list(ic.process_notification(INSTANCE_CREATE_END))
+        counters = self._process('disk.ephemeral.size', INSTANCE_CREATE_END)
         self.assertEqual(len(counters), 1)
         c = counters[0]
         self.assertEqual(c.volume,
                          INSTANCE_CREATE_END['payload']['ephemeral_gb'])
 
     def test_instance_exists_instance(self):
-        ic = notifications.Instance()
-        counters = list(ic.process_notification(INSTANCE_EXISTS))
+        counters = self._process('instance', INSTANCE_EXISTS)
         self.assertEqual(len(counters), 1)
 
     def test_instance_exists_flavor(self):
-        ic = notifications.Instance()
-        counters = list(ic.process_notification(INSTANCE_EXISTS))
+        counters = self._process('instance', INSTANCE_EXISTS)
         self.assertEqual(len(counters), 1)
 
     def test_instance_delete_instance(self):
-        ic = notifications.Instance()
-        counters = list(ic.process_notification(INSTANCE_DELETE_START))
+        counters = self._process('instance', INSTANCE_DELETE_START)
         self.assertEqual(len(counters), 1)
 
     def test_instance_delete_flavor(self):
-        ic = notifications.Instance()
-        counters = list(ic.process_notification(INSTANCE_DELETE_START))
+        counters = self._process('instance', INSTANCE_DELETE_START)
         self.assertEqual(len(counters), 1)
 
     def test_instance_finish_resize_instance(self):
-        ic = notifications.Instance()
-        counters = list(ic.process_notification(INSTANCE_FINISH_RESIZE_END))
+        counters = self._process('instance', INSTANCE_FINISH_RESIZE_END)
         self.assertEqual(len(counters), 1)
         c = counters[0]
         self.assertEqual(c.volume, 1)
@@ -503,24 +494,21 @@ class TestNotifications(base.TestCase):
         self.assertEqual(c.name, 'instance:m1.small')
 
     def test_instance_finish_resize_memory(self):
-        ic = notifications.Memory()
-        counters = list(ic.process_notification(INSTANCE_FINISH_RESIZE_END))
+        counters = self._process('memory', INSTANCE_FINISH_RESIZE_END)
         self.assertEqual(len(counters), 1)
         c = counters[0]
         self.assertEqual(c.volume,
                          INSTANCE_FINISH_RESIZE_END['payload']['memory_mb'])
 
     def test_instance_finish_resize_vcpus(self):
-        ic = notifications.VCpus()
-        counters = list(ic.process_notification(INSTANCE_FINISH_RESIZE_END))
+        counters = self._process('vcpus', INSTANCE_FINISH_RESIZE_END)
         self.assertEqual(len(counters), 1)
         c = counters[0]
         self.assertEqual(c.volume,
                          INSTANCE_FINISH_RESIZE_END['payload']['vcpus'])
 
     def test_instance_resize_finish_instance(self):
-        ic = notifications.Instance()
-        counters = list(ic.process_notification(INSTANCE_FINISH_RESIZE_END))
+        counters = self._process('instance', INSTANCE_FINISH_RESIZE_END)
         self.assertEqual(len(counters), 1)
         c = counters[0]
         self.assertEqual(c.volume, 1)
@@ -534,16 +522,14 @@ class TestNotifications(base.TestCase):
         self.assertEqual(c.name, 'instance:m1.tiny')
 
     def test_instance_resize_finish_memory(self):
-        ic = notifications.Memory()
-        counters = list(ic.process_notification(INSTANCE_RESIZE_REVERT_END))
+        counters = self._process('memory', INSTANCE_RESIZE_REVERT_END)
         self.assertEqual(len(counters), 1)
         c = counters[0]
         self.assertEqual(c.volume,
                          INSTANCE_RESIZE_REVERT_END['payload']['memory_mb'])
 
     def test_instance_resize_finish_vcpus(self):
-        ic = notifications.VCpus()
-        counters = list(ic.process_notification(INSTANCE_RESIZE_REVERT_END))
+        counters = self._process('vcpus', INSTANCE_RESIZE_REVERT_END)
         self.assertEqual(len(counters), 1)
         c = counters[0]
         self.assertEqual(c.volume,
@@ -568,3 +554,24 @@ class TestNotifications(base.TestCase):
         self.assertEqual(names, ['instance.scheduled'])
         rid = [c.resource_id for c in counters]
         self.assertEqual(rid, ['fake-uuid1-1'])
+
+    def test_samples_share_notification_metadata(self):
+        handler = meter_notifications.ProcessMeterNotifications()
+        counters = list(handler.process_notification(INSTANCE_CREATE_END))
+        self.assertEqual(len(counters), 5)
+        metadata = counters[0].resource_metadata
+        self.assertEqual(metadata['event_type'],
+                         INSTANCE_CREATE_END['event_type'])
+        self.assertEqual(metadata['host'],
+                         INSTANCE_CREATE_END['publisher_id'])
+        for c in counters[1:]:
+            self.assertIs(c.resource_metadata, metadata)
+        self.assertNotIn('event_type', INSTANCE_CREATE_END['payload'])
+
+    def test_samples_from_different_notifications(self):
+        c1 = self._process('instance', INSTANCE_CREATE_END)[0]
+        c2 = self._process('instance', INSTANCE_DELETE_START)[0]
+        self.assertEqual(c1.resource_metadata['event_type'],
+                         INSTANCE_CREATE_END['event_type'])
+        self.assertEqual(c2.resource_metadata['event_type'],
+                         INSTANCE_DELETE_START['event_type'])
@@ -124,3 +124,33 @@ class TestHyperVInspection(test_base.TestCase):
 
         self.assertEqual(fake_read_mb * 1024, inspected_stats.read_bytes)
         self.assertEqual(fake_write_mb * 1024, inspected_stats.write_bytes)
+
+    def test_inspect_all_cpus(self):
+        self._inspector._utils.get_host_cpu_info.return_value = (1000, 2)
+        self._inspector._utils.get_all_cpu_metrics.return_value = {
+            'vm1': (2000, 4, 1000),
+            'vm2': (1000, 2, 2000),
+        }
+
+        cpus = self._inspector.inspect_all_cpus()
+
+        self.assertEqual(sorted(cpus.keys()), ['vm1', 'vm2'])
+        self.assertEqual(cpus['vm1'],
+                         self._inspector._get_cpu_stats((2000, 4, 1000)))
+        self.assertEqual(cpus['vm2'].number, 2)
+        self.assertFalse(self._inspector._utils.get_cpu_metrics.called)
+
+    def test_inspect_all_vnics(self):
+        self._inspector._utils.get_all_vnic_metrics.return_value = {
+            'vm1': [{'rx_bytes': 1000,
+                     'tx_bytes': 2000,
+                     'element_name': 'fake_element_name',
+                     'address': 'fake_address'}],
+        }
+
+        vnics = self._inspector.inspect_all_vnics()
+
+        self.assertEqual(vnics.keys(), ['vm1'])
+        vnic, stats = vnics['vm1'][0]
+        self.assertEqual(vnic.name, 'fake_element_name')
+        self.assertEqual(stats.tx_bytes, 2000)
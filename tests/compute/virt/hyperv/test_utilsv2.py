@@ -85,6 +85,26 @@ class TestUtilsV2(test_base.TestCase):
         self.assertEqual(fake_cpu_count, cpu_metrics[1])
         self.assertEqual(fake_uptime, cpu_metrics[2])
 
+    def test_get_all_cpu_metrics(self):
+        mock_vm = mock.MagicMock()
+        mock_vm.ElementName = "fake_vm_element_name"
+        mock_vm.OnTimeInMilliseconds = 1000
+        self._utils._conn.Msvm_ComputerSystem.return_value = [mock_vm]
+
+        self._utils._get_vm_resources = mock.MagicMock()
+        self._utils._get_vm_resources()[0].VirtualQuantity = 2
+
+        self._utils._get_metric_def = mock.MagicMock()
+        self._utils._get_metrics = mock.MagicMock()
+        self._utils._get_metrics()[0].MetricValue = 2000
+
+        cpu_metrics = self._utils.get_all_cpu_metrics()
+
+        self.assertEqual({"fake_vm_element_name": (2000, 2, 1000)},
+                         cpu_metrics)
+        self._utils._get_metric_def.assert_called_once_with(
+            self._utils._CPU_METRIC_NAME)
+
     def test_get_vnic_metrics(self):
         fake_vm_element_name = "fake_vm_element_name"
         fake_vnic_element_name = "fake_vnic_name"
@@ -19,6 +19,8 @@
 """Tests for libvirt inspector.
 """
 
+import mock
+
 from ceilometer.compute.virt.libvirt import inspector as libvirt_inspector
 from ceilometer.tests import base as test_base
 
@@ -43,6 +45,21 @@ class TestLibvirtInspection(test_base.TestCase):
         self.assertEqual(cpu_info.number, 2L)
         self.assertEqual(cpu_info.time, 999999L)
 
+    def test_inspect_instances(self):
+        self.mox.ResetAll()
+        self.inspector.connection.getCapabilities()
+        self.inspector.connection.numOfDomains().AndReturn(1)
+        self.inspector.connection.listDomainsID().AndReturn([0, 1])
+        self.inspector.connection.lookupByID(1).AndReturn(self.domain)
+        self.domain.name().AndReturn(self.instance_name)
+        self.domain.UUIDString().AndReturn('fake-uuid')
+        self.mox.ReplayAll()
+
+        instances = list(self.inspector.inspect_instances())
+        self.assertEqual(len(instances), 1)
+        self.assertEqual(instances[0].name, self.instance_name)
+        self.assertEqual(instances[0].UUID, 'fake-uuid')
+
     def test_inspect_vnics(self):
         dom_xml = """
              <domain type='kvm'>
@@ -165,3 +182,80 @@ class TestLibvirtInspection(test_base.TestCase):
         self.assertEqual(info0.read_bytes, 2L)
         self.assertEqual(info0.write_requests, 3L)
         self.assertEqual(info0.write_bytes, 4L)
+
+    def test_inspect_domain_stats(self):
+        dom_xml = """
+             <domain type='kvm'>
+                 <devices>
+                     <disk type='file' device='disk'>
+                         <target dev='vda' bus='virtio'/>
+                     </disk>
+                     <interface type='bridge'>
+                       <mac address='fa:16:3e:71:ec:6d'/>
+                       <target dev='vnet0'/>
+                     </interface>
+                 </devices>
+             </domain>
+        """
+        for i in range(2):
+            if i:
+                self.inspector.connection.getCapabilities()
+                self.inspector.connection.lookupByName(
+                    self.instance_name).AndReturn(self.domain)
+            self.domain.XMLDesc(0).AndReturn(dom_xml)
+            self.domain.info().AndReturn((0L, 0L, 0L, 2L, 999999L))
+            self.domain.interfaceStats('vnet0').AndReturn((1L, 2L, 0L, 0L,
+                                                           3L, 4L, 0L, 0L))
+            self.domain.blockStats('vda').AndReturn((1L, 2L, 3L, 4L, -1))
+        self.mox.ReplayAll()
+
+        stats = self.inspector.inspect_domain_stats(self.instance_name)
+        self.assertEqual(stats.cpu.time, 999999L)
+        self.assertEqual(len(stats.vnics), 1)
+        self.assertEqual(stats.vnics[0][0].name, 'vnet0')
+        self.assertEqual(stats.vnics[0][1].tx_packets, 4L)
+        self.assertEqual(len(stats.disks), 1)
+        self.assertEqual(stats.disks[0][0].device, 'vda')
+        self.assertEqual(stats.disks[0][1].write_bytes, 4L)
+
+        # The unchanged XML description is not parsed again
+        with mock.patch.object(libvirt_inspector.etree,
+                               'fromstring') as fromstring:
+            again = self.inspector.inspect_domain_stats(self.instance_name)
+        self.assertFalse(fromstring.called)
+        self.assertEqual(again, stats)
+
+    def test_inspect_all_domain_stats(self):
+        dom_xml = """
+             <domain type='kvm'>
+                 <devices>
+                     <disk type='file' device='disk'>
+                         <target dev='vda' bus='virtio'/>
+                     </disk>
+                 </devices>
+             </domain>
+        """
+        self.mox.ResetAll()
+        self.inspector.connection.getCapabilities()
+        self.inspector.connection.numOfDomains().AndReturn(2)
+        self.inspector.connection.listDomainsID().AndReturn([0, 1, 2])
+        domain2 = self.mox.CreateMockAnything()
+        self.inspector.connection.lookupByID(1).AndReturn(self.domain)
+        self.domain.name().AndReturn(self.instance_name)
+        self.domain.XMLDesc(0).AndReturn(dom_xml)
+        self.domain.info().AndReturn((0L, 0L, 0L, 2L, 999999L))
+        self.domain.blockStats('vda').AndReturn((1L, 2L, 3L, 4L, -1))
+        self.inspector.connection.lookupByID(2).AndReturn(domain2)
+        domain2.name().AndReturn('instance-00000002')
+        domain2.XMLDesc(0).AndReturn(dom_xml)
+        domain2.info().AndReturn((0L, 0L, 0L, 1L, 42L))
+        domain2.blockStats('vda').AndReturn((5L, 6L, 7L, 8L, -1))
+        self.mox.ReplayAll()
+
+        stats = self.inspector.inspect_all_domain_stats()
+        self.assertEqual(sorted(stats.keys()),
+                         [self.instance_name, 'instance-00000002'])
+        self.assertEqual(stats[self.instance_name].cpu.time, 999999L)
+        self.assertEqual(stats['instance-00000002'].cpu.time, 42L)
+        self.assertEqual(stats['instance-00000002'].disks[0][1].errors, -1)
+        self.assertEqual(stats[self.instance_name].vnics, [])
@@ -0,0 +1,78 @@
+# -*- encoding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""Tests for the virt Inspector base class.
+"""
+
+from ceilometer.compute.virt import inspector as virt_inspector
+from ceilometer.tests import base as test_base
+
+
+class FakeInspector(virt_inspector.Inspector):
+
+    def inspect_instances(self):
+        for name in ['instance-1', 'instance-2', 'gone']:
+            yield virt_inspector.Instance(name=name, UUID=name)
+
+    def inspect_cpus(self, instance_name):
+        if instance_name == 'gone':
+            raise virt_inspector.InstanceNotFoundException()
+        return virt_inspector.CPUStats(number=1, time=len(instance_name))
+
+    def inspect_vnics(self, instance_name):
+        if instance_name == 'gone':
+            raise virt_inspector.InstanceNotFoundException()
+        if instance_name == 'broken':
+            raise virt_inspector.InspectorException()
+        return iter([])
+
+    def inspect_disks(self, instance_name):
+        if instance_name == 'gone':
+            raise virt_inspector.InstanceNotFoundException()
+        yield (virt_inspector.Disk(device=instance_name),
+               virt_inspector.DiskStats(read_bytes=1, read_requests=2,
+                                        write_bytes=3, write_requests=4,
+                                        errors=0))
+
+
+class TestInspector(test_base.TestCase):
+
+    def setUp(self):
+        super(TestInspector, self).setUp()
+        self.inspector = FakeInspector()
+
+    def test_inspect_all_cpus(self):
+        cpus = self.inspector.inspect_all_cpus()
+        self.assertEqual(sorted(cpus.keys()), ['instance-1', 'instance-2'])
+        self.assertEqual(cpus['instance-1'].time, 10)
+
+    def test_inspect_all_disks(self):
+        disks = self.inspector.inspect_all_disks()
+        self.assertEqual(sorted(disks.keys()), ['instance-1', 'instance-2'])
+        self.assertEqual(disks['instance-2'][0][0].device, 'instance-2')
+
+    def test_inspect_all_domain_stats(self):
+        stats = self.inspector.inspect_all_domain_stats()
+        self.assertEqual(sorted(stats.keys()), ['instance-1', 'instance-2'])
+        self.assertEqual(stats['instance-1'],
+                         self.inspector.inspect_domain_stats('instance-1'))
+
+    def test_inspect_domain_stats_section_failure(self):
+        stats = self.inspector.inspect_domain_stats('broken')
+        self.assertEqual(stats.cpu.time, len('broken'))
+        self.assertEqual(stats.vnics, [])
+        self.assertEqual(stats.disks[0][0].device, 'broken')
+
+    def test_inspect_domain_stats_instance_not_found(self):
+        self.assertRaises(virt_inspector.InstanceNotFoundException,
+                          self.inspector.inspect_domain_stats, 'gone')
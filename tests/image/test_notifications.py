@@ -20,6 +20,7 @@
 from datetime import datetime
 
 from ceilometer.image import notifications
+from ceilometer.meter import notifications as meter_notifications
 from ceilometer import sample
 from ceilometer.tests import base
 
@@ -91,6 +92,12 @@ NOTIFICATION_DELETE = {"message_id": "0c65cb9c-018c-11e2-bc91-5453ed1bbb5f",
 
 class TestNotification(base.TestCase):
 
+    @staticmethod
+    def _process(name, message):
+        handler = meter_notifications.ProcessMeterNotifications()
+        return [c for c in handler.process_notification(message)
+                if c.name == name]
+
     def _verify_common_counter(self, c, name, volume):
         self.assertFalse(c is None)
         self.assertEqual(c.name, name)
@@ -101,8 +108,7 @@ class TestNotification(base.TestCase):
         self.assertEqual(metadata.get('host'), u'images.example.com')
 
     def test_image_download(self):
-        handler = notifications.ImageDownload()
-        counters = list(handler.process_notification(NOTIFICATION_SEND))
+        counters = self._process('image.download', NOTIFICATION_SEND)
         self.assertEqual(len(counters), 1)
         download = counters[0]
         self._verify_common_counter(download, 'image.download', 42)
@@ -111,8 +117,7 @@ class TestNotification(base.TestCase):
         self.assertEqual(download.type, sample.TYPE_DELTA)
 
     def test_image_serve(self):
-        handler = notifications.ImageServe()
-        counters = list(handler.process_notification(NOTIFICATION_SEND))
+        counters = self._process('image.serve', NOTIFICATION_SEND)
         self.assertEqual(len(counters), 1)
         serve = counters[0]
         self._verify_common_counter(serve, 'image.serve', 42)
@@ -132,16 +137,14 @@ class TestNotification(base.TestCase):
         self.assertEqual(update.type, sample.TYPE_DELTA)
 
     def test_image_on_update(self):
-        handler = notifications.Image()
-        counters = list(handler.process_notification(NOTIFICATION_UPDATE))
+        counters = self._process('image', NOTIFICATION_UPDATE)
         self.assertEqual(len(counters), 1)
         update = counters[0]
         self._verify_common_counter(update, 'image', 1)
         self.assertEqual(update.type, sample.TYPE_GAUGE)
 
     def test_image_size_on_update(self):
-        handler = notifications.ImageSize()
-        counters = list(handler.process_notification(NOTIFICATION_UPDATE))
+        counters = self._process('image.size', NOTIFICATION_UPDATE)
         self.assertEqual(len(counters), 1)
         update = counters[0]
         self._verify_common_counter(update, 'image.size',
@@ -157,16 +160,14 @@ class TestNotification(base.TestCase):
         self.assertEqual(upload.type, sample.TYPE_DELTA)
 
     def test_image_on_upload(self):
-        handler = notifications.Image()
-        counters = list(handler.process_notification(NOTIFICATION_UPLOAD))
+        counters = self._process('image', NOTIFICATION_UPLOAD)
         self.assertEqual(len(counters), 1)
         upload = counters[0]
         self._verify_common_counter(upload, 'image', 1)
         self.assertEqual(upload.type, sample.TYPE_GAUGE)
 
     def test_image_size_on_upload(self):
-        handler = notifications.ImageSize()
-        counters = list(handler.process_notification(NOTIFICATION_UPLOAD))
+        counters = self._process('image.size', NOTIFICATION_UPLOAD)
         self.assertEqual(len(counters), 1)
         upload = counters[0]
         self._verify_common_counter(upload, 'image.size',
@@ -182,16 +183,14 @@ class TestNotification(base.TestCase):
         self.assertEqual(delete.type, sample.TYPE_DELTA)
 
     def test_image_on_delete(self):
-        handler = notifications.Image()
-        counters = list(handler.process_notification(NOTIFICATION_DELETE))
+        counters = self._process('image', NOTIFICATION_DELETE)
         self.assertEqual(len(counters), 1)
         delete = counters[0]
         self._verify_common_counter(delete, 'image', 1)
         self.assertEqual(delete.type, sample.TYPE_GAUGE)
 
     def test_image_size_on_delete(self):
-        handler = notifications.ImageSize()
-        counters = list(handler.process_notification(NOTIFICATION_DELETE))
+        counters = self._process('image.size', NOTIFICATION_DELETE)
         self.assertEqual(len(counters), 1)
         delete = counters[0]
         self._verify_common_counter(delete, 'image.size',
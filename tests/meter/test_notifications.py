@@ -0,0 +1,138 @@
+# -*- encoding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""Tests for ceilometer.meter.notifications
+"""
+
+from oslo.config import cfg
+
+from ceilometer.meter import notifications
+from ceilometer import sample
+from ceilometer.tests import base
+
+NOTIFICATION = {
+    'event_type': 'test.create',
+    'timestamp': '2013-08-08 21:06:37.803826',
+    'publisher_id': 'test.example.com',
+    'message_id': '9b0d2b00-7e6b-44a6-a5e6-36f7f0a2e0ae',
+    'payload': {
+        'user_id': 'fake-user',
+        'tenant_id': 'fake-project',
+        'resource_id': 'fake-resource',
+        'size': 42,
+        'nested': {'value': 3},
+    },
+}
+
+DEFINITION = {
+    'name': 'test',
+    'event_type': 'test.*',
+    'type': 'gauge',
+    'unit': 'B',
+    'volume': 'payload.size',
+    'user_id': 'payload.user_id',
+    'project_id': 'payload.tenant_id',
+    'resource_id': 'payload.resource_id',
+}
+
+
+class TestMeterDefinition(base.TestCase):
+
+    def test_missing_field(self):
+        definition_cfg = dict(DEFINITION)
+        del definition_cfg['unit']
+        self.assertRaises(notifications.MeterDefinitionException,
+                          notifications.MeterDefinition,
+                          definition_cfg)
+
+    def test_invalid_type(self):
+        definition_cfg = dict(DEFINITION, type='counter')
+        self.assertRaises(notifications.MeterDefinitionException,
+                          notifications.MeterDefinition,
+                          definition_cfg)
+
+    def test_to_sample(self):
+        definition = notifications.MeterDefinition(DEFINITION)
+        s = definition.to_sample(NOTIFICATION)
+        self.assertEqual(s.name, 'test')
+        self.assertEqual(s.type, sample.TYPE_GAUGE)
+        self.assertEqual(s.unit, 'B')
+        self.assertEqual(s.volume, 42)
+        self.assertEqual(s.user_id, 'fake-user')
+        self.assertEqual(s.project_id, 'fake-project')
+        self.assertEqual(s.resource_id, 'fake-resource')
+        self.assertEqual(s.timestamp, NOTIFICATION['timestamp'])
+
+    def test_constant_and_nested_fields(self):
+        definition = notifications.MeterDefinition(
+            dict(DEFINITION, volume=1, user_id=None,
+                 resource_id='payload.nested.value'))
+        s = definition.to_sample(NOTIFICATION)
+        self.assertEqual(s.volume, 1)
+        self.assertEqual(s.user_id, None)
+        self.assertEqual(s.resource_id, 3)
+
+    def test_event_type_list(self):
+        definition = notifications.MeterDefinition(
+            dict(DEFINITION, event_type=['foo.*', 'test.create']))
+        self.assertTrue(definition.match_type('test.create'))
+        self.assertTrue(definition.match_type('foo.bar'))
+        self.assertFalse(definition.match_type('test.delete'))
+
+
+class TestProcessMeterNotifications(base.TestCase):
+
+    def setUp(self):
+        super(TestProcessMeterNotifications, self).setUp()
+        self.handler = notifications.ProcessMeterNotifications([
+            notifications.MeterDefinition(DEFINITION),
+            notifications.MeterDefinition(
+                dict(DEFINITION, name='test.missing',
+                     volume='payload.missing')),
+            notifications.MeterDefinition(
+                dict(DEFINITION, name='other', event_type='other.*')),
+        ])
+
+    def test_event_types(self):
+        self.assertEqual(self.handler.event_types, ['other.*', 'test.*'])
+
+    def test_process_notification(self):
+        samples = list(self.handler.to_samples(NOTIFICATION))
+        self.assertEqual([s.name for s in samples], ['test'])
+
+    def test_process_notification_not_matching(self):
+        samples = list(self.handler.to_samples(
+            dict(NOTIFICATION, event_type='unknown.create')))
+        self.assertEqual(samples, [])
+
+    def test_definitions_looked_up_once(self):
+        list(self.handler.to_samples(NOTIFICATION))
+        self.handler.definitions = []
+        samples = list(self.handler.to_samples(NOTIFICATION))
+        self.assertEqual(len(samples), 1)
+
+    def test_load_definitions(self):
+        handler = notifications.ProcessMeterNotifications()
+        self.assertIn('compute.instance.*', handler.event_types)
+        self.assertIn('image.send', handler.event_types)
+        self.assertIn('volume.exists', handler.event_types)
+
+    def test_load_definitions_file_not_found(self):
+        cfg.CONF.set_override('meter_definitions_cfg_file', 'no-such.yaml')
+        self.assertRaises(cfg.ConfigFilesNotFoundError,
+                          notifications.load_definitions)
+
+    def test_exchange_topics(self):
+        exchanges = [t.exchange for t in
+                     self.handler.get_exchange_topics(cfg.CONF)]
+        self.assertEqual(exchanges, ['nova', 'glance', 'cinder'])
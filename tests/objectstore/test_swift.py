@@ -18,6 +18,7 @@
 # under the License.
 
 import collections
+import socket
 
 import mock
 import testscenarios
@@ -96,8 +97,10 @@ class TestSwiftPollster(base.TestCase):
         )
         self.stubs.Set(swift_client, 'head_account',
                        ksclient)
+        self.stubs.Set(swift_client, 'http_connection',
+                       mock.Mock(return_value=(None, None)))
         self.stubs.Set(self.factory, '_neaten_url',
-                       mock.Mock())
+                       mock.Mock(return_value='http://swift/v1/AUTH_x'))
         Tenant = collections.namedtuple('Tenant', 'id')
         cache = {
             self.pollster.CACHE_KEY_TENANT: [Tenant(ACCOUNTS[0][0])],
@@ -142,3 +145,43 @@ class TestSwiftPollster(base.TestCase):
                        self.fake_ks_service_catalog_url_for)
         samples = list(self.pollster.get_samples(self.manager, {}))
         self.assertEqual(len(samples), 0)
+
+    def test_head_account_reuses_connection(self):
+        head_account = mock.Mock(return_value={})
+        self.stubs.Set(swift_client, 'head_account', head_account)
+        http_connection = mock.Mock(
+            side_effect=lambda url: (None, mock.Mock()))
+        self.stubs.Set(swift_client, 'http_connection', http_connection)
+        Tenant = collections.namedtuple('Tenant', 'id')
+        ksclient = mock.Mock()
+        ksclient.service_catalog.url_for.return_value = 'http://swift'
+        conns = []
+        for i in range(2):
+            cache = {
+                self.pollster.CACHE_KEY_TENANT: [Tenant('a'), Tenant('b')],
+            }
+            list(self.pollster._iter_accounts(ksclient, cache))
+            conns.append(cache[self.pollster.CACHE_KEY_CONN])
+        # One connection per polling cycle, reused for its accounts
+        self.assertEqual(http_connection.call_count, 2)
+        self.assertIsNot(conns[0], conns[1])
+        self.assertEqual(head_account.call_count, 4)
+        for (args, kwargs), conn in zip(head_account.call_args_list,
+                                        [conns[0]] * 2 + [conns[1]] * 2):
+            self.assertIs(kwargs['http_conn'][1], conn)
+
+    def test_head_account_reconnects(self):
+        head_account = mock.Mock(side_effect=[socket.error(), {}, {}])
+        self.stubs.Set(swift_client, 'head_account', head_account)
+        broken, new = mock.Mock(), mock.Mock()
+        self.stubs.Set(swift_client, 'http_connection',
+                       mock.Mock(return_value=(None, new)))
+        cache = {self.pollster.CACHE_KEY_CONN: broken}
+        self.assertEqual(
+            self.pollster._head_account(cache, 'http://swift/v1/a', 'token'),
+            {})
+        # The failed connection is replaced for the next accounts
+        self.assertIs(cache[self.pollster.CACHE_KEY_CONN], new)
+        self.pollster._head_account(cache, 'http://swift/v1/b', 'token')
+        self.assertIs(head_account.call_args[1]['http_conn'][1], new)
+        self.assertEqual(head_account.call_count, 3)
@@ -130,7 +130,7 @@ class TestUDPPublisher(base.TestCase):
 
         # Check that counters are equal
         self.assertEqual(sorted(sent_counters),
-                         sorted([dict(d.as_dict()) for d in self.test_data]))
+                         sorted([d.to_message() for d in self.test_data]))
 
     @staticmethod
     def _raise_ioerror():
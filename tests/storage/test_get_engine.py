@@ -18,6 +18,7 @@
 """Tests for ceilometer/storage/
 """
 
+import mock
 import mox
 import testtools
 
@@ -42,3 +43,68 @@ class EngineTest(testtools.TestCase):
             storage.get_engine(conf)
         except RuntimeError as err:
             self.assertIn('no-such-engine', unicode(err))
+
+
+class ConnectionPoolTest(testtools.TestCase):
+
+    def _make_pool(self, thread_safe, size=1, overflow=1, timeout=30):
+        conf = mock.Mock()
+        conf.database.connection_pool_size = size
+        conf.database.connection_pool_overflow = overflow
+        conf.database.connection_pool_timeout = timeout
+        engine = mock.Mock()
+        engine.get_connection.side_effect = (
+            lambda conf: mock.Mock(thread_safe=thread_safe))
+        with mock.patch.object(storage, 'get_engine', return_value=engine):
+            return storage.ConnectionPool(conf)
+
+    def test_thread_safe_connection_shared(self):
+        pool = self._make_pool(True)
+        conn = pool.get()
+        self.assertIs(conn, pool.get())
+        pool.put(conn, healthy=False)
+        self.assertIs(conn, pool.get())
+        self.assertEqual(pool.engine.get_connection.call_count, 1)
+
+    def test_connection_reused(self):
+        pool = self._make_pool(False)
+        conn = pool.get()
+        pool.put(conn)
+        self.assertIs(conn, pool.get())
+        self.assertEqual(pool.engine.get_connection.call_count, 1)
+
+    def test_overflow_connection_not_kept(self):
+        pool = self._make_pool(False)
+        conn1 = pool.get()
+        conn2 = pool.get()
+        self.assertIsNot(conn1, conn2)
+        pool.put(conn1)
+        pool.put(conn2)
+        self.assertEqual(pool._idle, [conn1])
+
+    def test_unhealthy_connection_discarded(self):
+        pool = self._make_pool(False)
+        with testtools.ExpectedException(ValueError):
+            with pool.connection() as conn:
+                raise ValueError()
+        self.assertIsNot(conn, pool.get())
+        self.assertEqual(pool.engine.get_connection.call_count, 2)
+
+    def test_dead_connection_discarded(self):
+        pool = self._make_pool(False)
+        conn = pool.get()
+        pool.put(conn)
+        conn.is_alive.return_value = False
+        self.assertIsNot(conn, pool.get())
+        self.assertEqual(pool.engine.get_connection.call_count, 2)
+
+    def test_get_times_out_when_exhausted(self):
+        pool = self._make_pool(False, size=1, overflow=0, timeout=0)
+        pool.get()
+        self.assertRaises(storage.ConnectionPoolTimeout, pool.get)
+
+    def test_get_waits_for_returned_connection(self):
+        pool = self._make_pool(False, size=1, overflow=0, timeout=0)
+        conn = pool.get()
+        pool.put(conn)
+        self.assertIs(conn, pool.get())
@@ -24,10 +24,14 @@
   running the tests. Make sure the Thrift server is running on that server.
 
 """
+import datetime
+
+import mock
 from oslo.config import cfg
 
 from ceilometer.storage.impl_hbase import Connection
 from ceilometer.storage.impl_hbase import MConnection
+from ceilometer.storage import models
 from ceilometer.tests import db as tests_db
 
 
@@ -54,3 +58,25 @@ class ConnectionTest(HBaseEngineTestBase):
                        lambda self, x: TestConn(x['host'], x['port']))
         conn = Connection(cfg.CONF)
         self.assertIsInstance(conn.conn, TestConn)
+
+    def test_is_alive(self):
+        self.assertTrue(self.conn.is_alive())
+        self.stubs.Set(self.conn.conn, 'is_table_enabled',
+                       mock.Mock(side_effect=IOError()))
+        self.assertFalse(self.conn.is_alive())
+
+
+class EventRowkeyTest(HBaseEngineTestBase):
+
+    def test_rowkey_time_bucket_and_event_name(self):
+        generated = datetime.datetime(2013, 12, 31, 5, 42, 17)
+        event = models.Event('compute.instance.create.end', generated,
+                             [models.Trait('state', models.Trait.TEXT_TYPE,
+                                           'active')])
+        self.conn.record_events([event])
+        bucket, name, ignored = event.id.split('_', 2)
+        self.assertEqual('1388466000', bucket)
+        self.assertEqual('compute.instance.create.end', name)
+        row = self.conn.conn.table('event').row(event.id)
+        self.assertEqual('active', row['f:t_state!1'])
+        self.assertEqual('2013-12-31T05:42:17.000000', row['f:generated'])
@@ -124,6 +124,40 @@ class IndexTest(MongoDBEngineTestBase):
         self.assertTrue(self.conn.db.meter.ensure_index('foo',
                                                         name='meter_ttl'))
 
+    def test_latest_sample_ttl_index(self):
+        cfg.CONF.set_override('time_to_live', 456789, group='database')
+        self.conn.upgrade()
+        self.assertEqual(self.conn.db.latest_sample.index_information()[
+            'latest_sample_ttl']['expireAfterSeconds'], 456789)
+
+
+class LatestSampleTest(MongoDBEngineTestBase):
+
+    def _record(self, volume, minute):
+        s = sample.Sample('cpu_util', sample.TYPE_GAUGE, '%', volume,
+                          'user-id', 'project-id', 'resource-id',
+                          timestamp=datetime.datetime(2012, 7, 2, 10, minute),
+                          resource_metadata={}, source='test')
+        self.conn.record_metering_data(
+            rpc.meter_message_from_counter(s, 'not-so-secret'))
+
+    def _latest_volumes(self):
+        return [s['counter_volume']
+                for s in self.conn.db.latest_sample.find()]
+
+    def test_older_sample_ignored(self):
+        self._record(1, 40)
+        self._record(3, 42)
+        self._record(2, 41)
+        self.assertEqual([3], self._latest_volumes())
+
+    def test_filled_on_upgrade(self):
+        self._record(1, 40)
+        self._record(2, 41)
+        self.conn.db.latest_sample.drop()
+        self.conn.upgrade()
+        self.assertEqual([2], self._latest_volumes())
+
 
 class CompatibilityTest(test_storage_scenarios.DBTestBase,
                         MongoDBEngineTestBase):
@@ -25,7 +25,18 @@
 
 import datetime
 
+import mock
+from sqlalchemy import exc
+from sqlalchemy.orm import joinedload
+
+from ceilometer.openstack.common.db import exception as db_exception
+from ceilometer.openstack.common.db.sqlalchemy import session
+from ceilometer.openstack.common import timeutils
+from ceilometer.publisher import rpc
+from ceilometer import sample
+from ceilometer.storage import impl_sqlalchemy
 from ceilometer.storage import models
+from ceilometer.storage.sqlalchemy.models import ResourceMeter
 from ceilometer.storage.sqlalchemy.models import table_args
 from ceilometer import utils
 from ceilometer.tests import db as tests_db
@@ -99,6 +110,92 @@ class EventTest(EventTestBase):
         self.assertIsNotNone(trait.name)
 
 
+class ResourceMeterTest(EventTestBase):
+
+    def _record(self, name, unit, minute):
+        s = sample.Sample(name, sample.TYPE_GAUGE, unit, 1,
+                          'user-id', 'project-id', 'resource-id',
+                          timestamp=datetime.datetime(2012, 7, 2, 10, minute),
+                          resource_metadata={}, source='test')
+        self.conn.record_metering_data(
+            rpc.meter_message_from_counter(s, 'not-so-secret'))
+
+    def _meter_types(self):
+        return sorted((m.resource_id, m.counter_name, m.counter_unit)
+                      for m in session.get_session().query(ResourceMeter))
+
+    def test_recorded_once_per_type(self):
+        self._record('cpu_util', '%', 40)
+        self._record('cpu_util', '%', 41)
+        self._record('memory', 'MB', 42)
+        self.assertEqual([('resource-id', 'cpu_util', '%'),
+                          ('resource-id', 'memory', 'MB')],
+                         self._meter_types())
+
+    def test_latest_sample_recorded(self):
+        self._record('cpu_util', '%', 40)
+        self._record('cpu_util', '%', 42)
+        self._record('cpu_util', '%', 41)
+        meter_type = session.get_session().query(ResourceMeter).options(
+            joinedload(ResourceMeter.meter)).one()
+        self.assertEqual(datetime.datetime(2012, 7, 2, 10, 40),
+                         meter_type.first_sample_timestamp)
+        self.assertEqual(datetime.datetime(2012, 7, 2, 10, 42),
+                         meter_type.last_sample_timestamp)
+        self.assertEqual(datetime.datetime(2012, 7, 2, 10, 42),
+                         meter_type.meter.timestamp)
+
+    def test_type_recorded_once(self):
+        self._record('cpu_util', '%', 40)
+        s = session.get_session()
+        meter_type = s.query(ResourceMeter).one()
+        s.add(ResourceMeter(resource_id=meter_type.resource_id,
+                            type_hash=meter_type.type_hash))
+        err = self.assertRaises(db_exception.DBError, s.flush)
+        self.assertIsInstance(err.inner_exception, exc.IntegrityError)
+
+    def test_retried_on_concurrent_type(self):
+        record = impl_sqlalchemy.Connection._record_metering_data
+        with mock.patch.object(
+                impl_sqlalchemy.Connection, '_record_metering_data',
+                side_effect=[db_exception.DBDuplicateEntry(
+                    inner_exception=exc.IntegrityError('', {}, None)),
+                    None]) as m:
+            self._record('cpu_util', '%', 40)
+        self.assertEqual(2, m.call_count)
+        record(m.call_args[0][0])
+        self.assertEqual([('resource-id', 'cpu_util', '%')],
+                         self._meter_types())
+
+    def test_cleared_with_their_samples(self):
+        self._record('cpu_util', '%', 40)
+        self._record('memory', 'MB', 41)
+        self._record('memory', 'MB', 44)
+        timeutils.utcnow.override_time = datetime.datetime(2012, 7, 2, 10, 45)
+        self.addCleanup(timeutils.clear_time_override)
+        self.conn.clear_expired_metering_data(3 * 60)
+        self.assertEqual([('resource-id', 'memory', 'MB')],
+                         self._meter_types())
+        meter_type = session.get_session().query(ResourceMeter).one()
+        self.assertEqual(datetime.datetime(2012, 7, 2, 10, 44),
+                         meter_type.first_sample_timestamp)
+
+    def test_cleared_per_unit(self):
+        self._record('memory', 'MB', 41)
+        self._record('memory', 'MB', 44)
+        self._record('memory', 'KB', 43)
+        self._record('memory', 'KB', 44)
+        timeutils.utcnow.override_time = datetime.datetime(2012, 7, 2, 10, 45)
+        self.addCleanup(timeutils.clear_time_override)
+        self.conn.clear_expired_metering_data(3 * 60)
+        first_samples = dict(
+            (m.counter_unit, m.first_sample_timestamp)
+            for m in session.get_session().query(ResourceMeter))
+        self.assertEqual({'KB': datetime.datetime(2012, 7, 2, 10, 43),
+                          'MB': datetime.datetime(2012, 7, 2, 10, 44)},
+                         first_samples)
+
+
 class ModelTest(tests_db.TestBase):
     database_connection = 'mysql://localhost'
 
@@ -232,6 +232,12 @@ class ResourceTest(DBTestBase,
         else:
             assert False, 'Never found resource-id'
 
+    def test_get_resources_meter_types_listed_once(self):
+        resources = list(self.conn.get_resources(resource='resource-id'))
+        self.assertEqual(1, len(resources))
+        self.assertEqual([models.ResourceMeter('instance', 'cumulative', '')],
+                         resources[0].meter)
+
     def test_get_resources_start_timestamp(self):
         timestamp = datetime.datetime(2012, 7, 2, 10, 42)
         expected = set(['resource-id-2', 'resource-id-3', 'resource-id-4',
@@ -1446,6 +1452,139 @@ class StatisticsGroupByTest(DBTestBase,
         pass
 
 
+class LatestSamplesTest(DBTestBase,
+                        tests_db.MixinTestsWithBackendScenarios):
+
+    def prepare_data(self):
+        test_sample_data = (
+            ('cpu_util', 10, 'resource-1', 'project-1', (2013, 8, 1, 10, 10)),
+            ('cpu_util', 30, 'resource-1', 'project-1', (2013, 8, 1, 10, 30)),
+            ('cpu_util', 20, 'resource-1', 'project-1', (2013, 8, 1, 10, 20)),
+            ('cpu_util', 40, 'resource-2', 'project-2', (2013, 8, 1, 10, 40)),
+            ('memory', 512, 'resource-2', 'project-2', (2013, 8, 1, 10, 50)),
+        )
+        for name, volume, resource, project, timestamp in test_sample_data:
+            c = sample.Sample(
+                name,
+                sample.TYPE_GAUGE,
+                unit='%' if name == 'cpu_util' else 'MB',
+                volume=volume,
+                user_id='user-1',
+                project_id=project,
+                resource_id=resource,
+                timestamp=datetime.datetime(*timestamp),
+                resource_metadata={},
+                source='source-1',
+            )
+            msg = rpc.meter_message_from_counter(
+                c,
+                cfg.CONF.publisher_rpc.metering_secret,
+            )
+            self.conn.record_metering_data(msg)
+
+    def test_latest(self):
+        f = storage.SampleFilter(meter='cpu_util')
+        results = dict((s.resource_id, s.counter_volume)
+                       for s in self.conn.get_latest_samples(f))
+        self.assertEqual({'resource-1': 30, 'resource-2': 40}, results)
+
+    def test_latest_by_project(self):
+        f = storage.SampleFilter(meter='cpu_util', project='project-1')
+        results = list(self.conn.get_latest_samples(f))
+        self.assertEqual(1, len(results))
+        self.assertEqual(30, results[0].counter_volume)
+        self.assertEqual(datetime.datetime(2013, 8, 1, 10, 30),
+                         results[0].timestamp)
+
+    def test_latest_in_time_range(self):
+        f = storage.SampleFilter(meter='cpu_util',
+                                 end=datetime.datetime(2013, 8, 1, 10, 25))
+        results = dict((s.resource_id, s.counter_volume)
+                       for s in self.conn.get_latest_samples(f))
+        self.assertEqual({'resource-1': 20}, results)
+
+    def test_resource_time_range(self):
+        resources = list(self.conn.get_resources(resource='resource-1'))
+        self.assertEqual(1, len(resources))
+        self.assertEqual(datetime.datetime(2013, 8, 1, 10, 10),
+                         resources[0].first_sample_timestamp)
+        self.assertEqual(datetime.datetime(2013, 8, 1, 10, 30),
+                         resources[0].last_sample_timestamp)
+
+
+class MetersStatisticsTest(DBTestBase,
+                           tests_db.MixinTestsWithBackendScenarios):
+
+    def prepare_data(self):
+        test_sample_data = (
+            ('cpu_util', 10, 'project-1', (2013, 8, 1, 10, 10)),
+            ('cpu_util', 20, 'project-1', (2013, 8, 1, 11, 10)),
+            ('cpu_util', 30, 'project-2', (2013, 8, 1, 11, 20)),
+            ('memory', 512, 'project-1', (2013, 8, 1, 10, 30)),
+            ('memory', 1024, 'project-2', (2013, 8, 1, 10, 40)),
+            ('disk.read.bytes', 1, 'project-1', (2013, 8, 1, 10, 50)),
+        )
+        for name, volume, project, timestamp in test_sample_data:
+            c = sample.Sample(
+                name,
+                sample.TYPE_GAUGE,
+                unit='%' if name == 'cpu_util' else 'B',
+                volume=volume,
+                user_id='user-1',
+                project_id=project,
+                resource_id='resource-1',
+                timestamp=datetime.datetime(*timestamp),
+                resource_metadata={},
+                source='source-1',
+            )
+            msg = rpc.meter_message_from_counter(
+                c,
+                cfg.CONF.publisher_rpc.metering_secret,
+            )
+            self.conn.record_metering_data(msg)
+
+    def test_meters(self):
+        f = storage.SampleFilter()
+        results = dict(self.conn.get_meters_statistics(
+            f, ['cpu_util', 'memory', 'no-such-meter']))
+        self.assertEqual(set(results), set(['cpu_util', 'memory']))
+        self.assertEqual(results['cpu_util'].count, 3)
+        self.assertEqual(results['cpu_util'].sum, 60)
+        self.assertEqual(results['cpu_util'].unit, '%')
+        self.assertIsNone(results['cpu_util'].groupby)
+        self.assertEqual(results['memory'].count, 2)
+        self.assertEqual(results['memory'].max, 1024)
+
+    def test_meters_group_by_project(self):
+        f = storage.SampleFilter()
+        results = dict(((meter, r.groupby['project_id']), r)
+                       for meter, r in self.conn.get_meters_statistics(
+                           f, ['cpu_util', 'memory'],
+                           groupby=['project_id']))
+        self.assertEqual(set(results), set([('cpu_util', 'project-1'),
+                                            ('cpu_util', 'project-2'),
+                                            ('memory', 'project-1'),
+                                            ('memory', 'project-2')]))
+        self.assertEqual(results[('cpu_util', 'project-1')].avg, 15)
+        self.assertEqual(results[('memory', 'project-2')].sum, 1024)
+        for r in results.values():
+            self.assertEqual(r.groupby.keys(), ['project_id'])
+
+    def test_meters_period(self):
+        f = storage.SampleFilter(
+            start=datetime.datetime(2013, 8, 1, 10, 0),
+            end=datetime.datetime(2013, 8, 1, 12, 0),
+        )
+        results = sorted((meter, r.period_start, r.count)
+                         for meter, r in self.conn.get_meters_statistics(
+                             f, ['cpu_util', 'memory'], period=3600))
+        self.assertEqual(results, [
+            ('cpu_util', datetime.datetime(2013, 8, 1, 10, 0), 1),
+            ('cpu_util', datetime.datetime(2013, 8, 1, 11, 0), 2),
+            ('memory', datetime.datetime(2013, 8, 1, 10, 0), 2),
+        ])
+
+
 class CounterDataTypeTest(DBTestBase,
                           tests_db.MixinTestsWithBackendScenarios):
     def prepare_data(self):
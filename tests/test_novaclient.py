@@ -18,8 +18,10 @@
 # under the License.
 
 import mock
+from oslo.config import cfg
 
 import novaclient
+from ceilometer.openstack.common import timeutils
 from ceilometer.tests import base
 from ceilometer import nova_client
 
@@ -28,6 +30,8 @@ class TestNovaClient(base.TestCase):
 
     def setUp(self):
         super(TestNovaClient, self).setUp()
+        nova_client.Client.clear_cache()
+        self.addCleanup(nova_client.Client.clear_cache)
         self.nv = nova_client.Client()
         self.stubs.Set(self.nv.nova_client.flavors, 'get',
                        self.fake_flavors_get)
@@ -191,3 +195,69 @@ class TestNovaClient(base.TestCase):
         instance = results[0]
         self.assertIsNone(instance.kernel_id)
         self.assertEqual(instance.ramdisk_id, 21)
+
+    def _count_calls(self, name, func):
+        calls = []
+
+        def counted(*args, **kwargs):
+            calls.append(args)
+            return func(*args, **kwargs)
+
+        self.stubs.Set(getattr(self.nv.nova_client, name), 'get', counted)
+        return calls
+
+    def test_with_flavor_and_image_cached(self):
+        flavor_calls = self._count_calls('flavors', self.fake_flavors_get)
+        image_calls = self._count_calls('images', self.fake_images_get)
+        self.nv._with_flavor_and_image(self.fake_servers_list())
+        results = nova_client.Client()._with_flavor_and_image(
+            self.fake_servers_list())
+        self.assertEqual(results[0].flavor['name'], 'm1.tiny')
+        self.assertEqual(results[0].image['name'], 'ubuntu-12.04-x86')
+        self.assertEqual(len(flavor_calls), 1)
+        self.assertEqual(len(image_calls), 1)
+
+    def test_with_flavor_and_image_not_found_cached(self):
+        flavor_calls = self._count_calls('flavors', self.fake_flavors_get)
+        for i in range(2):
+            results = self.nv._with_flavor_and_image(
+                self.fake_servers_list_unknown_flavor())
+            self.assertEqual(results[0].flavor['name'], 'unknown-id-666')
+        self.assertEqual(len(flavor_calls), 1)
+
+    def test_with_flavor_and_image_cache_expired(self):
+        self.addCleanup(timeutils.clear_time_override)
+        timeutils.set_time_override()
+        flavor_calls = self._count_calls('flavors', self.fake_flavors_get)
+        self.nv._with_flavor_and_image(self.fake_servers_list())
+        timeutils.advance_time_seconds(cfg.CONF.nova_lookup_cache_ttl + 1)
+        self.nv._with_flavor_and_image(self.fake_servers_list())
+        self.assertEqual(len(flavor_calls), 2)
+
+    def test_with_flavor_and_image_cache_disabled(self):
+        cfg.CONF.set_override('nova_lookup_cache_ttl', 0)
+        flavor_calls = self._count_calls('flavors', self.fake_flavors_get)
+        self.nv._with_flavor_and_image(self.fake_servers_list())
+        self.nv._with_flavor_and_image(self.fake_servers_list())
+        self.assertEqual(len(flavor_calls), 2)
+
+    def test_cache_size(self):
+        cfg.CONF.set_override('nova_lookup_cache_size', 2)
+        cache = nova_client.TTLCache()
+        for i in range(3):
+            cache[i] = str(i)
+        self.assertNotIn(0, cache)
+        self.assertEqual(cache[1], '1')
+        self.assertEqual(cache[2], '2')
+
+    def test_with_flavor_and_image_prefetch(self):
+        cfg.CONF.set_override('nova_lookup_prefetch_threshold', 1)
+        flavor_calls = self._count_calls('flavors', self.fake_flavors_get)
+        self.stubs.Set(self.nv.nova_client.flavors, 'list',
+                       lambda detailed: self.fake_flavors_list())
+        instances = self.fake_servers_list() * 2
+        instances[1] = mock.MagicMock(flavor={'id': 2}, image={'id': 1})
+        results = self.nv._with_flavor_and_image(instances)
+        self.assertEqual(results[0].flavor['name'], 'm1.tiny')
+        self.assertEqual(results[1].flavor['name'], 'm1.large')
+        self.assertEqual(len(flavor_calls), 0)
@@ -27,6 +27,7 @@ from ceilometer.publisher import test as test_publisher
 from ceilometer import transformer
 from ceilometer.transformer import accumulator
 from ceilometer.transformer import conversions
+from ceilometer.transformer import dedup
 from ceilometer.openstack.common import timeutils
 from ceilometer import pipeline
 from ceilometer.tests import base
@@ -50,6 +51,8 @@ class TestPipeline(base.TestCase):
             'cache': accumulator.TransformerAccumulator,
             'unit_conversion': conversions.ScalingTransformer,
             'rate_of_change': conversions.RateOfChangeTransformer,
+            'delta': conversions.DeltaTransformer,
+            'dedup': dedup.DedupTransformer,
         }
 
         if name in class_name_ext:
@@ -1021,3 +1024,172 @@ class TestPipeline(base.TestCase):
         self.assertEqual(len(publisher.samples), 0)
         pipe.flush(None)
         self.assertEqual(len(publisher.samples), 0)
+
+    def _do_test_delta(self, volumes, parameters, type=sample.TYPE_CUMULATIVE):
+        self.pipeline_cfg[0]['transformers'] = [
+            {
+                'name': 'delta',
+                'parameters': parameters,
+            },
+        ]
+        self.pipeline_cfg[0]['counters'] = ['cpu']
+        now = timeutils.utcnow()
+        counters = [
+            sample.Sample(
+                name='cpu',
+                type=type,
+                volume=volume,
+                unit='ns',
+                user_id='test_user',
+                project_id='test_proj',
+                resource_id='test_resource',
+                timestamp=(now +
+                           datetime.timedelta(minutes=i)).isoformat(),
+                resource_metadata={'cpu_number': 4}
+            )
+            for i, volume in enumerate(volumes)
+        ]
+
+        pipeline_manager = pipeline.PipelineManager(self.pipeline_cfg,
+                                                    self.transformer_manager)
+        pipe = pipeline_manager.pipelines[0]
+        pipe.publish_samples(None, counters)
+        return pipe.publishers[0].samples
+
+    def test_delta(self):
+        samples = self._do_test_delta([100, 160, 160, 40], {})
+        self.assertEqual([s.volume for s in samples], [60, 0, 40])
+        self.assertEqual(samples[0].type, sample.TYPE_DELTA)
+        self.assertEqual(samples[0].unit, 'ns')
+        self.assertEqual(samples[0].name, 'cpu')
+
+    def test_delta_gauge_decrease(self):
+        samples = self._do_test_delta([100, 40], {}, sample.TYPE_GAUGE)
+        self.assertEqual([s.volume for s in samples], [-60])
+
+    def test_delta_rate(self):
+        samples = self._do_test_delta(
+            [0, 60 * 10 ** 9],
+            {'rate': True,
+             'target': {'name': 'cpu_util',
+                        'unit': '%',
+                        'scale': 'volume * 100.0 / (10**9 * '
+                                 'resource_metadata.cpu_number)'}})
+        self.assertEqual(len(samples), 1)
+        self.assertEqual(samples[0].name, 'cpu_util')
+        self.assertEqual(samples[0].type, sample.TYPE_GAUGE)
+        self.assertEqual(samples[0].unit, '%')
+        self.assertEqual(samples[0].volume, 25.0)
+
+    def test_delta_rate_default_unit(self):
+        samples = self._do_test_delta([0, 120], {'rate': True})
+        self.assertEqual(samples[0].unit, 'ns/s')
+        self.assertEqual(samples[0].volume, 2.0)
+
+    def test_delta_suppress_unchanged(self):
+        samples = self._do_test_delta([100, 100, 160, 160],
+                                      {'suppress_unchanged': True})
+        self.assertEqual([s.volume for s in samples], [60])
+
+    def test_delta_threshold_carries_over(self):
+        samples = self._do_test_delta([100, 103, 106, 200],
+                                      {'suppress_unchanged': True,
+                                       'threshold': 5})
+        self.assertEqual([s.volume for s in samples], [6, 94])
+
+    def test_volume_store(self):
+        store = conversions.VolumeStore()
+        self.assertIsNone(store.get('a'))
+        store.set('a', 1, 10)
+        store.set('b', 2, 20)
+        store.set('a', 3, 30)
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.get('a'), (3.0, 30.0))
+        self.assertEqual(store.get('b'), (2.0, 20.0))
+
+    def test_volume_store_expiry(self):
+        store = conversions.VolumeStore(expiry=100)
+        store.set('a', 1, 0)
+        store.set('b', 2, 0)
+        store.touch('b', 90)
+        store.set('c', 3, 150)
+        self.assertIsNone(store.get('a'))
+        self.assertEqual(store.get('b'), (2.0, 0.0))
+        self.assertEqual(len(store), 2)
+        store.set('d', 4, 160)
+        self.assertEqual(len(store._volumes), 3)
+        self.assertEqual(store.get('d'), (4.0, 160.0))
+
+    def _do_test_dedup(self, samples, parameters):
+        self.pipeline_cfg[0]['transformers'] = [
+            {
+                'name': 'dedup',
+                'parameters': parameters,
+            },
+        ]
+        self.pipeline_cfg[0]['counters'] = ['memory']
+        counters = [
+            sample.Sample(
+                name='memory',
+                type=type,
+                volume=volume,
+                unit='MB',
+                user_id='test_user',
+                project_id='test_proj',
+                resource_id=resource_id,
+                timestamp=timeutils.utcnow().isoformat(),
+                resource_metadata=metadata,
+            )
+            for resource_id, type, volume, metadata in samples
+        ]
+
+        pipeline_manager = pipeline.PipelineManager(self.pipeline_cfg,
+                                                    self.transformer_manager)
+        pipe = pipeline_manager.pipelines[0]
+        pipe.publish_samples(None, counters)
+        return [(s.resource_id, s.volume)
+                for s in pipe.publishers[0].samples]
+
+    def test_dedup(self):
+        published = self._do_test_dedup(
+            [('r1', sample.TYPE_GAUGE, 512, {}),
+             ('r2', sample.TYPE_GAUGE, 512, {}),
+             ('r1', sample.TYPE_GAUGE, 512, {}),
+             ('r1', sample.TYPE_GAUGE, 1024, {}),
+             ('r2', sample.TYPE_GAUGE, 512, {})],
+            {})
+        self.assertEqual(published, [('r1', 512), ('r2', 512), ('r1', 1024)])
+
+    def test_dedup_heartbeat(self):
+        published = self._do_test_dedup(
+            [('r1', sample.TYPE_GAUGE, 512, {})] * 7,
+            {'heartbeat': 3})
+        self.assertEqual(len(published), 3)
+
+    def test_dedup_no_heartbeat(self):
+        published = self._do_test_dedup(
+            [('r1', sample.TYPE_GAUGE, 512, {})] * 20,
+            {'heartbeat': 0})
+        self.assertEqual(len(published), 1)
+
+    def test_dedup_metadata_keys(self):
+        published = self._do_test_dedup(
+            [('r1', sample.TYPE_GAUGE, 512, {'status': 'active', 'x': 1}),
+             ('r1', sample.TYPE_GAUGE, 512, {'status': 'active', 'x': 2}),
+             ('r1', sample.TYPE_GAUGE, 512, {'status': 'paused', 'x': 2})],
+            {'metadata_keys': ['status']})
+        self.assertEqual(len(published), 2)
+
+    def test_dedup_keeps_deltas(self):
+        published = self._do_test_dedup(
+            [('r1', sample.TYPE_DELTA, 1, {})] * 3,
+            {})
+        self.assertEqual(len(published), 3)
+
+    def test_dedup_size(self):
+        published = self._do_test_dedup(
+            [('r1', sample.TYPE_GAUGE, 512, {}),
+             ('r2', sample.TYPE_GAUGE, 512, {}),
+             ('r1', sample.TYPE_GAUGE, 512, {})],
+            {'size': 1})
+        self.assertEqual(len(published), 3)
@@ -0,0 +1,71 @@
+# -*- encoding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""Tests for ceilometer/sample.py
+"""
+
+import mock
+
+from ceilometer import sample
+from ceilometer.tests import base
+
+
+class TestSample(base.TestCase):
+
+    def setUp(self):
+        super(TestSample, self).setUp()
+        self.s = sample.Sample(
+            name='test',
+            type=sample.TYPE_CUMULATIVE,
+            unit='',
+            volume=1,
+            user_id='test',
+            project_id='test',
+            resource_id='test_run_tasks',
+            timestamp='2013-08-08T12:00:00',
+            resource_metadata={'name': 'Pollster'},
+        )
+
+    def test_id_is_lazy(self):
+        with mock.patch('uuid.uuid1') as uuid1:
+            s = sample.Sample('test', sample.TYPE_GAUGE, '', 1, 'u', 'p',
+                              'r', None, {})
+            self.assertFalse(uuid1.called)
+            s.id
+            s.id
+            self.assertEqual(uuid1.call_count, 1)
+
+    def test_id_set(self):
+        self.s.id = 'fake-id'
+        self.assertEqual(self.s.id, 'fake-id')
+
+    def test_as_dict(self):
+        d = self.s.as_dict()
+        self.assertEqual(sorted(d.keys()), sorted(sample.Sample.FIELDS))
+        self.assertEqual(d['id'], self.s.id)
+
+    def test_to_message(self):
+        msg = self.s.to_message()
+        self.assertEqual(msg, {
+            'source': 'openstack',
+            'counter_name': 'test',
+            'counter_type': sample.TYPE_CUMULATIVE,
+            'counter_unit': '',
+            'counter_volume': 1,
+            'user_id': 'test',
+            'project_id': 'test',
+            'resource_id': 'test_run_tasks',
+            'timestamp': '2013-08-08T12:00:00',
+            'resource_metadata': {'name': 'Pollster'},
+            'message_id': self.s.id,
+        })
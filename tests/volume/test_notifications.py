@@ -10,7 +10,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from ceilometer.volume import notifications
+from ceilometer.meter import notifications as meter_notifications
 from ceilometer.tests import base
 
 NOTIFICATION_VOLUME_EXISTS = {
@@ -74,6 +74,12 @@ NOTIFICATION_VOLUME_DELETE = {
 
 class TestNotifications(base.TestCase):
 
+    @staticmethod
+    def _process(name, message):
+        handler = meter_notifications.ProcessMeterNotifications()
+        return [s for s in handler.process_notification(message)
+                if s.name == name]
+
     def _verify_common_sample(self, s, name, notification):
         self.assertFalse(s is None)
         self.assertEqual(s.name, name)
@@ -83,16 +89,14 @@ class TestNotifications(base.TestCase):
         self.assertEqual(metadata.get('host'), notification['publisher_id'])
 
     def test_volume_exists(self):
-        v = notifications.Volume()
-        samples = list(v.process_notification(NOTIFICATION_VOLUME_EXISTS))
+        samples = self._process('volume', NOTIFICATION_VOLUME_EXISTS)
         self.assertEqual(len(samples), 1)
         s = samples[0]
         self._verify_common_sample(s, 'volume', NOTIFICATION_VOLUME_EXISTS)
         self.assertEqual(s.volume, 1)
 
     def test_volume_size_exists(self):
-        v = notifications.VolumeSize()
-        samples = list(v.process_notification(NOTIFICATION_VOLUME_EXISTS))
+        samples = self._process('volume.size', NOTIFICATION_VOLUME_EXISTS)
         self.assertEqual(len(samples), 1)
         s = samples[0]
         self._verify_common_sample(s, 'volume.size',
@@ -101,16 +105,14 @@ class TestNotifications(base.TestCase):
                          NOTIFICATION_VOLUME_EXISTS['payload']['size'])
 
     def test_volume_delete(self):
-        v = notifications.Volume()
-        samples = list(v.process_notification(NOTIFICATION_VOLUME_DELETE))
+        samples = self._process('volume', NOTIFICATION_VOLUME_DELETE)
         self.assertEqual(len(samples), 1)
         s = samples[0]
         self._verify_common_sample(s, 'volume', NOTIFICATION_VOLUME_DELETE)
         self.assertEqual(s.volume, 1)
 
     def test_volume_size_delete(self):
-        v = notifications.VolumeSize()
-        samples = list(v.process_notification(NOTIFICATION_VOLUME_DELETE))
+        samples = self._process('volume.size', NOTIFICATION_VOLUME_DELETE)
         self.assertEqual(len(samples), 1)
         s = samples[0]
         self._verify_common_sample(s, 'volume.size',
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Command line tool measuring the collector ingest path.
+
+Metering messages are sent with the fake RPC driver to a collector
+service, which dispatches them to the database dispatcher. Each message
+goes through the RPC dispatcher, CollectorService.record_metering_data,
+DatabaseDispatcher, the signature check and the storage driver
+record_metering_data.
+"""
+
+import argparse
+import datetime
+import gc
+import itertools
+import logging
+import os
+import resource
+import time
+
+from oslo.config import cfg
+
+from ceilometer.collector import service
+from ceilometer.openstack.common import context
+from ceilometer.openstack.common import rpc
+from ceilometer.openstack.common.rpc import impl_fake
+from ceilometer.publisher import rpc as publisher_rpc
+
+import make_test_data
+
+cfg.CONF.import_opt('meter_definitions_cfg_file',
+                    'ceilometer.meter.notifications')
+
+DEFAULT_BACKENDS = ['log://', 'sqlite://', 'hbase://__test__']
+
+ETC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                       '..', 'etc', 'ceilometer')
+
+
+class FakeConnection(impl_fake.Connection):
+    """Fake RPC connection also accepting the worker and pool consumers
+    used by the collector.
+    """
+
+    def create_worker(self, topic, proxy, pool_name):
+        self.create_consumer(topic, proxy)
+
+    def join_consumer_pool(self, callback, pool_name, topic,
+                           exchange_name=None, ack_on_error=True):
+        pass
+
+
+def make_messages(count, resources, metadata_size):
+    """Return count signed metering messages spread over resources."""
+    metadata = dict(('key%d' % i, 'value%d' % i)
+                    for i in xrange(metadata_size))
+    per_resource = count // resources + 1
+    start = datetime.datetime(2013, 1, 1)
+    interval = datetime.timedelta(minutes=1)
+    samples = itertools.chain(*[
+        make_test_data.make_samples(
+            name='benchmark',
+            meter_type='gauge',
+            unit='B',
+            volume=1,
+            user_id='user',
+            project_id='project',
+            resource_id='resource-%d' % r,
+            start=start,
+            end=start + interval * (per_resource - 1),
+            interval=interval,
+            resource_metadata=metadata)
+        for r in xrange(resources)])
+
+    messages = []
+    for s in itertools.islice(samples, count):
+        s.timestamp = s.timestamp.isoformat()
+        messages.append(publisher_rpc.meter_message_from_counter(
+            s, cfg.CONF.publisher_rpc.metering_secret))
+    return messages
+
+
+def start_collector(url):
+    cfg.CONF.set_override('database_connection', url)
+    cfg.CONF.set_override('dispatcher', ['database'], group='collector')
+    srv = service.CollectorService('benchmark', 'ceilometer.collector')
+    srv.conn = FakeConnection()
+    srv.initialize_service_hook(srv)
+    for ext in srv.dispatcher_manager:
+        ext.obj.storage_conn.upgrade()
+    return srv
+
+
+def percentile(ordered, p):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100.0))]
+
+
+def run(url, messages):
+    srv = start_collector(url)
+    ctxt = context.RequestContext()
+    topic = cfg.CONF.publisher_rpc.metering_topic
+    latencies = []
+
+    gc.collect()
+    objects_before = len(gc.get_objects())
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.time()
+    for msg in messages:
+        sent = time.time()
+        rpc.call(ctxt, topic, {'method': 'record_metering_data',
+                               'version': '1.0',
+                               'args': {'data': msg}})
+        latencies.append(time.time() - sent)
+    duration = time.time() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    objects_after = len(gc.get_objects())
+
+    srv.conn.close()
+    latencies.sort()
+    count = len(messages)
+    print('%-18s %8.0f samples/s  p50 %7.3fms  p99 %7.3fms  '
+          '%6.1f objects/sample  %6.0f bytes/sample'
+          % (url, count / duration,
+             percentile(latencies, 50) * 1000,
+             percentile(latencies, 99) * 1000,
+             float(objects_after - objects_before) / count,
+             (rss_after - rss_before) * 1024.0 / count))
+
+
+def main():
+    cfg.CONF([], project='ceilometer')
+
+    parser = argparse.ArgumentParser(
+        description='benchmark the collector ingest path',
+    )
+    parser.add_argument(
+        '--count',
+        default=10000,
+        type=int,
+        help='the number of samples to send',
+    )
+    parser.add_argument(
+        '--resources',
+        default=100,
+        type=int,
+        help='the number of resources the samples are spread over',
+    )
+    parser.add_argument(
+        '--metadata-size',
+        default=10,
+        type=int,
+        help='the number of resource metadata keys of each sample',
+    )
+    parser.add_argument(
+        'backends',
+        nargs='*',
+        default=DEFAULT_BACKENDS,
+        help='database connection urls of the backends to measure '
+        '(default: %s)' % ' '.join(DEFAULT_BACKENDS),
+    )
+    args = parser.parse_args()
+
+    # Keep the dispatcher debug messages out of the measure
+    logging.basicConfig(level=logging.WARNING)
+    cfg.CONF.set_override('rpc_backend',
+                          'ceilometer.openstack.common.rpc.impl_fake')
+    # Use the configuration files of the source tree
+    cfg.CONF.set_override('pipeline_cfg_file',
+                          os.path.join(ETC_DIR, 'pipeline.yaml'))
+    cfg.CONF.set_override('meter_definitions_cfg_file',
+                          os.path.join(ETC_DIR, 'meters.yaml'))
+
+    messages = make_messages(args.count, args.resources, args.metadata_size)
+    for url in args.backends:
+        # Each backend gets its own copy, the dispatcher converts the
+        # timestamps in place.
+        run(url, [dict(m) for m in messages])
+
+
+if __name__ == '__main__':
+    main()
@@ -33,6 +33,28 @@ from ceilometer import storage
 from ceilometer.openstack.common import timeutils
 
 
+def make_samples(name, meter_type, unit, volume, user_id, project_id,
+                 resource_id, start, end, interval, resource_metadata=None,
+                 source='artificial'):
+    """Yield the samples of a meter between start and end, one per
+    interval.
+    """
+    timestamp = start
+    while timestamp <= end:
+        yield sample.Sample(name=name,
+                            type=meter_type,
+                            unit=unit,
+                            volume=volume,
+                            user_id=user_id,
+                            project_id=project_id,
+                            resource_id=resource_id,
+                            timestamp=timestamp,
+                            resource_metadata=resource_metadata or {},
+                            source=source,
+                            )
+        timestamp = timestamp + interval
+
+
 def main():
     cfg.CONF([], project='ceilometer')
 
@@ -118,24 +140,21 @@ def main():
 
     # Generate events
     n = 0
-    while timestamp <= end:
-        c = sample.Sample(name=args.counter,
-                            type=args.type,
-                            unit=args.unit,
-                            volume=args.volume,
-                            user_id=args.user,
-                            project_id=args.project,
-                            resource_id=args.resource,
-                            timestamp=timestamp,
-                            resource_metadata={},
-                            source='artificial',
-                            )
+    for c in make_samples(name=args.counter,
+                          meter_type=args.type,
+                          unit=args.unit,
+                          volume=args.volume,
+                          user_id=args.user,
+                          project_id=args.project,
+                          resource_id=args.resource,
+                          start=timestamp,
+                          end=end,
+                          interval=increment):
         data = rpc.meter_message_from_counter(
             c,
             cfg.CONF.publisher_rpc.metering_secret)
         conn.record_metering_data(data)
         n += 1
-        timestamp = timestamp + increment
 
     print 'Added %d new events' % n
 
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Command line tool measuring the cost of creating and serialising samples.
+"""
+
+import argparse
+import resource
+import time
+
+from oslo.config import cfg
+
+from ceilometer.publisher import rpc
+from ceilometer import sample
+
+
+def _max_rss():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _report(name, count, duration):
+    print('%-12s %9d samples in %6.2fs, %10.0f samples/s'
+          % (name, count, duration, count / duration))
+
+
+def main():
+    cfg.CONF([], project='ceilometer')
+
+    parser = argparse.ArgumentParser(
+        description='benchmark sample creation and serialisation',
+    )
+    parser.add_argument(
+        '--count',
+        default=1000000,
+        type=int,
+        help='the number of samples to create',
+    )
+    args = parser.parse_args()
+
+    metadata = {'display_name': 'vm1', 'instance_type': 'm1.small'}
+    rss_before = _max_rss()
+
+    start = time.time()
+    samples = [sample.Sample(name='cpu',
+                             type=sample.TYPE_CUMULATIVE,
+                             unit='ns',
+                             volume=i,
+                             user_id='user',
+                             project_id='project',
+                             resource_id='resource-%d' % (i % 1000),
+                             timestamp='2013-08-08T12:00:00',
+                             resource_metadata=metadata)
+               for i in xrange(args.count)]
+    _report('create', args.count, time.time() - start)
+    print('%-12s %9d bytes per sample'
+          % ('memory', (_max_rss() - rss_before) * 1024 / args.count))
+
+    start = time.time()
+    for s in samples:
+        s.to_message()
+    _report('to_message', args.count, time.time() - start)
+
+    start = time.time()
+    for s in samples:
+        rpc.meter_message_from_counter(s, 'secret')
+    _report('signed', args.count, time.time() - start)
+
+
+if __name__ == '__main__':
+    main()